@@ -0,0 +1,108 @@
+"""
+Local stand-in exchange for SynapseTrade AI™
+Serves Binance, Coinbase, Yahoo and OANDA style candle endpoints from demo data
+so the market data provider adapters can be exercised offline.
+
+Usage:
+    python mock_exchange.py
+    MARKET_DATA_PROVIDERS="crypto=binance,stocks=yahoo,forex=oanda" \\
+    BINANCE_BASE_URL=http://localhost:8090 YAHOO_BASE_URL=http://localhost:8090 \\
+    OANDA_BASE_URL=http://localhost:8090 python server.py
+"""
+
+import os
+from datetime import datetime
+
+from fastapi import FastAPI, HTTPException
+
+from services.market_providers import DemoProvider, YahooProvider, TIMEFRAME_SECONDS
+
+app = FastAPI(title="SynapseTrade AI™ Mock Exchange")
+demo = DemoProvider()
+
+GRANULARITY_TIMEFRAMES = {seconds: timeframe for timeframe, seconds in TIMEFRAME_SECONDS.items()}
+YAHOO_TIMEFRAMES = {"1m": "1m", "5m": "5m", "15m": "15m", "60m": "1h", "1d": "1d"}
+OANDA_TIMEFRAMES = {"M1": "1m", "M5": "5m", "M15": "15m", "H1": "1h", "H4": "4h", "D": "1d"}
+
+
+def _base_symbol(pair: str) -> str:
+    for quote in ("USDT", "USD"):
+        if pair.endswith(quote) and len(pair) > len(quote):
+            return pair[:-len(quote)]
+    return pair
+
+
+@app.get("/api/v3/klines")
+async def binance_klines(symbol: str, interval: str = "1h", limit: int = 24):
+    if interval not in TIMEFRAME_SECONDS:
+        raise HTTPException(status_code=400, detail="Invalid interval")
+    candles = await demo.fetch_candles(_base_symbol(symbol), interval, limit)
+    step_ms = TIMEFRAME_SECONDS[interval] * 1000
+    return [
+        [row["timestamp"], str(row["open"]), str(row["high"]), str(row["low"]), str(row["close"]),
+         str(row["volume"]), row["timestamp"] + step_ms - 1]
+        for row in (candles[i] for i in range(len(candles)))
+    ]
+
+
+@app.get("/products/{product}/candles")
+async def coinbase_candles(product: str, granularity: int = 3600):
+    timeframe = GRANULARITY_TIMEFRAMES.get(granularity)
+    if timeframe is None:
+        raise HTTPException(status_code=400, detail="Unsupported granularity")
+    candles = await demo.fetch_candles(product.split("-")[0], timeframe, 300)
+    return [
+        [row["timestamp"] // 1000, row["low"], row["high"], row["open"], row["close"], row["volume"]]
+        for row in (candles[i] for i in reversed(range(len(candles))))
+    ]
+
+
+@app.get("/v8/finance/chart/{symbol}")
+async def yahoo_chart(symbol: str, interval: str = "60m", range: str = "1mo"):
+    timeframe = YAHOO_TIMEFRAMES.get(interval)
+    if timeframe is None:
+        raise HTTPException(status_code=400, detail="Unsupported interval")
+    # As many candles as the real range returns for a regular session
+    candles = await demo.fetch_candles(symbol, timeframe, YahooProvider.timeframe_limits[timeframe])
+    return {
+        "chart": {
+            "result": [{
+                "meta": {"symbol": symbol, "dataGranularity": interval, "range": range},
+                "timestamp": (candles.timestamp // 1000).tolist(),
+                "indicators": {"quote": [{
+                    "open": candles.open.tolist(),
+                    "high": candles.high.tolist(),
+                    "low": candles.low.tolist(),
+                    "close": candles.close.tolist(),
+                    "volume": candles.volume.tolist()
+                }]}
+            }],
+            "error": None
+        }
+    }
+
+
+@app.get("/v3/instruments/{instrument}/candles")
+async def oanda_candles(instrument: str, granularity: str = "H1", count: int = 24, price: str = "M"):
+    timeframe = OANDA_TIMEFRAMES.get(granularity)
+    if timeframe is None:
+        raise HTTPException(status_code=400, detail="Invalid granularity")
+    candles = await demo.fetch_candles(instrument.replace("_", "/"), timeframe, count)
+    return {
+        "instrument": instrument,
+        "granularity": granularity,
+        "candles": [
+            {
+                "complete": True,
+                "volume": int(row["volume"]),
+                "time": datetime.utcfromtimestamp(row["timestamp"] / 1000).isoformat() + ".000000000Z",
+                "mid": {"o": str(row["open"]), "h": str(row["high"]), "l": str(row["low"]), "c": str(row["close"])}
+            }
+            for row in (candles[i] for i in range(len(candles)))
+        ]
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("MOCK_EXCHANGE_PORT", 8090)))
@@ -1,7 +1,7 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import os
@@ -13,10 +13,20 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pymongo import MongoClient
 import uuid
+import asyncio
+import json
 import requests
 import httpx
 from services.ai_service import ai_service
+from services.candles import TIMEFRAME_SECONDS, to_epoch_ms
 from services.market_data_service import market_data_service
+from services.market_stream import market_stream_hub
+from services.correlation_service import correlation_service
+from services.backtest_engine import backtest_service, strategy_spec
+from services.strategy_optimizer import strategy_optimizer, build_trials
+from services.http_compression import CompressionMiddleware, SnapshotBody, conditional_json, etag_for
+from services.serialization import FastJSONResponse, dumps
+from services.job_queue import TERMINAL_STATUSES, job_queue, public_job
 
 # Load environment variables
 load_dotenv()
@@ -39,8 +49,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Negotiated gzip/brotli compression for JSON and NDJSON responses
+app.add_middleware(CompressionMiddleware)
+
 # Security
 security = HTTPBearer()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -50,6 +64,13 @@ MONGO_URL = os.getenv("MONGO_URL")
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM")
 JWT_EXPIRATION_TIME = int(os.getenv("JWT_EXPIRATION_TIME", 1440))
+# Market overview response, encoded once per snapshot version
+overview_body = SnapshotBody()
+
+MARKET_BATCH_MAX_SYMBOLS = int(os.getenv("MARKET_BATCH_MAX_SYMBOLS", 1000))
+CORRELATION_MAX_SYMBOLS = int(os.getenv("CORRELATION_MAX_SYMBOLS", 500))
+# Default latency budget for an AI analysis; slower provider sections complete in the background
+AI_ANALYSIS_DEADLINE_SECONDS = float(os.getenv("AI_ANALYSIS_DEADLINE_SECONDS", 10))
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
@@ -67,11 +88,30 @@ try:
     users_collection = db.users
     trades_collection = db.trades
     strategies_collection = db.strategies
+    # MongoDB-backed service stores share this client's connection pool
+    market_data_service.use_database(db)
+    ai_service.use_database(db)
+    job_queue.use_database(db)
     logger.info("Connected to MongoDB successfully")
 except Exception as e:
     logger.error(f"Failed to connect to MongoDB: {e}")
     raise
 
+# Background tasks
+@app.on_event("startup")
+async def start_background_tasks():
+    await market_data_service.start_overview_refresher()
+    job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await market_data_service.stop_overview_refresher()
+    await market_stream_hub.close()
+    await market_data_service.close()
+    strategy_optimizer.close()
+    await job_queue.stop()
+    await ai_service.close()
+
 # Pydantic models
 class UserCreate(BaseModel):
     email: str
@@ -104,11 +144,21 @@ class MarketDataRequest(BaseModel):
     symbol: str
     timeframe: Optional[str] = "1h"
 
+class MarketBatchRequest(BaseModel):
+    symbols: List[str]
+    timeframe: Optional[str] = "1h"
+
+class CorrelationRequest(BaseModel):
+    symbols: List[str]
+    timeframe: Optional[str] = "1h"
+    window: Optional[int] = 100
+
 class AIAnalysisRequest(BaseModel):
     symbol: str
     analysis_type: Optional[str] = "comprehensive"
     include_risk_assessment: Optional[bool] = True
     include_strategy: Optional[bool] = True
+    deadline_ms: Optional[int] = None
 
 class TradingStrategyRequest(BaseModel):
     user_id: str
@@ -117,7 +167,59 @@ class TradingStrategyRequest(BaseModel):
     parameters: Dict[str, Any]
     risk_level: str
 
+class BacktestRequest(BaseModel):
+    symbol: str
+    timeframe: Optional[str] = "1h"
+    start: Optional[str] = None
+    end: Optional[str] = None
+    limit: Optional[int] = 2000
+    initial_capital: Optional[float] = 10000.0
+    parameters: Optional[Dict[str, Any]] = None
+
+class OptimizationRequest(BaseModel):
+    symbol: str
+    timeframe: Optional[str] = "1h"
+    start: Optional[str] = None
+    end: Optional[str] = None
+    limit: Optional[int] = 2000
+    initial_capital: Optional[float] = 10000.0
+    ranges: Dict[str, Any]
+    method: Optional[str] = "grid"
+    trials: Optional[int] = None
+    seed: Optional[int] = None
+    objective: Optional[str] = "sharpe_ratio"
+
+class JobRequest(BaseModel):
+    type: str  # "analysis" or "strategy"
+    payload: Dict[str, Any]
+    priority: Optional[int] = 0
+
 # Helper functions
+def parse_time_param(value: Optional[str]) -> Optional[int]:
+    """Parse an ISO timestamp or epoch milliseconds query value"""
+    if not value:
+        return None
+    try:
+        return to_epoch_ms(int(value) if value.isdigit() else value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Times must be ISO timestamps or epoch milliseconds")
+
+def analysis_document(analysis_id: str, user_id: str, request: AIAnalysisRequest, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """db.analyses record of an orchestrated analysis"""
+    return {
+        "analysis_id": analysis_id,
+        "user_id": user_id,
+        "symbol": request.symbol,
+        "analysis_type": request.analysis_type,
+        "analysis_data": analysis,
+        "timestamp": datetime.utcnow(),
+        "status": analysis["orchestration_status"]
+    }
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Event with a JSON payload"""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -380,7 +482,12 @@ async def get_ai_status():
         return {
             "status": "success",
             "timestamp": datetime.utcnow().isoformat(),
-            "ai_systems": status
+            "ai_systems": status,
+            "response_cache": ai_service.response_cache.stats(),
+            "orchestrations": ai_service.orchestrations.stats(),
+            "rate_limits": {name: limiter.stats() for name, limiter in ai_service.rate_limiters.items()},
+            "circuit_breakers": {name: breaker.stats() for name, breaker in ai_service.circuit_breakers.items()},
+            "hedged_requests": ai_service.hedges
         }
     except Exception as e:
         logger.error(f"Failed to get AI status: {e}")
@@ -391,23 +498,77 @@ async def get_market_data(request: MarketDataRequest):
     """Get market data for a symbol"""
     try:
         market_data = await market_data_service.get_market_data(request.symbol, request.timeframe)
-        return {
+        return FastJSONResponse({
             "status": "success",
             "data": market_data
-        }
+        })
     except Exception as e:
         logger.error(f"Failed to get market data: {e}")
         raise HTTPException(status_code=500, detail="Failed to get market data")
 
+@app.post("/api/market/batch")
+async def get_market_data_batch(request: MarketBatchRequest):
+    """Stream market data for many symbols as NDJSON, one line per symbol as it completes
+
+    The final line is a summary with "type": "summary".
+    """
+    symbols = list(dict.fromkeys(symbol.strip() for symbol in request.symbols if symbol.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(symbols) > MARKET_BATCH_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MARKET_BATCH_MAX_SYMBOLS} symbols per batch")
+    if request.timeframe not in TIMEFRAME_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe: {request.timeframe}")
+    
+    async def ndjson():
+        started = datetime.utcnow()
+        successful = 0
+        async for result in market_data_service.stream_multiple_symbols(symbols, request.timeframe):
+            successful += result["status"] == "success"
+            yield dumps(result) + b"\n"
+        yield dumps({
+            "type": "summary",
+            "timestamp": datetime.utcnow().isoformat(),
+            "successful_symbols": successful,
+            "failed_symbols": len(symbols) - successful,
+            "elapsed_seconds": round((datetime.utcnow() - started).total_seconds(), 3)
+        }) + b"\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.post("/api/market/correlation")
+async def get_correlation_matrix(request: CorrelationRequest):
+    """Get rolling return correlation and covariance matrices for a set of symbols"""
+    symbols = list(dict.fromkeys(symbol.strip() for symbol in request.symbols if symbol.strip()))
+    if len(symbols) < 2:
+        raise HTTPException(status_code=400, detail="At least two symbols are required")
+    if len(symbols) > CORRELATION_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {CORRELATION_MAX_SYMBOLS} symbols per matrix")
+    if request.timeframe not in TIMEFRAME_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe: {request.timeframe}")
+    if not 2 <= request.window <= 5000:
+        raise HTTPException(status_code=400, detail="window must be between 2 and 5000 periods")
+    
+    matrix = await correlation_service.get_correlation_matrix(symbols, request.timeframe, request.window)
+    if matrix.get("status") == "error":
+        raise HTTPException(status_code=422, detail=matrix["error"])
+    return FastJSONResponse({
+        "status": "success",
+        "data": matrix
+    })
+
 @app.get("/api/market/overview")
-async def get_market_overview():
-    """Get market overview"""
+async def get_market_overview(request: Request):
+    """Get market overview, answering 304 while the client holds the current snapshot"""
     try:
         overview = await market_data_service.get_market_overview()
-        return {
+        overview_body.update(overview["snapshot_version"], lambda: {
             "status": "success",
             "data": overview
-        }
+        })
+        # Age varies per request, so it stays out of the cached body
+        age = market_data_service.overview_age()
+        return overview_body.response(request, {"Age": str(int(age))} if age is not None else None)
     except Exception as e:
         logger.error(f"Failed to get market overview: {e}")
         raise HTTPException(status_code=500, detail="Failed to get market overview")
@@ -426,6 +587,120 @@ async def get_trending_symbols(market_type: str):
         logger.error(f"Failed to get trending symbols: {e}")
         raise HTTPException(status_code=500, detail="Failed to get trending symbols")
 
+@app.get("/api/market/symbols")
+async def search_symbols(q: str = "", limit: int = 10, asset_class: Optional[str] = None):
+    """Search instruments by symbol, alias or name with prefix and typo-tolerant matching"""
+    limit = max(1, min(limit, 100))
+    return {
+        "status": "success",
+        "query": q,
+        "results": market_data_service.search_symbols(q, limit, asset_class)
+    }
+
+@app.get("/api/market/providers")
+async def get_market_providers():
+    """Get market data provider routing and connection status"""
+    return {
+        "status": "success",
+        "providers": market_data_service.get_provider_status()
+    }
+
+@app.get("/api/market/cache/stats")
+async def get_market_cache_stats():
+    """Get market data cache hit/miss/eviction counters"""
+    return {
+        "status": "success",
+        "cache": market_data_service.get_cache_stats()
+    }
+
+@app.get("/api/market/history")
+async def get_market_history(symbol: str, timeframe: str = "1h", start: Optional[str] = None,
+                             end: Optional[str] = None, limit: int = 500):
+    """Get stored candles for a time range
+
+    start and end accept ISO timestamps or epoch milliseconds; the range is [start, end).
+    """
+    if timeframe not in TIMEFRAME_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe: {timeframe}")
+    start_ms, end_ms = parse_time_param(start), parse_time_param(end)
+    
+    try:
+        candles = await market_data_service.get_candle_history(symbol, timeframe, start_ms, end_ms, max(1, min(limit, 5000)))
+        return FastJSONResponse({
+            "status": "success",
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "count": len(candles),
+            "candles": candles.to_rows()
+        })
+    except Exception as e:
+        logger.error(f"Failed to get market history for {symbol}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get market history")
+
+@app.get("/api/market/store/stats")
+async def get_candle_store_stats():
+    """Get candle store backend and usage"""
+    return {
+        "status": "success",
+        "store": market_data_service.get_candle_store_stats()
+    }
+
+@app.websocket("/api/market/stream")
+async def market_stream(websocket: WebSocket):
+    """Stream live ticks and candles for subscribed symbols
+
+    Clients send {"action": "subscribe" | "unsubscribe", "symbol": "BTC", "timeframe": "1h"}.
+    Initial subscriptions can also be passed as ?symbols=BTC,ETH&timeframe=1h.
+    """
+    await websocket.accept()
+    connection = market_stream_hub.connect()
+    sender = asyncio.create_task(market_stream_hub.pump(connection, websocket.send_text))
+    
+    async def handle(action: str, symbol: Optional[str], timeframe: str):
+        if not symbol:
+            connection.offer(json.dumps({"type": "error", "detail": "symbol is required"}))
+            return
+        try:
+            if action == "subscribe":
+                await market_stream_hub.subscribe(connection, symbol, timeframe)
+                connection.offer(json.dumps({"type": "subscribed", "symbol": symbol, "timeframe": timeframe}))
+            elif action == "unsubscribe":
+                await market_stream_hub.unsubscribe(connection, symbol, timeframe)
+                connection.offer(json.dumps({"type": "unsubscribed", "symbol": symbol, "timeframe": timeframe}))
+            else:
+                connection.offer(json.dumps({"type": "error", "detail": f"Unknown action: {action}"}))
+        except ValueError as e:
+            connection.offer(json.dumps({"type": "error", "detail": str(e)}))
+    
+    try:
+        timeframe = websocket.query_params.get("timeframe", "1h")
+        for symbol in filter(None, websocket.query_params.get("symbols", "").split(",")):
+            await handle("subscribe", symbol.strip(), timeframe)
+        
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                connection.offer(json.dumps({"type": "error", "detail": "Invalid JSON message"}))
+                continue
+            await handle(message.get("action"), message.get("symbol"), message.get("timeframe", "1h"))
+            
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Market stream connection failed: {e}")
+    finally:
+        sender.cancel()
+        await market_stream_hub.disconnect(connection)
+
+@app.get("/api/market/stream/stats")
+async def get_market_stream_stats():
+    """Get market stream fan-out counters"""
+    return {
+        "status": "success",
+        "stream": market_stream_hub.stats()
+    }
+
 @app.post("/api/ai/analyze")
 async def analyze_symbol(request: AIAnalysisRequest, current_user: dict = Depends(get_current_user)):
     """Analyze a symbol using AI"""
@@ -436,63 +711,127 @@ async def analyze_symbol(request: AIAnalysisRequest, current_user: dict = Depend
         if market_data["status"] != "success":
             raise HTTPException(status_code=400, detail="Failed to fetch market data")
         
-        # Perform AI analysis
-        analysis = await ai_service.orchestrate_analysis(request.symbol, market_data["data"])
+        analysis_id = str(uuid.uuid4())
+        deadline = AI_ANALYSIS_DEADLINE_SECONDS if request.deadline_ms is None else max(request.deadline_ms, 0) / 1000
         
-        # Store analysis in database
-        analysis_doc = {
-            "user_id": current_user["user_id"],
-            "symbol": request.symbol,
-            "analysis_type": request.analysis_type,
-            "analysis_data": analysis,
-            "timestamp": datetime.utcnow(),
-            "status": "completed"
-        }
+        async def store_late_section(section: str, result: Optional[Dict[str, Any]], last: bool):
+            update = {f"analysis_data.{section}": result}
+            if last:
+                update.update({
+                    "analysis_data.orchestration_status": "completed",
+                    "status": "completed",
+                    "completed_at": datetime.utcnow()
+                })
+            db.analyses.update_one(
+                {"analysis_id": analysis_id},
+                {"$set": update, "$pull": {"analysis_data.pending_sections": section}}
+            )
         
-        db.analyses.insert_one(analysis_doc)
+        # Perform AI analysis within the latency budget, hedging slow provider requests since the caller is waiting
+        analysis = await ai_service.orchestrate_analysis(
+            request.symbol, market_data["data"], market_data["timeframe"], hedge=True,
+            deadline=deadline, on_late_section=store_late_section
+        )
         
-        return {
+        # Store analysis in database; pending sections are filled in as they finish
+        db.analyses.insert_one(analysis_document(analysis_id, current_user["user_id"], request, analysis))
+        
+        return FastJSONResponse({
             "status": "success",
+            "analysis_id": analysis_id,
             "analysis": analysis
-        }
+        })
         
     except Exception as e:
         logger.error(f"Failed to analyze symbol: {e}")
         raise HTTPException(status_code=500, detail="Failed to analyze symbol")
 
+@app.post("/api/ai/analyze/stream")
+async def analyze_symbol_stream(request: AIAnalysisRequest, current_user: dict = Depends(get_current_user)):
+    """Analyze a symbol using AI, streaming provider output as Server-Sent Events
+
+    Emits "token" events with text deltas per section, a "section" event as each
+    structured section completes, and a final "complete" event with the stored analysis.
+    """
+    market_data = await market_data_service.get_market_data(request.symbol)
+    if market_data["status"] != "success":
+        raise HTTPException(status_code=400, detail="Failed to fetch market data")
+    
+    async def events():
+        stream = ai_service.stream_analysis(request.symbol, market_data["data"], market_data["timeframe"])
+        async for event in stream:
+            name = event.pop("event")
+            if name == "complete":
+                event["analysis_id"] = str(uuid.uuid4())
+                try:
+                    db.analyses.insert_one(
+                        analysis_document(event["analysis_id"], current_user["user_id"], request, event["analysis"])
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to store streamed analysis: {e}")
+            yield sse_event(name, event)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/ai/analysis/{analysis_id}")
+async def get_analysis(analysis_id: str, current_user: dict = Depends(get_current_user)):
+    """Get a stored analysis, including sections completed after the response was sent"""
+    analysis = db.analyses.find_one(
+        {"analysis_id": analysis_id, "user_id": current_user["user_id"]},
+        {"_id": 0}
+    )
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    return FastJSONResponse({
+        "status": "success",
+        "analysis": analysis
+    })
+
+async def generate_trading_strategy(request: TradingStrategyRequest, user_id: str) -> Dict[str, Any]:
+    """Generate a strategy with AI and save it for the user"""
+    market_conditions = {
+        "risk_level": request.risk_level,
+        "strategy_type": request.strategy_type,
+        "parameters": request.parameters
+    }
+    
+    strategy = await ai_service.generate_strategy_gemini(market_conditions)
+    
+    if not strategy:
+        raise RuntimeError("Failed to generate strategy")
+    
+    # Save strategy to database
+    strategy_id = str(uuid.uuid4())
+    strategy_doc = {
+        "strategy_id": strategy_id,
+        "user_id": user_id,
+        "strategy_name": request.strategy_name,
+        "strategy_type": request.strategy_type,
+        "parameters": request.parameters,
+        "ai_generated_strategy": strategy.to_dict(),
+        "status": "active",
+        "created_at": datetime.utcnow(),
+        "last_updated": datetime.utcnow()
+    }
+    
+    strategies_collection.insert_one(strategy_doc)
+    
+    return {"strategy_id": strategy_id, "strategy": strategy.to_dict()}
+
 @app.post("/api/trading/strategy")
 async def create_trading_strategy(request: TradingStrategyRequest, current_user: dict = Depends(get_current_user)):
     """Create a new trading strategy"""
     try:
-        # Generate strategy using AI
-        market_conditions = {
-            "risk_level": request.risk_level,
-            "strategy_type": request.strategy_type,
-            "parameters": request.parameters
-        }
-        
-        strategy = await ai_service.generate_strategy_gemini(market_conditions)
-        
-        if not strategy:
-            raise HTTPException(status_code=500, detail="Failed to generate strategy")
-        
-        # Save strategy to database
-        strategy_doc = {
-            "user_id": current_user["user_id"],
-            "strategy_name": request.strategy_name,
-            "strategy_type": request.strategy_type,
-            "parameters": request.parameters,
-            "ai_generated_strategy": strategy.__dict__,
-            "status": "active",
-            "created_at": datetime.utcnow(),
-            "last_updated": datetime.utcnow()
-        }
-        
-        strategies_collection.insert_one(strategy_doc)
+        created = await generate_trading_strategy(request, current_user["user_id"])
         
         return {
             "status": "success",
-            "strategy": strategy.__dict__,
+            **created,
             "message": "Trading strategy created successfully"
         }
         
@@ -519,6 +858,112 @@ async def get_user_strategies(current_user: dict = Depends(get_current_user)):
         logger.error(f"Failed to get user strategies: {e}")
         raise HTTPException(status_code=500, detail="Failed to get user strategies")
 
+@app.post("/api/trading/strategy/{strategy_id}/backtest")
+async def backtest_trading_strategy(strategy_id: str, request: BacktestRequest, current_user: dict = Depends(get_current_user)):
+    """Backtest a stored trading strategy against historical candles"""
+    if request.timeframe not in TIMEFRAME_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe: {request.timeframe}")
+    start_ms, end_ms = parse_time_param(request.start), parse_time_param(request.end)
+    
+    strategy_doc = strategies_collection.find_one(
+        {"strategy_id": strategy_id, "user_id": current_user["user_id"]},
+        {"_id": 0}
+    )
+    if not strategy_doc:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    
+    try:
+        result = await backtest_service.backtest_strategy(
+            strategy_doc, request.symbol, request.timeframe, start_ms, end_ms,
+            max(2, min(request.limit, 100000)), request.initial_capital, request.parameters
+        )
+        if result["status"] == "error":
+            raise HTTPException(status_code=422, detail=result["error"])
+        
+        # Keep a record of the run and its headline metrics on the strategy
+        backtest_id = str(uuid.uuid4())
+        db.backtests.insert_one({
+            "backtest_id": backtest_id,
+            "strategy_id": strategy_id,
+            "user_id": current_user["user_id"],
+            "symbol": request.symbol,
+            "timeframe": request.timeframe,
+            "start": result["start"],
+            "end": result["end"],
+            "parameters": result["parameters"],
+            "metrics": result["metrics"],
+            "created_at": datetime.utcnow()
+        })
+        strategies_collection.update_one(
+            {"strategy_id": strategy_id},
+            {"$set": {"last_backtest": {"backtest_id": backtest_id, **result["metrics"]}, "last_updated": datetime.utcnow()}}
+        )
+        
+        return {
+            "status": "success",
+            "backtest_id": backtest_id,
+            "backtest": result
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to backtest strategy: {e}")
+        raise HTTPException(status_code=500, detail="Failed to backtest strategy")
+
+@app.post("/api/trading/strategy/{strategy_id}/optimize")
+async def optimize_trading_strategy(strategy_id: str, request: OptimizationRequest, current_user: dict = Depends(get_current_user)):
+    """Sweep a stored strategy's parameters, streaming each trial as NDJSON as it completes
+
+    The final line is a summary with "type": "summary" ranking trials by the objective metric.
+    """
+    if request.timeframe not in TIMEFRAME_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe: {request.timeframe}")
+    start_ms, end_ms = parse_time_param(request.start), parse_time_param(request.end)
+    try:
+        trials = build_trials(request.ranges, request.method, request.trials, request.seed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    strategy_doc = strategies_collection.find_one(
+        {"strategy_id": strategy_id, "user_id": current_user["user_id"]},
+        {"_id": 0}
+    )
+    if not strategy_doc:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    
+    spec = strategy_spec(strategy_doc)
+    candles = await market_data_service.get_candle_history(
+        request.symbol, request.timeframe, start_ms, end_ms, max(2, min(request.limit, 100000))
+    )
+    if len(candles) < 2:
+        raise HTTPException(status_code=422, detail="Not enough candle history to optimize")
+    
+    async def ndjson():
+        sweep = strategy_optimizer.sweep(
+            candles, spec, trials, request.timeframe, request.initial_capital, request.objective
+        )
+        async for result in sweep:
+            if result["type"] == "summary":
+                # Keep the ranked outcome alongside the strategy's backtests
+                result["optimization_id"] = str(uuid.uuid4())
+                try:
+                    db.optimizations.insert_one({
+                        **result,
+                        "strategy_id": strategy_id,
+                        "user_id": current_user["user_id"],
+                        "symbol": request.symbol,
+                        "timeframe": request.timeframe,
+                        "method": request.method,
+                        "ranges": request.ranges,
+                        "created_at": datetime.utcnow()
+                    })
+                except Exception as e:
+                    logger.error(f"Failed to store optimization results: {e}")
+            yield dumps(result) + b"\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
 @app.post("/api/ai/risk-assessment")
 async def assess_trading_risk(trading_data: Dict[str, Any], current_user: dict = Depends(get_current_user)):
     """Assess trading risk using AI"""
@@ -532,23 +977,117 @@ async def assess_trading_risk(trading_data: Dict[str, Any], current_user: dict =
         risk_doc = {
             "user_id": current_user["user_id"],
             "trading_data": trading_data,
-            "risk_assessment": risk_assessment.__dict__,
+            "risk_assessment": risk_assessment.to_dict(),
             "timestamp": datetime.utcnow()
         }
         
         db.risk_assessments.insert_one(risk_doc)
         
-        return {
+        return FastJSONResponse({
             "status": "success",
-            "risk_assessment": risk_assessment.__dict__
-        }
+            "risk_assessment": risk_assessment
+        })
         
     except Exception as e:
         logger.error(f"Failed to assess trading risk: {e}")
         raise HTTPException(status_code=500, detail="Failed to assess trading risk")
 
+# Background jobs
+async def run_analysis_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    request = AIAnalysisRequest(**job["payload"])
+    market_data = await market_data_service.get_market_data(request.symbol)
+    if market_data["status"] != "success":
+        raise RuntimeError("Failed to fetch market data")
+    
+    # Hedged like the synchronous endpoint so a job joins an analysis already running for the same snapshot;
+    # with no deadline it still waits for every section
+    analysis = await ai_service.orchestrate_analysis(
+        request.symbol, market_data["data"], market_data["timeframe"], hedge=True
+    )
+    analysis_id = str(uuid.uuid4())
+    db.analyses.insert_one(analysis_document(analysis_id, job["user_id"], request, analysis))
+    return {"analysis_id": analysis_id, "analysis": analysis}
+
+async def run_strategy_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return await generate_trading_strategy(TradingStrategyRequest(**job["payload"]), job["user_id"])
+
+JOB_PAYLOAD_MODELS = {"analysis": AIAnalysisRequest, "strategy": TradingStrategyRequest}
+job_queue.register("analysis", run_analysis_job)
+job_queue.register("strategy", run_strategy_job)
+
+@app.post("/api/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: JobRequest, current_user: dict = Depends(get_current_user)):
+    """Queue an analysis or strategy job, returning its id immediately
+
+    The payload is the body the synchronous endpoint takes. Higher priorities
+    (0-9) run first.
+    """
+    model = JOB_PAYLOAD_MODELS.get(request.type)
+    if model is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported job type: {request.type}")
+    try:
+        payload = model(**request.payload).model_dump()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid {request.type} payload: {e}")
+    
+    try:
+        job = await job_queue.submit(request.type, current_user["user_id"], payload, request.priority or 0)
+    except Exception as e:
+        logger.error(f"Failed to submit job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to submit job")
+    
+    return FastJSONResponse({
+        "status": "success",
+        "job": public_job(job)
+    }, status_code=status.HTTP_202_ACCEPTED)
+
+@app.get("/api/jobs/stats")
+async def get_job_stats(current_user: dict = Depends(get_current_user)):
+    """Get job queue worker and status counters"""
+    return {
+        "status": "success",
+        "jobs": await job_queue.stats()
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Get a job's status, and its result once it has succeeded"""
+    job = await job_queue.get(job_id, current_user["user_id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return FastJSONResponse({
+        "status": "success",
+        "job": public_job(job)
+    })
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Follow a job as Server-Sent Events: a "job" event per change, ending once it finishes"""
+    job = await job_queue.get(job_id, current_user["user_id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        current, last = job, None
+        while True:
+            view = public_job(current)
+            if view != last:
+                yield sse_event("job", view)
+                last = view
+            if view["status"] in TERMINAL_STATUSES:
+                return
+            await job_queue.wait_for_update(job_id)
+            current = await job_queue.get(job_id) or current
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/dashboard/data")
-async def get_dashboard_data(current_user: dict = Depends(get_current_user)):
+async def get_dashboard_data(request: Request, current_user: dict = Depends(get_current_user)):
     """Get comprehensive dashboard data"""
     try:
         # Get user stats
@@ -566,14 +1105,22 @@ async def get_dashboard_data(current_user: dict = Depends(get_current_user)):
             {"_id": 0}
         ).sort("timestamp", -1).limit(5))
         
-        return {
+        # Weak validator: the overview snapshot plus the per-user data, ignoring generation times
+        overview_etag = overview_body.update(market_overview["snapshot_version"], lambda: {
+            "status": "success",
+            "data": market_overview
+        })
+        ai_systems = {name: {k: v for k, v in system.items() if k != "last_updated"} for name, system in ai_status.items()}
+        etag = etag_for(overview_etag.encode() + dumps([user_stats, ai_systems, recent_analyses], sort_keys=True), weak=True)
+        
+        return conditional_json(request, {
             "status": "success",
             "user_stats": user_stats,
             "ai_status": ai_status,
             "market_overview": market_overview,
             "recent_analyses": recent_analyses,
             "timestamp": datetime.utcnow().isoformat()
-        }
+        }, etag)
         
     except Exception as e:
         logger.error(f"Failed to get dashboard data: {e}")
@@ -7,22 +7,67 @@ import os
 from dotenv import load_dotenv
 import json
 import asyncio
-from typing import Dict, List, Optional, Any
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any
 from datetime import datetime
 import logging
 from dataclasses import dataclass
 import openai
 import anthropic
 import google.generativeai as genai
-import httpx
+
+from services.circuit_breaker import CircuitBreaker, hedged
+from services.llm_cache import build_llm_cache
+from services.market_cache import TTLCache
+from services.rate_limiter import ProviderLimiter
+from services.serialization import ResultRecord, dumps
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class MarketAnalysis:
+# Threads for provider SDK calls that have no async variant
+AI_BLOCKING_WORKERS = int(os.getenv("AI_BLOCKING_WORKERS", 8))
+
+OPENAI_MODEL = "gpt-4"
+CLAUDE_MODEL = "claude-3-sonnet-20240229"
+CLAUDE_COMPLETIONS_MODEL = "claude-2"
+GEMINI_MODEL = "gemini-1.5-pro"
+
+# Alternate models raced against a primary that runs past its p95 on latency-sensitive calls;
+# set one empty to disable hedging for that provider
+OPENAI_HEDGE_MODEL = os.getenv("OPENAI_HEDGE_MODEL", "gpt-3.5-turbo")
+CLAUDE_HEDGE_MODEL = os.getenv("CLAUDE_HEDGE_MODEL", "claude-3-haiku-20240307")
+CLAUDE_COMPLETIONS_HEDGE_MODEL = "claude-instant-1.2"
+GEMINI_HEDGE_MODEL = os.getenv("GEMINI_HEDGE_MODEL", "gemini-1.0-pro")
+
+# Rough prompt size in tokens for rate limiting, and the output budget assumed for Gemini
+CHARS_PER_TOKEN = 4
+GEMINI_OUTPUT_TOKENS = 1024
+
+# Upper bound on how long a running orchestration is shared; it is dropped as soon as it finishes
+ORCHESTRATION_MAX_SECONDS = 600
+
+# Bump a template's version whenever its prompt changes so cached responses are not reused
+PROMPT_TEMPLATE_VERSIONS = {
+    "market_analysis": 1,
+    "risk_assessment": 1,
+    "trading_strategy": 1
+}
+
+
+def _is_json(text: str) -> bool:
+    """Whether a response parses, so replies that fell back to defaults are not cached"""
+    try:
+        json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        return False
+    return True
+
+@dataclass(slots=True)
+class MarketAnalysis(ResultRecord):
     """Market analysis result structure"""
     symbol: str
     analysis_type: str
@@ -34,8 +79,8 @@ class MarketAnalysis:
     ai_provider: str
     raw_data: Dict[str, Any]
 
-@dataclass
-class RiskAssessment:
+@dataclass(slots=True)
+class RiskAssessment(ResultRecord):
     """Risk assessment result structure"""
     risk_level: str
     risk_score: float
@@ -44,8 +89,8 @@ class RiskAssessment:
     timestamp: datetime
     ai_provider: str
 
-@dataclass
-class TradingStrategy:
+@dataclass(slots=True)
+class TradingStrategy(ResultRecord):
     """Trading strategy structure"""
     strategy_name: str
     strategy_type: str
@@ -64,7 +109,20 @@ class AIService:
         self.openai_client = self._setup_openai()
         self.claude_client = self._setup_claude()
         self.gemini_client = self._setup_gemini()
+        self.gemini_hedge_client = self._setup_gemini(GEMINI_HEDGE_MODEL) if self.gemini_client and GEMINI_HEDGE_MODEL else None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.rate_limiters = {name: ProviderLimiter.from_env(name) for name in ("openai", "claude", "gemini")}
+        self.circuit_breakers = {name: CircuitBreaker(name) for name in ("openai", "claude", "gemini")}
+        self.hedges = {name: {"fired": 0, "won": 0} for name in ("openai", "claude", "gemini")}
+        self.response_cache = build_llm_cache()
+        # Section tasks of running orchestrations, shared by every caller analyzing the same market snapshot
+        self.orchestrations = TTLCache(max_entries=1024, default_ttl=ORCHESTRATION_MAX_SECONDS)
+        self._late_deliveries = set()
         
+    def use_database(self, db):
+        """Keep MongoDB-backed cached responses in the application's database"""
+        self.response_cache = build_llm_cache(db=db)
+    
     def _setup_openai(self):
         """Setup OpenAI client"""
         try:
@@ -73,7 +131,8 @@ class AIService:
                 logger.warning("OpenAI API key not found - OpenAI services will be disabled")
                 return None
             
-            client = openai.OpenAI(api_key=api_key)
+            # Rate limit retries are coordinated by the provider limiter instead of per request
+            client = openai.AsyncOpenAI(api_key=api_key, max_retries=0)
             logger.info("OpenAI client initialized successfully")
             return client
         except Exception as e:
@@ -88,14 +147,14 @@ class AIService:
                 logger.warning("Claude API key not found - Claude services will be disabled")
                 return None
             
-            client = anthropic.Anthropic(api_key=api_key)
+            client = anthropic.AsyncAnthropic(api_key=api_key, max_retries=0)
             logger.info("Claude client initialized successfully")
             return client
         except Exception as e:
             logger.error(f"Failed to initialize Claude client: {e}")
             return None
     
-    def _setup_gemini(self):
+    def _setup_gemini(self, model_name: str = GEMINI_MODEL):
         """Setup Gemini client"""
         try:
             api_key = os.getenv("GEMINI_API_KEY")
@@ -104,18 +163,84 @@ class AIService:
                 return None
             
             genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-pro')  # Updated model name
-            logger.info("Gemini client initialized successfully")
+            model = genai.GenerativeModel(model_name)
+            logger.info(f"Gemini client initialized successfully ({model_name})")
             return model
         except Exception as e:
             logger.error(f"Failed to initialize Gemini client: {e}")
             return None
     
-    async def analyze_market_openai(self, symbol: str, market_data: Dict[str, Any]) -> Optional[MarketAnalysis]:
-        """Analyze market using OpenAI GPT"""
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a synchronous SDK call on the bounded provider thread pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=AI_BLOCKING_WORKERS, thread_name_prefix="ai-provider")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+    
+    async def _provider_call(self, provider: str, request: Callable[[], Awaitable[Any]],
+                             estimated_tokens: int) -> Any:
+        """Send a request through the provider's rate limiter and circuit breaker"""
+        breaker = self.circuit_breakers[provider]
+        return await self.rate_limiters[provider].call(lambda: breaker.call(request), estimated_tokens)
+    
+    async def _generate(self, provider: str, generate: Callable[[str], Awaitable[Any]],
+                        model: str, hedge_model: Optional[str], hedge: bool) -> Any:
+        """Generate with model, hedging with hedge_model once the request outlives the provider's p95"""
+        async def alternate():
+            self.hedges[provider]["fired"] += 1
+            return await generate(hedge_model)
+        
+        result, hedge_won = await hedged(
+            lambda: generate(model),
+            alternate if hedge and hedge_model else None,
+            self.circuit_breakers[provider].hedge_delay()
+        )
+        if hedge_won:
+            self.hedges[provider]["won"] += 1
+        return result
+    
+    async def _stream_call(self, provider: str, deltas: Callable[[], AsyncIterator[Optional[str]]],
+                           on_token: Callable[[str], None], prompt: str, estimated_tokens: int) -> str:
+        """Stream a response through the provider's limits, settling its token budget afterwards"""
+        # The whole stream runs inside the limiter slot and breaker timing, like a buffered call
+        text = await self._provider_call(provider, lambda: self._stream_text(deltas(), on_token), estimated_tokens)
+        # Streams in these SDK versions report no usage, so count tokens the way requests are estimated
+        self.rate_limiters[provider].settle(estimated_tokens, (len(prompt) + len(text)) // CHARS_PER_TOKEN)
+        return text
+    
+    async def _stream_text(self, deltas: AsyncIterator[Optional[str]], on_token: Callable[[str], None]) -> str:
+        """Forward streamed text deltas to on_token as they arrive, returning the whole text"""
+        parts = []
+        async for text in deltas:
+            if text:
+                parts.append(text)
+                on_token(text)
+        return "".join(parts)
+    
+    async def close(self):
+        """Close provider HTTP connections and the blocking-call pool"""
+        for client in (self.openai_client, self.claude_client):
+            if client is not None:
+                try:
+                    await client.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close AI client: {e}")
+        for delivery in list(self._late_deliveries):
+            delivery.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    async def analyze_market_openai(self, symbol: str, market_data: Dict[str, Any],
+                                    timeframe: Optional[str] = None, hedge: bool = False,
+                                    on_token: Optional[Callable[[str], None]] = None) -> Optional[MarketAnalysis]:
+        """Analyze market using OpenAI GPT, streaming response text to on_token if given"""
         if not self.openai_client:
             logger.error("OpenAI client not available")
             return None
+        if not self.circuit_breakers["openai"].allow():
+            logger.warning("OpenAI circuit open - skipping market analysis")
+            return None
         
         try:
             prompt = f"""
@@ -146,18 +271,44 @@ class AIService:
             }}
             """
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a senior financial analyst specializing in cryptocurrency and stock market analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
+            async def complete(model: str) -> str:
+                estimated = len(prompt) // CHARS_PER_TOKEN + 2000
+                request = dict(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are a senior financial analyst specializing in cryptocurrency and stock market analysis."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=2000
+                )
+                if on_token is not None:
+                    async def deltas():
+                        stream = await self.openai_client.chat.completions.create(**request, stream=True)
+                        async for chunk in stream:
+                            if chunk.choices:
+                                yield chunk.choices[0].delta.content
+                    
+                    return await self._stream_call("openai", deltas, on_token, prompt, estimated)
+                raw = await self._provider_call(
+                    "openai", lambda: self.openai_client.chat.completions.with_raw_response.create(**request), estimated
+                )
+                response = raw.parse()
+                self.rate_limiters["openai"].settle(estimated, response.usage.total_tokens if response.usage else None)
+                return response.choices[0].message.content
+            
+            def generate(model: str):
+                return self.response_cache.get_or_generate(
+                    "openai", model, "market_analysis", PROMPT_TEMPLATE_VERSIONS["market_analysis"],
+                    {"symbol": symbol, "market_data": market_data}, lambda: complete(model), timeframe,
+                    cache_if=_is_json
+                )
+            
+            response_text, generated_at, cached = await self._generate("openai", generate, OPENAI_MODEL, OPENAI_HEDGE_MODEL, hedge)
+            if cached and on_token is not None:
+                on_token(response_text)
             
             # Parse the response
-            response_text = response.choices[0].message.content
             try:
                 analysis_data = json.loads(response_text)
             except json.JSONDecodeError:
@@ -177,7 +328,7 @@ class AIService:
                 confidence=analysis_data.get("confidence", 50) / 100,
                 key_insights=analysis_data.get("key_insights", []),
                 recommendations=analysis_data.get("recommendations", []),
-                timestamp=datetime.utcnow(),
+                timestamp=generated_at,
                 ai_provider="openai",
                 raw_data=analysis_data
             )
@@ -186,11 +337,16 @@ class AIService:
             logger.error(f"OpenAI market analysis failed: {e}")
             return None
     
-    async def assess_risk_claude(self, trading_data: Dict[str, Any]) -> Optional[RiskAssessment]:
-        """Assess risk using Claude"""
+    async def assess_risk_claude(self, trading_data: Dict[str, Any],
+                                 timeframe: Optional[str] = None, hedge: bool = False,
+                                 on_token: Optional[Callable[[str], None]] = None) -> Optional[RiskAssessment]:
+        """Assess risk using Claude, streaming response text to on_token if given"""
         if not self.claude_client:
             logger.error("Claude client not available")
             return self._generate_fallback_risk_assessment(trading_data)
+        if not self.circuit_breakers["claude"].allow():
+            logger.warning("Claude circuit open - using fallback risk assessment")
+            return self._generate_fallback_risk_assessment(trading_data)
         
         try:
             prompt = f"""
@@ -215,26 +371,64 @@ class AIService:
             Provide your assessment in a structured format.
             """
             
-            # Try the new API format first, fall back to older format if needed
-            try:
-                message = self.claude_client.messages.create(
-                    model="claude-3-sonnet-20240229",
-                    max_tokens=1500,
-                    temperature=0.2,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
+            # Use the messages API where the SDK has it, otherwise the older completions API
+            has_messages = hasattr(self.claude_client, "messages")
+            model = CLAUDE_MODEL if has_messages else CLAUDE_COMPLETIONS_MODEL
+            hedge_model = CLAUDE_HEDGE_MODEL if has_messages else CLAUDE_COMPLETIONS_HEDGE_MODEL
+            
+            async def complete(model: str) -> str:
+                estimated = len(prompt) // CHARS_PER_TOKEN + 1500
+                if has_messages:
+                    request = dict(
+                        model=model,
+                        max_tokens=1500,
+                        temperature=0.2,
+                        messages=[
+                            {"role": "user", "content": prompt}
+                        ]
+                    )
+                else:
+                    request = dict(
+                        model=model,
+                        prompt=f"Human: {prompt}\n\nAssistant:",
+                        max_tokens_to_sample=1500,
+                        temperature=0.2
+                    )
+                if on_token is not None:
+                    async def deltas():
+                        if has_messages:
+                            stream = await self.claude_client.messages.create(**request, stream=True)
+                            async for event in stream:
+                                if event.type == "content_block_delta":
+                                    yield event.delta.text
+                        else:
+                            stream = await self.claude_client.completions.create(**request, stream=True)
+                            async for chunk in stream:
+                                yield chunk.completion
+                    
+                    return await self._stream_call("claude", deltas, on_token, prompt, estimated)
+                if has_messages:
+                    raw = await self._provider_call(
+                        "claude", lambda: self.claude_client.messages.with_raw_response.create(**request), estimated
+                    )
+                    message = raw.parse()
+                    usage = getattr(message, "usage", None)
+                    self.rate_limiters["claude"].settle(estimated, usage.input_tokens + usage.output_tokens if usage else None)
+                    return message.content[0].text
+                raw = await self._provider_call(
+                    "claude", lambda: self.claude_client.completions.with_raw_response.create(**request), estimated
                 )
-                response_text = message.content[0].text
-            except AttributeError:
-                # Fallback for older API versions
-                response = self.claude_client.completions.create(
-                    model="claude-2",
-                    prompt=f"Human: {prompt}\n\nAssistant:",
-                    max_tokens_to_sample=1500,
-                    temperature=0.2
+                return raw.parse().completion
+            
+            def generate(model: str):
+                return self.response_cache.get_or_generate(
+                    "claude", model, "risk_assessment", PROMPT_TEMPLATE_VERSIONS["risk_assessment"],
+                    trading_data, lambda: complete(model), timeframe
                 )
-                response_text = response.completion
+            
+            response_text, generated_at, cached = await self._generate("claude", generate, model, hedge_model, hedge)
+            if cached and on_token is not None:
+                on_token(response_text)
             
             # Extract risk information from response
             risk_level = "medium"
@@ -255,7 +449,7 @@ class AIService:
                 risk_score=risk_score,
                 risk_factors=risk_factors,
                 mitigation_strategies=mitigation_strategies,
-                timestamp=datetime.utcnow(),
+                timestamp=generated_at,
                 ai_provider="claude"
             )
             
@@ -294,11 +488,16 @@ class AIService:
             ai_provider="fallback"
         )
     
-    async def generate_strategy_gemini(self, market_conditions: Dict[str, Any]) -> Optional[TradingStrategy]:
-        """Generate trading strategy using Gemini"""
+    async def generate_strategy_gemini(self, market_conditions: Dict[str, Any],
+                                       timeframe: Optional[str] = None, hedge: bool = False,
+                                       on_token: Optional[Callable[[str], None]] = None) -> Optional[TradingStrategy]:
+        """Generate trading strategy using Gemini, streaming response text to on_token if given"""
         if not self.gemini_client:
             logger.error("Gemini client not available")
             return self._generate_fallback_strategy(market_conditions)
+        if not self.circuit_breakers["gemini"].allow():
+            logger.warning("Gemini circuit open - using fallback strategy")
+            return self._generate_fallback_strategy(market_conditions)
         
         try:
             prompt = f"""
@@ -324,8 +523,39 @@ class AIService:
             Provide a detailed strategy suitable for automated execution.
             """
             
-            response = self.gemini_client.generate_content(prompt)
-            response_text = response.text
+            async def complete(model: str) -> str:
+                client = self.gemini_hedge_client if model == GEMINI_HEDGE_MODEL else self.gemini_client
+                estimated = len(prompt) // CHARS_PER_TOKEN + GEMINI_OUTPUT_TOKENS
+                if on_token is not None and hasattr(client, "generate_content_async"):
+                    async def deltas():
+                        stream = await client.generate_content_async(prompt, stream=True)
+                        async for chunk in stream:
+                            yield chunk.text
+                    
+                    return await self._stream_call("gemini", deltas, on_token, prompt, estimated)
+                if hasattr(client, "generate_content_async"):
+                    response = await self._provider_call("gemini", lambda: client.generate_content_async(prompt), estimated)
+                else:
+                    response = await self._provider_call(
+                        "gemini", lambda: self._run_blocking(client.generate_content, prompt), estimated
+                    )
+                usage = getattr(response, "usage_metadata", None)
+                self.rate_limiters["gemini"].settle(estimated, getattr(usage, "total_token_count", None))
+                if on_token is not None:
+                    # No async streaming API in this SDK version; send the text whole
+                    on_token(response.text)
+                return response.text
+            
+            def generate(model: str):
+                return self.response_cache.get_or_generate(
+                    "gemini", model, "trading_strategy", PROMPT_TEMPLATE_VERSIONS["trading_strategy"],
+                    market_conditions, lambda: complete(model), timeframe
+                )
+            
+            hedge_model = GEMINI_HEDGE_MODEL if self.gemini_hedge_client else None
+            response_text, generated_at, cached = await self._generate("gemini", generate, GEMINI_MODEL, hedge_model, hedge)
+            if cached and on_token is not None:
+                on_token(response_text)
             
             # Extract strategy information
             strategy_name = "AI-Generated Strategy"
@@ -348,7 +578,7 @@ class AIService:
                 risk_management=risk_management,
                 expected_return=expected_return,
                 risk_level=risk_level,
-                timestamp=datetime.utcnow(),
+                timestamp=generated_at,
                 ai_provider="gemini"
             )
             
@@ -377,39 +607,146 @@ class AIService:
             ai_provider="fallback"
         )
     
-    async def orchestrate_analysis(self, symbol: str, market_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Orchestrate multi-AI analysis"""
+    async def orchestrate_analysis(self, symbol: str, market_data: Dict[str, Any],
+                                   timeframe: Optional[str] = None, hedge: bool = False,
+                                   deadline: Optional[float] = None,
+                                   on_late_section: Optional[Callable[[str, Optional[Dict[str, Any]], bool], Awaitable[None]]] = None
+                                   ) -> Dict[str, Any]:
+        """Orchestrate multi-AI analysis
+
+        Concurrent calls for the same symbol and market snapshot join one running
+        orchestration instead of each fanning out to every provider. With hedge,
+        provider requests that outlive their p95 are raced against a faster model.
+
+        With a deadline in seconds, sections not ready by then are returned as None
+        and listed in pending_sections. They keep running; on_late_section is awaited
+        with (section, result, whether it was the last) as each one finishes.
+        """
+        snapshot_version = hashlib.blake2b(dumps(market_data, sort_keys=True), digest_size=16).hexdigest()
+        key = (symbol, timeframe, snapshot_version, hedge)
+
+        async def start() -> Dict[str, asyncio.Task]:
+            return self._start_sections(key, symbol, market_data, timeframe, hedge)
+
+        sections = await self.orchestrations.get_or_fetch(key, start, ttl=ORCHESTRATION_MAX_SECONDS)
+        pending = [task for task in sections.values() if not task.done()]
+        if not pending:
+            # Finished before it was cached; serve it this once rather than for the whole TTL
+            self.orchestrations.invalidate(key)
+        if pending and (deadline is None or deadline > 0):
+            # asyncio.wait never cancels, so one caller's deadline leaves the sections running
+            await asyncio.wait(pending, timeout=deadline)
+
+        result = {"symbol": symbol, "timestamp": datetime.utcnow().isoformat(), "pending_sections": []}
+        for name, task in sections.items():
+            if task.done():
+                result[name] = self._section_result(name, task)
+            else:
+                result[name] = None
+                result["pending_sections"].append(name)
+        result["orchestration_status"] = "partial" if result["pending_sections"] else "completed"
+
+        if result["pending_sections"] and on_late_section is not None:
+            delivery = asyncio.ensure_future(
+                self._deliver_late_sections(sections, result["pending_sections"], on_late_section)
+            )
+            self._late_deliveries.add(delivery)
+            delivery.add_done_callback(self._late_deliveries.discard)
+        return result
+    
+    async def stream_analysis(self, symbol: str, market_data: Dict[str, Any],
+                              timeframe: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Run a multi-AI analysis, yielding provider output as it is generated
+
+        Yields "token" events carrying text deltas per section, a "section" event
+        with each structured result as it completes, and finally a "complete" event
+        with the same analysis orchestrate_analysis returns. Streams are not shared
+        between callers or hedged; identical provider requests still share the
+        response cache. Closing the generator cancels any provider stream no other
+        caller is waiting on.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        
+        def forward(section: str) -> Callable[[str], None]:
+            return lambda text: events.put_nowait({"event": "token", "section": section, "text": text})
+        
+        sections = {
+            "market_analysis": asyncio.ensure_future(
+                self.analyze_market_openai(symbol, market_data, timeframe, on_token=forward("market_analysis"))
+            ),
+            "risk_assessment": asyncio.ensure_future(
+                self.assess_risk_claude({"symbol": symbol, "data": market_data}, timeframe,
+                                        on_token=forward("risk_assessment"))
+            ),
+            "trading_strategy": asyncio.ensure_future(
+                self.generate_strategy_gemini({"symbol": symbol, "market_data": market_data}, timeframe,
+                                              on_token=forward("trading_strategy"))
+            )
+        }
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for name, task in sections.items():
+            # Done callbacks run after the task's last token was queued, so each section event follows its text
+            task.add_done_callback(lambda done, name=name: events.put_nowait({"event": "section", "section": name}))
+        
         try:
-            # Run all AI services concurrently
-            tasks = [
-                self.analyze_market_openai(symbol, market_data),
-                self.assess_risk_claude({"symbol": symbol, "data": market_data}),
-                self.generate_strategy_gemini({"symbol": symbol, "market_data": market_data})
-            ]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            market_analysis = results[0] if not isinstance(results[0], Exception) else None
-            risk_assessment = results[1] if not isinstance(results[1], Exception) else None
-            trading_strategy = results[2] if not isinstance(results[2], Exception) else None
-            
-            return {
+            while len(results) < len(sections):
+                event = await events.get()
+                if event["event"] == "section":
+                    event["result"] = results[event["section"]] = self._section_result(event["section"], sections[event["section"]])
+                yield event
+        finally:
+            # A disconnected client stops its provider streams; the response cache
+            # cancels a fetch once its last waiter is gone
+            for task in sections.values():
+                task.cancel()
+        
+        yield {
+            "event": "complete",
+            "analysis": {
                 "symbol": symbol,
                 "timestamp": datetime.utcnow().isoformat(),
-                "market_analysis": market_analysis.__dict__ if market_analysis else None,
-                "risk_assessment": risk_assessment.__dict__ if risk_assessment else None,
-                "trading_strategy": trading_strategy.__dict__ if trading_strategy else None,
+                **{name: results[name] for name in sections},
+                "pending_sections": [],
                 "orchestration_status": "completed"
             }
-            
-        except Exception as e:
-            logger.error(f"AI orchestration failed: {e}")
-            return {
-                "symbol": symbol,
-                "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e),
-                "orchestration_status": "failed"
-            }
+        }
+    
+    def _start_sections(self, key, symbol: str, market_data: Dict[str, Any],
+                        timeframe: Optional[str], hedge: bool) -> Dict[str, asyncio.Task]:
+        """Start every provider concurrently, each as its own task"""
+        sections = {
+            "market_analysis": asyncio.ensure_future(self.analyze_market_openai(symbol, market_data, timeframe, hedge)),
+            "risk_assessment": asyncio.ensure_future(
+                self.assess_risk_claude({"symbol": symbol, "data": market_data}, timeframe, hedge)
+            ),
+            "trading_strategy": asyncio.ensure_future(
+                self.generate_strategy_gemini({"symbol": symbol, "market_data": market_data}, timeframe, hedge)
+            )
+        }
+        # Later callers start a fresh orchestration once this one has fully finished
+        finished = asyncio.gather(*sections.values(), return_exceptions=True)
+        finished.add_done_callback(lambda _: self.orchestrations.invalidate(key))
+        return sections
+    
+    def _section_result(self, name: str, task: asyncio.Task) -> Optional[Dict[str, Any]]:
+        if task.cancelled():
+            return None
+        if task.exception() is not None:
+            logger.error(f"AI orchestration section {name} failed: {task.exception()}")
+            return None
+        return task.result().to_dict() if task.result() else None
+    
+    async def _deliver_late_sections(self, sections: Dict[str, asyncio.Task], pending: List[str],
+                                     on_late_section: Callable[[str, Optional[Dict[str, Any]], bool], Awaitable[None]]):
+        remaining = {sections[name]: name for name in pending}
+        while remaining:
+            done, _ = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = remaining.pop(task)
+                try:
+                    await on_late_section(name, self._section_result(name, task), not remaining)
+                except Exception as e:
+                    logger.error(f"Failed to deliver late AI section {name}: {e}")
     
     async def get_ai_system_status(self) -> Dict[str, Any]:
         """Get status of all AI systems"""
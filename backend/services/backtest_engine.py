@@ -0,0 +1,425 @@
+"""
+Backtesting Engine for SynapseTrade AI™
+Vectorized simulation of stored trading strategies over historical candles
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from services import technical_indicators as ti
+from services.candles import TIMEFRAME_SECONDS, CandleSeries
+from services.market_data_service import MarketDataService, market_data_service
+from services.synthetic_data import SECONDS_PER_YEAR
+
+logger = logging.getLogger(__name__)
+
+# Tunable parameters and their defaults; stored strategy parameters override these
+BACKTEST_DEFAULTS = {
+    "rsi_period": 14,
+    "rsi_oversold": 30.0,
+    "rsi_overbought": 70.0,
+    "fast_period": 12,
+    "slow_period": 26,
+    "macd_signal": 9,
+    "bollinger_period": 20,
+    "bollinger_std": 2.0,
+    "breakout_period": 20,
+    "volume_period": 20,
+    "volume_multiplier": 1.5,
+    "momentum_period": 10,
+    "signal_window": 3,
+    "stop_loss": 0.02,
+    "take_profit": 0.05,
+    "position_size": 0.1,
+    "fee_rate": 0.001,
+    "slippage": 0.0005
+}
+
+# Keywords in free-text signals mapped to (entry rule, exit rule)
+SIGNAL_RULES = [
+    (("rsi", "oversold"), ("rsi_oversold", None)),
+    (("rsi", "overbought"), (None, "rsi_overbought")),
+    (("macd",), ("macd_cross_up", "macd_cross_down")),
+    (("bollinger",), ("bollinger_lower", "bollinger_upper")),
+    (("breakout",), ("breakout", None)),
+    (("volume",), ("volume_spike", None)),
+    (("crossover",), ("ema_cross_up", "ema_cross_down")),
+    (("moving average",), ("ema_cross_up", "ema_cross_down")),
+    (("reversal",), (None, "ema_cross_down")),
+    (("momentum",), ("momentum", None)),
+    (("trend",), ("ema_trend_up", "ema_cross_down"))
+]
+
+# Exits handled by the risk management simulation rather than a signal array
+RISK_EXIT_KEYWORDS = ("stop loss", "profit target", "take profit", "trailing")
+
+# Entry rules used when none of a strategy's entry signals are recognized
+STRATEGY_TYPE_ENTRIES = {
+    "momentum": ["ema_cross_up"],
+    "trend_following": ["ema_cross_up"],
+    "mean_reversion": ["rsi_oversold"],
+    "breakout": ["breakout"],
+    "scalping": ["rsi_oversold"]
+}
+
+MAX_TRADES_RETURNED = 500
+MAX_CURVE_POINTS = 500
+
+
+def parse_signals(signals: List[str], side: int) -> Tuple[List[str], List[str]]:
+    """Map free-text signals to rule names; side 0 is entry, 1 is exit"""
+    rules: List[str] = []
+    unrecognized: List[str] = []
+    for signal in signals or []:
+        text = str(signal).lower()
+        matched = [rule[side] for keywords, rule in SIGNAL_RULES if all(k in text for k in keywords)]
+        matched = [rule for rule in matched if rule]
+        if matched:
+            if matched[0] not in rules:
+                rules.append(matched[0])
+        elif not (side == 1 and any(k in text for k in RISK_EXIT_KEYWORDS)):
+            unrecognized.append(signal)
+    return rules, unrecognized
+
+
+def strategy_spec(strategy_doc: Dict[str, Any], overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Resolve a stored strategy document into signal rules and numeric parameters"""
+    generated = strategy_doc.get("ai_generated_strategy") or {}
+    strategy_type = strategy_doc.get("strategy_type") or generated.get("strategy_type", "momentum")
+
+    params = dict(BACKTEST_DEFAULTS)
+    sources = [generated.get("risk_management") or {}, strategy_doc.get("parameters") or {}, overrides or {}]
+    for source in sources:
+        for key, value in source.items():
+            if key in params and isinstance(value, (int, float)) and not isinstance(value, bool):
+                params[key] = value
+
+    entry_rules, unrecognized_entries = parse_signals(generated.get("entry_signals", []), 0)
+    exit_rules, unrecognized_exits = parse_signals(generated.get("exit_signals", []), 1)
+    if not entry_rules:
+        entry_rules = STRATEGY_TYPE_ENTRIES.get(strategy_type, ["ema_cross_up"])
+
+    return {
+        "strategy_type": strategy_type,
+        "entry_rules": entry_rules,
+        "exit_rules": exit_rules,
+        "signal_mode": (strategy_doc.get("parameters") or {}).get("signal_mode", "all"),
+        "parameters": params,
+        "unrecognized_signals": unrecognized_entries + unrecognized_exits
+    }
+
+
+class SignalBuilder:
+    """Computes boolean signal arrays over one candle series, caching shared indicators"""
+
+    def __init__(self, candles: CandleSeries, params: Dict[str, Any]):
+        self.candles = candles
+        self.params = params
+        self._cache: Dict[Any, np.ndarray] = {}
+
+    def _indicator(self, key: Tuple, compute) -> np.ndarray:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _rsi(self) -> np.ndarray:
+        period = int(self.params["rsi_period"])
+        return self._indicator(("rsi", period), lambda: ti.rsi(self.candles.close, period)[0])
+
+    def _ema(self, span: int) -> np.ndarray:
+        return self._indicator(("ema", span), lambda: ti.ema(self.candles.close, span)[0])
+
+    def _macd_histogram(self) -> np.ndarray:
+        fast, slow, signal = (int(self.params[k]) for k in ("fast_period", "slow_period", "macd_signal"))
+        return self._indicator(
+            ("macd", fast, slow, signal),
+            lambda: ti.macd(self.candles.close, fast, slow, signal)["histogram"][0]
+        )
+
+    def _bollinger(self) -> Dict[str, np.ndarray]:
+        window, num_std = int(self.params["bollinger_period"]), float(self.params["bollinger_std"])
+        upper = self._indicator(("bollinger_upper", window, num_std),
+                                lambda: ti.bollinger_bands(self.candles.close, window, num_std)["upper"][0])
+        lower = self._indicator(("bollinger_lower", window, num_std),
+                                lambda: ti.bollinger_bands(self.candles.close, window, num_std)["lower"][0])
+        return {"upper": upper, "lower": lower}
+
+    @staticmethod
+    def _crosses_above(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        above = a > b
+        return above & ~np.concatenate([[True], above[:-1]])
+
+    def rule(self, name: str) -> np.ndarray:
+        close = self.candles.close
+        if name.startswith("ema_"):
+            fast = self._ema(int(self.params["fast_period"]))
+            slow = self._ema(int(self.params["slow_period"]))
+        with np.errstate(invalid="ignore"):
+            if name == "rsi_oversold":
+                return self._rsi() < self.params["rsi_oversold"]
+            if name == "rsi_overbought":
+                return self._rsi() > self.params["rsi_overbought"]
+            if name == "ema_cross_up":
+                return self._crosses_above(fast, slow)
+            if name == "ema_cross_down":
+                return self._crosses_above(slow, fast)
+            if name == "ema_trend_up":
+                return (fast > slow) & (close > fast)
+            if name == "macd_cross_up":
+                return self._crosses_above(self._macd_histogram(), np.zeros_like(close))
+            if name == "macd_cross_down":
+                return self._crosses_above(np.zeros_like(close), self._macd_histogram())
+            if name == "bollinger_lower":
+                return close < self._bollinger()["lower"]
+            if name == "bollinger_upper":
+                return close > self._bollinger()["upper"]
+            if name == "breakout":
+                period = int(self.params["breakout_period"])
+                prior_high = np.full_like(close, np.inf)
+                if len(close) > period:
+                    windows = np.lib.stride_tricks.sliding_window_view(self.candles.high, period)[:-1]
+                    prior_high[period:] = windows.max(axis=1)
+                return close > prior_high
+            if name == "volume_spike":
+                period = int(self.params["volume_period"])
+                average = ti.rolling_mean(self.candles.volume, period)[0]
+                return self.candles.volume > average * self.params["volume_multiplier"]
+            if name == "momentum":
+                period = int(self.params["momentum_period"])
+                change = np.full_like(close, np.nan)
+                change[period:] = close[period:] / close[:-period] - 1.0
+                return change > 0
+        raise ValueError(f"Unknown signal rule: {name}")
+
+    def combine(self, rules: List[str], mode: str = "all") -> np.ndarray:
+        if not rules:
+            return np.zeros(len(self.candles), dtype=bool)
+        arrays = [self.rule(name) for name in rules]
+        if mode != "all":
+            return np.logical_or.reduce(arrays)
+        if len(arrays) == 1:
+            return arrays[0]
+        # Each condition counts if it fired within the last signal_window bars, so one-bar
+        # events such as crossovers can coincide with the other conditions
+        window = max(int(self.params["signal_window"]), 1)
+        return np.logical_and.reduce([self._recent(array, window) for array in arrays])
+
+    @staticmethod
+    def _recent(array: np.ndarray, window: int) -> np.ndarray:
+        counts = np.cumsum(np.concatenate([[0], array.astype(np.int64)]))
+        return (counts[1:] - counts[np.maximum(np.arange(1, len(counts)) - window, 0)]) > 0
+
+
+def _first_exit(candles: CandleSeries, start: int, stop: float, target: float, exit_signal: np.ndarray) -> Optional[int]:
+    """Index of the first bar from start where the stop, target or exit signal triggers
+
+    Scans growing chunks so a trade's cost is proportional to how long it is held.
+    """
+    size = 64
+    position = start
+    total = len(candles)
+    while position < total:
+        end = min(total, position + size)
+        hits = (candles.low[position:end] <= stop) | (candles.high[position:end] >= target) | exit_signal[position:end]
+        found = np.flatnonzero(hits)
+        if found.size:
+            return position + int(found[0])
+        position = end
+        size *= 2
+    return None
+
+
+def simulate(candles: CandleSeries, entries: np.ndarray, exits: np.ndarray, params: Dict[str, Any],
+             initial_capital: float = 10000.0) -> Dict[str, Any]:
+    """Long-only simulation: enter at the next open, exit on stop, target or exit signal
+
+    When a bar touches both the stop and the target, the stop is assumed to fill first.
+    """
+    total = len(candles)
+    stop_loss, take_profit = float(params["stop_loss"] or 0), float(params["take_profit"] or 0)
+    fraction = float(params["position_size"])
+    fee, slippage = float(params["fee_rate"]), float(params["slippage"])
+
+    signal_bars = np.flatnonzero(entries[:-1])
+    equity = np.empty(total)
+    trades: List[Dict[str, Any]] = []
+    capital = float(initial_capital)
+    cursor = 0
+
+    while True:
+        # The next signal whose following open falls after the previous exit
+        index = int(np.searchsorted(signal_bars, cursor - 1))
+        if index >= len(signal_bars):
+            break
+        entry_bar = int(signal_bars[index]) + 1
+
+        entry_price = float(candles.open[entry_bar]) * (1 + slippage)
+        stop = entry_price * (1 - stop_loss) if stop_loss > 0 else -np.inf
+        target = entry_price * (1 + take_profit) if take_profit > 0 else np.inf
+        exit_bar = _first_exit(candles, entry_bar, stop, target, exits)
+
+        if exit_bar is None:
+            exit_bar, raw_price, reason = total - 1, float(candles.close[-1]), "end_of_data"
+        elif candles.low[exit_bar] <= stop:
+            gap = exit_bar > entry_bar and candles.open[exit_bar] < stop
+            raw_price, reason = float(candles.open[exit_bar] if gap else stop), "stop_loss"
+        elif candles.high[exit_bar] >= target:
+            gap = exit_bar > entry_bar and candles.open[exit_bar] > target
+            raw_price, reason = float(candles.open[exit_bar] if gap else target), "take_profit"
+        else:
+            raw_price, reason = float(candles.close[exit_bar]), "exit_signal"
+        exit_price = raw_price * (1 - slippage)
+
+        notional = capital * fraction
+        units = notional / entry_price
+        entry_fee = notional * fee
+        equity[cursor:entry_bar] = capital
+        equity[entry_bar:exit_bar] = capital - entry_fee + units * (candles.close[entry_bar:exit_bar] - entry_price)
+        pnl = units * (exit_price - entry_price) - entry_fee - units * exit_price * fee
+        trades.append({
+            "entry_time": int(candles.timestamp[entry_bar]),
+            "exit_time": int(candles.timestamp[exit_bar]),
+            "entry_price": round(entry_price, 6),
+            "exit_price": round(exit_price, 6),
+            "units": units,
+            "pnl": pnl,
+            "return": pnl / notional if notional else 0.0,
+            "bars_held": exit_bar - entry_bar + 1,
+            "exit_reason": reason
+        })
+        capital += pnl
+        equity[exit_bar] = capital
+        cursor = exit_bar + 1
+
+    equity[cursor:] = capital
+    return {"equity": equity, "trades": trades}
+
+
+def performance_metrics(equity: np.ndarray, trades: List[Dict[str, Any]], timeframe: str,
+                        initial_capital: float) -> Dict[str, Any]:
+    """Return, risk and trade statistics from an equity curve"""
+    periods_per_year = SECONDS_PER_YEAR / TIMEFRAME_SECONDS[timeframe]
+    returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.zeros(0)
+    peaks = np.maximum.accumulate(equity)
+    drawdown = equity / peaks - 1.0
+
+    volatility = float(returns.std(ddof=1)) if len(returns) > 1 else 0.0
+    downside = returns[returns < 0]
+    downside_dev = float(np.sqrt(np.mean(downside ** 2))) if len(downside) else 0.0
+    total_return = float(equity[-1] / initial_capital - 1.0)
+    years = len(equity) / periods_per_year
+
+    pnls = np.array([trade["pnl"] for trade in trades])
+    gross_profit = float(pnls[pnls > 0].sum()) if len(pnls) else 0.0
+    gross_loss = float(-pnls[pnls < 0].sum()) if len(pnls) else 0.0
+    bars_in_market = sum(trade["bars_held"] for trade in trades)
+
+    # Longest stretch of bars spent below a previous equity peak
+    underwater = np.concatenate([[False], drawdown < 0, [False]]).astype(np.int8)
+    changes = np.flatnonzero(np.diff(underwater))
+    longest_drawdown = int((changes[1::2] - changes[::2]).max()) if len(changes) else 0
+
+    return {
+        "initial_capital": initial_capital,
+        "final_equity": round(float(equity[-1]), 2),
+        "total_return": round(total_return, 6),
+        "annualized_return": round(float((1 + total_return) ** (1 / years) - 1), 6) if years > 0 and total_return > -1 else None,
+        "annualized_volatility": round(float(volatility * np.sqrt(periods_per_year)), 6),
+        "sharpe_ratio": round(float(returns.mean() / volatility * np.sqrt(periods_per_year)), 4) if volatility > 0 else None,
+        "sortino_ratio": round(float(returns.mean() / downside_dev * np.sqrt(periods_per_year)), 4) if downside_dev > 0 else None,
+        "max_drawdown": round(float(drawdown.min()), 6),
+        "max_drawdown_bars": longest_drawdown,
+        "total_trades": len(trades),
+        "win_rate": round(float((pnls > 0).mean()), 4) if len(pnls) else None,
+        "profit_factor": round(gross_profit / gross_loss, 4) if gross_loss > 0 else None,
+        "average_trade_return": round(float(np.mean([t["return"] for t in trades])), 6) if trades else None,
+        "exposure": round(bars_in_market / len(equity), 4) if len(equity) else 0.0
+    }
+
+
+def run_backtest(candles: CandleSeries, spec: Dict[str, Any], timeframe: str = "1h",
+                 initial_capital: float = 10000.0, include_details: bool = True) -> Dict[str, Any]:
+    """Backtest a resolved strategy spec over a candle series"""
+    if len(candles) < 2:
+        raise ValueError("At least two candles are required for a backtest")
+    params = spec["parameters"]
+    signals = SignalBuilder(candles, params)
+    entries = signals.combine(spec["entry_rules"], spec.get("signal_mode", "all"))
+    exits = signals.combine(spec["exit_rules"], "any")
+
+    simulation = simulate(candles, entries, exits, params, initial_capital)
+    equity, trades = simulation["equity"], simulation["trades"]
+    result = {
+        "metrics": performance_metrics(equity, trades, timeframe, initial_capital),
+        "entry_rules": spec["entry_rules"],
+        "exit_rules": spec["exit_rules"],
+        "parameters": params,
+        "unrecognized_signals": spec.get("unrecognized_signals", []),
+        "candles": len(candles),
+        "start": datetime.utcfromtimestamp(candles.timestamp[0] / 1000).isoformat(),
+        "end": datetime.utcfromtimestamp(candles.timestamp[-1] / 1000).isoformat()
+    }
+    if not include_details:
+        return result
+
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    points = np.unique(np.linspace(0, len(equity) - 1, min(MAX_CURVE_POINTS, len(equity))).astype(int))
+    timestamps = np.datetime_as_string(candles.timestamp[points].astype("datetime64[ms]"), unit="s").tolist()
+    result["equity_curve"] = [
+        {"timestamp": ts, "equity": round(float(e), 2), "drawdown": round(float(d), 6)}
+        for ts, e, d in zip(timestamps, equity[points], drawdown[points])
+    ]
+    result["trades"] = [
+        {
+            **trade,
+            "entry_time": datetime.utcfromtimestamp(trade["entry_time"] / 1000).isoformat(),
+            "exit_time": datetime.utcfromtimestamp(trade["exit_time"] / 1000).isoformat(),
+            "units": round(trade["units"], 8),
+            "pnl": round(trade["pnl"], 2),
+            "return": round(trade["return"], 6)
+        }
+        for trade in trades[-MAX_TRADES_RETURNED:]
+    ]
+    result["trades_truncated"] = len(trades) > MAX_TRADES_RETURNED
+    return result
+
+
+class BacktestService:
+    """Loads candle history and runs backtests off the event loop"""
+
+    def __init__(self, service: MarketDataService):
+        self.service = service
+
+    async def backtest_strategy(self, strategy_doc: Dict[str, Any], symbol: str, timeframe: str = "1h",
+                                start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                                limit: int = 2000, initial_capital: float = 10000.0,
+                                parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Backtest a stored strategy document against a symbol's history"""
+        try:
+            spec = strategy_spec(strategy_doc, parameters)
+            candles = await self.service.get_candle_history(symbol, timeframe, start_ms, end_ms, limit)
+            result = await asyncio.to_thread(run_backtest, candles, spec, timeframe, initial_capital)
+            return {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "timestamp": datetime.utcnow().isoformat(),
+                **result,
+                "status": "success"
+            }
+        except Exception as e:
+            logger.error(f"Backtest failed for {symbol}: {e}")
+            return {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "timestamp": datetime.utcnow().isoformat(),
+                "error": str(e),
+                "status": "error"
+            }
+
+
+# Global backtest service instance
+backtest_service = BacktestService(market_data_service)
@@ -0,0 +1,284 @@
+"""
+Candle Store for SynapseTrade AI™
+Persistent historical OHLCV storage with time-range queries
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict, Optional, Any, Tuple
+from urllib.parse import quote
+
+import numpy as np
+from pymongo import UpdateOne
+
+from services.candles import CandleSeries
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Relative CANDLE_STORE_PATH values are resolved against the backend directory, not the cwd
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FILE_STORE_PATH = os.path.join("data", "candles")
+
+COLUMN_DTYPES = {
+    "timestamp": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8")
+}
+
+
+class CandleStore:
+    """Append-only candle history keyed by (symbol, timeframe)
+
+    Only closed candles are stored. Writes ignore candles at or before the last
+    stored timestamp, so re-writing an overlapping window is harmless.
+    """
+
+    backend = "none"
+
+    async def read(self, symbol: str, timeframe: str, start_ms: Optional[int] = None,
+                   end_ms: Optional[int] = None, limit: Optional[int] = None) -> CandleSeries:
+        """Candles with start_ms <= timestamp < end_ms, keeping the newest limit"""
+        return CandleSeries.empty()
+
+    async def write(self, symbol: str, timeframe: str, candles: CandleSeries) -> int:
+        """Append candles newer than the stored history, returning how many were written"""
+        return 0
+
+    async def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        return None
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend}
+
+
+class FileCandleStore(CandleStore):
+    """Memory-mapped, append-only columnar files for single-node deployments
+
+    Each (symbol, timeframe) is a directory holding one raw little-endian file per
+    column. Appends write the price columns before the timestamps, and readers only
+    trust the shortest column, so a crash mid-append never exposes a torn candle.
+    Writers, including other worker processes, hold an exclusive lock on the
+    series while appending.
+    """
+
+    backend = "file"
+
+    def __init__(self, root: str):
+        self.root = root
+        self._maps: Dict[Tuple[str, str], Tuple[int, CandleSeries]] = {}
+        self.appended = 0
+
+    def _directory(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, quote(symbol, safe=""), timeframe)
+
+    def _length(self, directory: str) -> int:
+        lengths = []
+        for column, dtype in COLUMN_DTYPES.items():
+            path = os.path.join(directory, f"{column}.bin")
+            if not os.path.exists(path):
+                return 0
+            lengths.append(os.path.getsize(path) // dtype.itemsize)
+        return min(lengths)
+
+    def _series(self, symbol: str, timeframe: str) -> CandleSeries:
+        """Memory-mapped view of the stored history, remapped only when it grows"""
+        key = (symbol, timeframe)
+        directory = self._directory(symbol, timeframe)
+        length = self._length(directory)
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == length:
+            return cached[1]
+        if not length:
+            return CandleSeries.empty()
+
+        series = CandleSeries(*(
+            np.memmap(os.path.join(directory, f"{column}.bin"), dtype=dtype, mode="r", shape=(length,))
+            for column, dtype in COLUMN_DTYPES.items()
+        ))
+        self._maps[key] = (length, series)
+        return series
+
+    async def read(self, symbol: str, timeframe: str, start_ms: Optional[int] = None,
+                   end_ms: Optional[int] = None, limit: Optional[int] = None) -> CandleSeries:
+        series = self._series(symbol, timeframe).between(start_ms, end_ms)
+        if limit is not None:
+            series = series[-limit:] if limit else series[:0]
+        # Copy out of the maps so callers never hold views into files that may be remapped
+        return CandleSeries(*(np.array(getattr(series, column)) for column in COLUMN_DTYPES))
+
+    async def write(self, symbol: str, timeframe: str, candles: CandleSeries) -> int:
+        if not len(candles.since(await self.last_timestamp(symbol, timeframe))):
+            return 0
+        # The lock may be held by another process, so wait for it off the event loop
+        written = await asyncio.to_thread(self._write, symbol, timeframe, candles)
+        self.appended += written
+        return written
+
+    def _write(self, symbol: str, timeframe: str, candles: CandleSeries) -> int:
+        directory = self._directory(symbol, timeframe)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, ".lock"), "a") as lock:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another writer may have appended since the unlocked check
+            new = candles.since(self._series(symbol, timeframe).last_timestamp)
+            if not len(new):
+                return 0
+            length = self._length(directory)
+            # Timestamps go last: they define how many candles are visible
+            for column in (*CandleSeries.__slots__[1:], "timestamp"):
+                path = os.path.join(directory, f"{column}.bin")
+                dtype = COLUMN_DTYPES[column]
+                with open(path, "ab") as handle:
+                    # Drop a torn tail left by an interrupted append before extending
+                    handle.truncate(length * dtype.itemsize)
+                    handle.write(getattr(new, column).astype(dtype).tobytes())
+            return len(new)
+
+    async def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        return self._series(symbol, timeframe).last_timestamp
+
+    async def close(self):
+        self._maps.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "path": self.root,
+            "open_series": len(self._maps),
+            "mapped_candles": sum(length for length, _ in self._maps.values()),
+            "appended_candles": self.appended
+        }
+
+
+class MongoCandleStore(CandleStore):
+    """MongoDB collection with one document per candle
+
+    A unique (symbol, timeframe, ts) index and upserts keep concurrent writers,
+    including other worker processes, from storing a candle twice. Writers in one
+    process are also serialized per series so they skip candles already stored.
+    """
+
+    backend = "mongo"
+
+    def __init__(self, db, collection: str = "candle_history"):
+        self.db = db
+        self.collection_name = collection
+        self._collection = None
+        self._last: Dict[Tuple[str, str], Optional[int]] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @property
+    def collection(self):
+        """Create the indexes on first use"""
+        if self._collection is None:
+            collection = self.db[self.collection_name]
+            collection.create_index([("symbol", 1), ("timeframe", 1), ("ts", 1)], unique=True)
+            self._collection = collection
+        return self._collection
+
+    @staticmethod
+    def _query(symbol: str, timeframe: str, start_ms: Optional[int] = None,
+               end_ms: Optional[int] = None) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"symbol": symbol, "timeframe": timeframe}
+        bounds = {}
+        if start_ms is not None:
+            bounds["$gte"] = int(start_ms)
+        if end_ms is not None:
+            bounds["$lt"] = int(end_ms)
+        if bounds:
+            query["ts"] = bounds
+        return query
+
+    def _read(self, symbol: str, timeframe: str, start_ms: Optional[int], end_ms: Optional[int],
+              limit: Optional[int]) -> CandleSeries:
+        cursor = self.collection.find(
+            self._query(symbol, timeframe, start_ms, end_ms),
+            {"_id": 0, "ts": 1, "open": 1, "high": 1, "low": 1, "close": 1, "volume": 1}
+        )
+        if limit is not None:
+            # Newest candles first so the limit keeps the most recent ones
+            docs = list(cursor.sort("ts", -1).limit(limit))[::-1] if limit else []
+        else:
+            docs = list(cursor.sort("ts", 1))
+        return CandleSeries(*([doc[field] for doc in docs] for field in ("ts", *CandleSeries.__slots__[1:])))
+
+    def _lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _write(self, symbol: str, timeframe: str, candles: CandleSeries) -> int:
+        key = (symbol, timeframe)
+        with self._lock(key):
+            # Other processes may have written since this one last looked
+            self._last[key] = self._last_timestamp(symbol, timeframe)
+            new = candles.since(self._last[key])
+            if not len(new):
+                return 0
+
+            columns = [getattr(new, field).tolist() for field in CandleSeries.__slots__]
+            result = self.collection.bulk_write([
+                UpdateOne(
+                    {"symbol": symbol, "timeframe": timeframe, "ts": ts},
+                    {"$setOnInsert": {"open": o, "high": h, "low": l, "close": c, "volume": v}},
+                    upsert=True
+                )
+                for ts, o, h, l, c, v in zip(*columns)
+            ], ordered=False)
+            self._last[key] = new.last_timestamp
+            return result.upserted_count
+
+    def _last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        doc = self.collection.find_one(self._query(symbol, timeframe), {"_id": 0, "ts": 1}, sort=[("ts", -1)])
+        return int(doc["ts"]) if doc else None
+
+    async def read(self, symbol: str, timeframe: str, start_ms: Optional[int] = None,
+                   end_ms: Optional[int] = None, limit: Optional[int] = None) -> CandleSeries:
+        return await asyncio.to_thread(self._read, symbol, timeframe, start_ms, end_ms, limit)
+
+    async def write(self, symbol: str, timeframe: str, candles: CandleSeries) -> int:
+        return await asyncio.to_thread(self._write, symbol, timeframe, candles)
+
+    async def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        key = (symbol, timeframe)
+        if key not in self._last:
+            self._last[key] = await asyncio.to_thread(self._last_timestamp, symbol, timeframe)
+        return self._last[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "collection": self.collection_name, "tracked_series": len(self._last)}
+
+
+def build_candle_store(backend: Optional[str] = None, db=None) -> CandleStore:
+    """Build the candle store selected by CANDLE_STORE (file, mongo or none)
+
+    The mongo backend uses the application's database; until one is given, no
+    history is stored.
+    """
+    backend = (backend or os.getenv("CANDLE_STORE", "none")).lower()
+    try:
+        if backend == "mongo":
+            return MongoCandleStore(db) if db is not None else CandleStore()
+        if backend == "file":
+            return FileCandleStore(os.path.join(BACKEND_DIR, os.getenv("CANDLE_STORE_PATH", DEFAULT_FILE_STORE_PATH)))
+    except Exception as e:
+        logger.error(f"Failed to open {backend} candle store: {e}")
+        return CandleStore()
+    if backend != "none":
+        logger.warning(f"Unknown candle store backend: {backend}")
+    return CandleStore()
@@ -0,0 +1,114 @@
+"""
+Candle Storage Types for SynapseTrade AI™
+Columnar, array-backed OHLCV series with zero-copy slicing
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+TIMEFRAME_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400
+}
+
+
+def to_epoch_ms(value) -> int:
+    """Convert an ISO string, datetime or epoch value into epoch milliseconds"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        return int((value - datetime(1970, 1, 1)).total_seconds() * 1000)
+    return int(value.timestamp() * 1000)
+
+
+class CandleSeries:
+    """Parallel typed arrays of int64 epoch-millisecond timestamps and float64 OHLCV"""
+
+    __slots__ = ("timestamp", "open", "high", "low", "close", "volume")
+
+    def __init__(self, timestamp, open, high, low, close, volume):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        return cls(*([],) * 6)
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "CandleSeries":
+        """Build a series from API-style candle dicts"""
+        return cls(
+            [to_epoch_ms(row["timestamp"]) for row in rows],
+            *([row[field] for row in rows] for field in PRICE_FIELDS)
+        )
+
+    @classmethod
+    def concat(cls, series: List["CandleSeries"]) -> "CandleSeries":
+        if not series:
+            return cls.empty()
+        return cls(*(np.concatenate([getattr(s, name) for s in series]) for name in cls.__slots__))
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, index):
+        """Slices return views over the same buffers; integers return one row dict"""
+        if isinstance(index, slice):
+            return CandleSeries(*(getattr(self, name)[index] for name in self.__slots__))
+        return {
+            "timestamp": int(self.timestamp[index]),
+            **{field: float(getattr(self, field)[index]) for field in PRICE_FIELDS}
+        }
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self.timestamp[-1]) if len(self) else None
+
+    def since(self, timestamp_ms: Optional[int]) -> "CandleSeries":
+        """Return the view of candles strictly newer than a timestamp"""
+        if timestamp_ms is None:
+            return self
+        start = int(np.searchsorted(self.timestamp, timestamp_ms, side="right"))
+        return self[start:]
+
+    def between(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> "CandleSeries":
+        """Return the view of candles with start <= timestamp < end"""
+        lo = 0 if start_ms is None else int(np.searchsorted(self.timestamp, start_ms, side="left"))
+        hi = len(self) if end_ms is None else int(np.searchsorted(self.timestamp, end_ms, side="left"))
+        return self[lo:hi]
+
+    def append(self, other: "CandleSeries") -> "CandleSeries":
+        """Return a new series with other's candles appended"""
+        return CandleSeries.concat([self, other])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Convert to the JSON row format used by the API"""
+        timestamps = np.datetime_as_string(self.timestamp.astype("datetime64[ms]"), unit="s").tolist()
+        columns = [getattr(self, field).tolist() for field in PRICE_FIELDS]
+        return [
+            {"timestamp": ts, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for ts, o, h, l, c, v in zip(timestamps, *columns)
+        ]
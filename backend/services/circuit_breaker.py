@@ -0,0 +1,222 @@
+"""
+Circuit Breaker for SynapseTrade AI™
+Provider health tracking by error rate and latency percentiles, with hedged requests
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from services.rate_limiter import rate_limit_error_headers
+
+logger = logging.getLogger(__name__)
+
+# Outcomes considered: the most recent calls, no older than the window age
+CIRCUIT_WINDOW = int(os.getenv("AI_CIRCUIT_WINDOW", 50))
+CIRCUIT_WINDOW_SECONDS = 300
+# Calls needed in the window before the breaker may trip
+CIRCUIT_MIN_CALLS = int(os.getenv("AI_CIRCUIT_MIN_CALLS", 10))
+CIRCUIT_ERROR_RATE = float(os.getenv("AI_CIRCUIT_ERROR_RATE", 0.5))
+CIRCUIT_P95_SECONDS = float(os.getenv("AI_CIRCUIT_P95_SECONDS", 30))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("AI_CIRCUIT_OPEN_SECONDS", 30))
+HALF_OPEN_PROBES = 1
+
+# Hedge delay before the primary's p95 is known, and the shortest delay allowed
+HEDGE_DEFAULT_DELAY = 10.0
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MIN_SAMPLES = 5
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised when a provider's breaker is not admitting calls"""
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """Whether an error reflects provider health; 429s only reflect our own quota"""
+    return rate_limit_error_headers(error) is None
+
+
+def percentile(values, fraction: float) -> Optional[float]:
+    """Nearest-rank percentile, or None without values"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one provider
+
+    The breaker opens when, over the recent window, the error rate or the p95
+    latency crosses its threshold. While open, calls fail fast with CircuitOpen.
+    After open_seconds a limited number of probe calls are let through: a
+    successful probe closes the breaker with a fresh window, a failed one reopens it.
+    """
+
+    def __init__(self, name: str, window: int = CIRCUIT_WINDOW, min_calls: int = CIRCUIT_MIN_CALLS,
+                 error_rate: float = CIRCUIT_ERROR_RATE, p95_seconds: float = CIRCUIT_P95_SECONDS,
+                 open_seconds: float = CIRCUIT_OPEN_SECONDS,
+                 is_failure: Callable[[Exception], bool] = is_provider_failure,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.p95_threshold = p95_seconds
+        self.open_seconds = open_seconds
+        self.is_failure = is_failure
+        self.clock = clock
+        # (finished at, latency seconds, failed)
+        self.outcomes: Deque[Tuple[float, float, bool]] = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probes = 0
+        self.times_opened = 0
+        self.short_circuited = 0
+        self.abandoned = 0
+
+    def available(self) -> bool:
+        """Whether a call could be admitted now, without claiming a half-open probe"""
+        if self.state == OPEN and self.clock() - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self.probes = 0
+        return self.state == CLOSED or (self.state == HALF_OPEN and self.probes < HALF_OPEN_PROBES)
+
+    def allow(self) -> bool:
+        """available(), counting a refusal as a short-circuited call"""
+        if self.available():
+            return True
+        self.short_circuited += 1
+        return False
+
+    def _acquire(self):
+        if not self.allow():
+            raise CircuitOpen(f"{self.name} circuit is {self.state}")
+        if self.state == HALF_OPEN:
+            self.probes += 1
+
+    async def call(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Run request if the breaker admits it, recording its outcome and latency"""
+        self._acquire()
+        probe = self.state == HALF_OPEN
+        started = self.clock()
+        try:
+            result = await request()
+        except asyncio.CancelledError:
+            # An abandoned call (e.g. the losing side of a hedge) never finished, so it has no latency
+            # to add to the window; an abandoned probe proves nothing and lets another call probe
+            if probe:
+                self.probes -= 1
+            self.abandoned += 1
+            raise
+        except Exception as e:
+            self._record(self.clock() - started, self.is_failure(e), probe)
+            raise
+        self._record(self.clock() - started, False, probe)
+        return result
+
+    def _record(self, latency: float, failed: bool, probe: bool):
+        now = self.clock()
+        if probe:
+            if failed:
+                self._open(now, "probe failed")
+            else:
+                logger.info(f"{self.name} circuit closed")
+                self.state = CLOSED
+                self.outcomes.clear()
+                self.outcomes.append((now, latency, failed))
+            return
+        self.outcomes.append((now, latency, failed))
+        if self.state != CLOSED:
+            return
+        self._prune(now)
+        if len(self.outcomes) < self.min_calls:
+            return
+        error_rate = self.error_rate()
+        p95 = self.latency_percentile(0.95)
+        if error_rate >= self.error_rate_threshold:
+            self._open(now, f"error rate {error_rate:.0%}")
+        elif p95 is not None and p95 >= self.p95_threshold:
+            self._open(now, f"p95 latency {p95:.1f}s")
+
+    def _open(self, now: float, reason: str):
+        logger.warning(f"{self.name} circuit opened: {reason}")
+        self.state = OPEN
+        self.opened_at = now
+        self.times_opened += 1
+
+    def _prune(self, now: float):
+        while self.outcomes and now - self.outcomes[0][0] > CIRCUIT_WINDOW_SECONDS:
+            self.outcomes.popleft()
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, _, failed in self.outcomes if failed) / len(self.outcomes)
+
+    def latency_percentile(self, fraction: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile of recent successful calls"""
+        latencies = [latency for _, latency, failed in self.outcomes if not failed]
+        if len(latencies) < min_samples:
+            return None
+        return percentile(latencies, fraction)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on a primary request before hedging: its recent p95"""
+        p95 = self.latency_percentile(0.95, HEDGE_MIN_SAMPLES)
+        return HEDGE_DEFAULT_DELAY if p95 is None else max(HEDGE_MIN_DELAY, p95)
+
+    def stats(self) -> Dict[str, Any]:
+        self.available()
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        return {
+            "state": self.state,
+            "window_calls": len(self.outcomes),
+            "error_rate": round(self.error_rate(), 4),
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+            "abandoned": self.abandoned
+        }
+
+
+async def hedged(primary: Callable[[], Awaitable[Any]], alternate: Optional[Callable[[], Awaitable[Any]]],
+                 delay: float) -> Tuple[Any, bool]:
+    """Run primary, starting alternate too if primary has not finished after delay
+
+    Returns (first successful result, whether it came from the alternate). The
+    other request is cancelled; an error is raised only if both fail. Requests
+    that share a cached fetch must cancel it once unobserved (TTLCache does),
+    or the loser keeps running underneath.
+    """
+    first = asyncio.ensure_future(primary())
+    tasks = [first]
+    try:
+        if alternate is None:
+            return await first, False
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if first in done and first.exception() is None:
+            return first.result(), False
+        tasks.append(asyncio.ensure_future(alternate()))
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task is not first
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
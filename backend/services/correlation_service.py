@@ -0,0 +1,220 @@
+"""
+Correlation Service for SynapseTrade AI™
+Rolling cross-asset return correlation and covariance matrices
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from services.candles import TIMEFRAME_SECONDS, CandleSeries
+from services.market_cache import TTLCache
+from services.market_data_service import BATCH_CONCURRENCY, MarketDataService, bounded_map, market_data_service
+from services.synthetic_data import SECONDS_PER_YEAR
+
+logger = logging.getLogger(__name__)
+
+# Exact recomputation interval for incremental state, in pushed rows per window length
+RESYNC_WINDOWS = 4
+
+
+def align_closes(series: List[CandleSeries]) -> Tuple[np.ndarray, np.ndarray]:
+    """Closes on the timestamps every series shares, as a (timestamps, periods x symbols) pair"""
+    common = series[0].timestamp
+    for candles in series[1:]:
+        common = np.intersect1d(common, candles.timestamp, assume_unique=True)
+    closes = np.empty((len(common), len(series)), dtype=np.float64)
+    for i, candles in enumerate(series):
+        closes[:, i] = candles.close[np.searchsorted(candles.timestamp, common)]
+    return common, closes
+
+
+class RollingCovariance:
+    """Covariance of the last window return vectors, updated in O(N^2) per new row
+
+    Keeps running sums and cross-products alongside a ring buffer of the rows in the
+    window, and periodically recomputes them exactly to bound floating-point drift.
+    """
+
+    def __init__(self, symbols: List[str], window: int):
+        self.symbols = symbols
+        self.window = window
+        size = len(symbols)
+        self.rows = np.zeros((window, size))
+        self.count = 0
+        self.position = 0
+        self.sum = np.zeros(size)
+        self.cross = np.zeros((size, size))
+        self.last_close: Optional[np.ndarray] = None
+        self.last_timestamp: Optional[int] = None
+        self.pushed_since_resync = 0
+
+    @classmethod
+    def from_closes(cls, symbols: List[str], window: int, timestamps: np.ndarray,
+                    closes: np.ndarray) -> "RollingCovariance":
+        """Build state from aligned closes in one vectorized pass"""
+        state = cls(symbols, window)
+        returns = np.diff(np.log(closes), axis=0)[-window:]
+        state.count = len(returns)
+        state.rows[:state.count] = returns
+        state.position = state.count % window
+        state.last_close = closes[-1].copy()
+        state.last_timestamp = int(timestamps[-1])
+        state._resync()
+        return state
+
+    def push(self, timestamps: np.ndarray, closes: np.ndarray) -> int:
+        """Fold in aligned closes newer than the last timestamp, returning rows added"""
+        new = timestamps > self.last_timestamp
+        if not new.any():
+            return 0
+        closes = np.vstack([self.last_close, closes[new]])
+        for row in np.diff(np.log(closes), axis=0):
+            if self.count == self.window:
+                old = self.rows[self.position]
+                self.sum -= old
+                self.cross -= np.outer(old, old)
+            else:
+                self.count += 1
+            self.rows[self.position] = row
+            self.sum += row
+            self.cross += np.outer(row, row)
+            self.position = (self.position + 1) % self.window
+        self.last_close = closes[-1].copy()
+        self.last_timestamp = int(timestamps[new][-1])
+
+        self.pushed_since_resync += len(closes) - 1
+        if self.pushed_since_resync >= RESYNC_WINDOWS * self.window:
+            self._resync()
+        return len(closes) - 1
+
+    def _resync(self):
+        filled = self.rows[:self.count]
+        self.sum = filled.sum(axis=0)
+        self.cross = filled.T @ filled
+        self.pushed_since_resync = 0
+
+    def covariance(self) -> np.ndarray:
+        n = self.count
+        if n < 2:
+            return np.full((len(self.symbols),) * 2, np.nan)
+        return (self.cross - np.outer(self.sum, self.sum) / n) / (n - 1)
+
+    def correlation(self, covariance: Optional[np.ndarray] = None) -> np.ndarray:
+        covariance = self.covariance() if covariance is None else covariance
+        std = np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(std, std)
+        # Flat series have no defined correlation; report them as uncorrelated
+        correlation = np.nan_to_num(np.clip(correlation, -1.0, 1.0))
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+
+
+class CorrelationService:
+    """Computes and caches correlation matrices per (universe, timeframe, window)"""
+
+    def __init__(self, service: MarketDataService, max_universes: Optional[int] = None):
+        self.service = service
+        self.max_universes = max_universes or int(os.getenv("CORRELATION_MAX_UNIVERSES", 64))
+        self.states: "OrderedDict[Tuple, RollingCovariance]" = OrderedDict()
+        self.cache = TTLCache(max_entries=self.max_universes)
+
+    async def get_correlation_matrix(self, symbols: List[str], timeframe: str = "1h",
+                                     window: int = 100) -> Dict[str, Any]:
+        """Get correlation and covariance of per-period log returns over the last window periods"""
+        try:
+            universe = tuple(sorted(set(symbols)))
+            key = (universe, timeframe, window)
+            return await self.cache.get_or_fetch(
+                key,
+                lambda: self._compute(universe, timeframe, window),
+                ttl=self.service._cache_ttl(timeframe),
+                cache_if=lambda result: result.get("status") == "success"
+            )
+        except Exception as e:
+            logger.error(f"Failed to compute correlation matrix: {e}")
+            return {
+                "timestamp": datetime.utcnow().isoformat(),
+                "error": str(e),
+                "status": "error"
+            }
+
+    async def _compute(self, universe: Tuple[str, ...], timeframe: str, window: int) -> Dict[str, Any]:
+        key = (universe, timeframe, window)
+        state = self.states.get(key)
+        step_ms = TIMEFRAME_SECONDS[timeframe] * 1000
+        # A warm universe only needs candles closed since its last update
+        start_ms = state.last_timestamp + step_ms if state is not None else None
+
+        history: Dict[str, CandleSeries] = {}
+        errors: Dict[str, str] = {}
+        fetches = bounded_map(
+            universe,
+            lambda symbol: self.service.get_candle_history(symbol, timeframe, start_ms=start_ms, limit=window + 1),
+            BATCH_CONCURRENCY
+        )
+        async for symbol, candles in fetches:
+            if isinstance(candles, Exception):
+                errors[symbol] = str(candles)
+            elif not len(candles) and state is None:
+                errors[symbol] = "No candle history"
+            else:
+                history[symbol] = candles
+
+        symbols = [symbol for symbol in universe if symbol in history]
+        if state is not None and symbols != state.symbols:
+            # A symbol stopped loading, so the matrix is rebuilt without it
+            del self.states[key]
+            return await self._compute(universe, timeframe, window)
+
+        if len(symbols) < 2:
+            raise ValueError("At least two symbols with candle history are required")
+
+        timestamps, closes = align_closes([history[symbol] for symbol in symbols])
+        if state is None:
+            if len(timestamps) < 3:
+                raise ValueError("Not enough overlapping candles to compute correlations")
+            state = RollingCovariance.from_closes(symbols, window, timestamps, closes)
+        elif len(timestamps):
+            state.push(timestamps, closes)
+
+        self.states[key] = state
+        self.states.move_to_end(key)
+        while len(self.states) > self.max_universes:
+            self.states.popitem(last=False)
+        return self._build_result(state, timeframe, window, errors)
+
+    def _build_result(self, state: RollingCovariance, timeframe: str, window: int,
+                      errors: Dict[str, str]) -> Dict[str, Any]:
+        covariance = state.covariance()
+        correlation = state.correlation(covariance)
+        periods_per_year = SECONDS_PER_YEAR / TIMEFRAME_SECONDS[timeframe]
+        size = len(state.symbols)
+        off_diagonal = correlation[~np.eye(size, dtype=bool)]
+
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "symbols": state.symbols,
+            "timeframe": timeframe,
+            "window": window,
+            "observations": state.count,
+            "as_of": datetime.utcfromtimestamp(state.last_timestamp / 1000).isoformat(),
+            "correlation": np.round(correlation, 4).tolist(),
+            "covariance": covariance.tolist(),
+            "annualized_volatility": np.round(np.sqrt(np.diag(covariance) * periods_per_year), 4).tolist(),
+            "average_correlation": round(float(off_diagonal.mean()), 4) if size > 1 else None,
+            "errors": errors,
+            "status": "success"
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"universes": len(self.states), "cache": self.cache.stats()}
+
+
+# Global correlation service instance
+correlation_service = CorrelationService(market_data_service)
@@ -0,0 +1,267 @@
+"""
+HTTP Compression for SynapseTrade AI™
+Negotiated gzip/brotli response encoding and snapshot-versioned ETags
+"""
+
+import hashlib
+import logging
+import os
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+
+from services.serialization import FastJSONResponse, dumps
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 5))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# ETag suffix marking each content-coding, so every representation has its own strong tag
+ENCODING_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+
+def supported_encodings() -> List[str]:
+    """Encodings this server can produce, in order of preference"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the preferred supported encoding allowed by an Accept-Encoding header"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        if name:
+            weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return zlib.compress(body, GZIP_LEVEL, wbits=31)
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes each chunk so streamed lines arrive promptly"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def etag_for(body: bytes, weak: bool = False) -> str:
+    """Validator derived from the exact bytes of a body"""
+    tag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+    return f"W/{tag}" if weak else tag
+
+
+def representation_etag(etag: str, encoding: Optional[str]) -> str:
+    """Tag of the encoded representation, e.g. "abc" becomes "abc-gzip" """
+    if not encoding or not etag.endswith('"'):
+        return etag
+    return etag[:-1] + ENCODING_SUFFIXES[encoding] + '"'
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The client-held tag matching etag in any encoding, using weak comparison as If-None-Match requires"""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        tag = candidate.removeprefix("W/")
+        for suffix in ENCODING_SUFFIXES.values():
+            if tag.endswith(suffix + '"'):
+                tag = tag[:-len(suffix) - 1] + '"'
+                break
+        if tag == opaque:
+            return candidate
+    return None
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding",
+                                              **(headers or {})})
+
+
+def conditional_json(request: Request, payload: Any, etag: str) -> Response:
+    """304 when the client already holds etag, otherwise the payload as JSON carrying it"""
+    held = matching_etag(request.headers.get("if-none-match"), etag)
+    if held:
+        return not_modified(held)
+    return FastJSONResponse(payload, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+class SnapshotBody:
+    """A JSON body serialized and compressed at most once per snapshot version
+
+    Every response for one version is byte-identical, so it carries a strong ETag
+    and unchanged snapshots are answered with 304 without being re-encoded.
+    """
+
+    def __init__(self):
+        self.version: Any = None
+        self.body = b""
+        self.etag = ""
+        self._encoded: Dict[str, bytes] = {}
+
+    def update(self, version: Any, build: Callable[[], Any]) -> str:
+        """Re-serialize the body if the version changed, returning its ETag"""
+        if version != self.version or not self.etag:
+            self.body = dumps(build())
+            self.etag = etag_for(self.body)
+            self._encoded = {}
+            self.version = version
+        return self.etag
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if not encoding or len(self.body) < COMPRESSION_MIN_BYTES:
+            return self.body
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding)
+        return self._encoded[encoding]
+
+    def response(self, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+        """The body for request, or 304; headers carry per-request values such as Age"""
+        held = matching_etag(request.headers.get("if-none-match"), self.etag)
+        if held:
+            return not_modified(held, headers)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if len(self.body) < COMPRESSION_MIN_BYTES:
+            encoding = None
+        headers = {
+            "ETag": representation_etag(self.etag, encoding),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+            **(headers or {})
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(self.encoded(encoding), media_type="application/json", headers=headers)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON and text responses with the negotiated encoding
+
+    Buffered bodies are compressed whole; streamed bodies (NDJSON) are compressed
+    chunk by chunk with a flush after each so clients see lines as they are sent.
+    Responses that already carry a Content-Encoding are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size, scope["method"]))
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding: Optional[str], minimum_size: int, method: str):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.method = method
+        self.start: Optional[Dict[str, Any]] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    def _eligible(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            self.method != "HEAD"
+            and self.start["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+
+    def _encode_headers(self, headers: MutableHeaders):
+        headers["Content-Encoding"] = self.encoding
+        if "etag" in headers:
+            headers["ETag"] = representation_etag(headers["etag"], self.encoding)
+
+    async def __call__(self, message: Dict[str, Any]):
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(scope=message)
+            self.start = message
+            if self._eligible(headers):
+                headers.add_vary_header("Accept-Encoding")
+                self.passthrough = self.encoding is None
+            else:
+                self.passthrough = True
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            start = self.start
+            headers = MutableHeaders(scope=start)
+            if not more_body:
+                # Whole body in one message: compress it only if it is worth it
+                if len(body) >= self.minimum_size:
+                    body = compress(body, self.encoding)
+                    self._encode_headers(headers)
+                    headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            self.compressor = StreamCompressor(self.encoding)
+            self._encode_headers(headers)
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(start)
+
+        if more_body:
+            await self.send({"type": "http.response.body", "body": self.compressor.chunk(body), "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.compressor.chunk(body) + self.compressor.finish()})
@@ -0,0 +1,439 @@
+"""
+Job Queue for SynapseTrade AI™
+Prioritized background jobs with retries, visibility timeouts and per-user concurrency caps
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import uuid
+import weakref
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_MAX_PER_USER = int(os.getenv("JOB_MAX_PER_USER", 2))
+JOB_VISIBILITY_SECONDS = float(os.getenv("JOB_VISIBILITY_SECONDS", 120))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", 5))
+# Idle workers look for jobs submitted by other processes this often
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1))
+# Finished jobs are kept this long
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", 7 * 24 * 3600))
+
+# Inserts between sweeps of expired jobs in the memory store
+PRUNE_INTERVAL = 100
+
+MIN_PRIORITY = 0
+MAX_PRIORITY = 9
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED)
+
+# Fields returned to clients; leases and worker ids stay internal
+PUBLIC_FIELDS = (
+    "job_id", "type", "status", "priority", "attempts", "max_attempts", "created_at",
+    "started_at", "finished_at", "result", "error"
+)
+
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: job.get(field) for field in PUBLIC_FIELDS}
+
+
+class MemoryJobStore:
+    """In-process job store for tests and single-process deployments
+
+    Each server process has its own jobs: with several processes, a job is only
+    visible to the process it was submitted to.
+    """
+
+    blocking = False
+
+    def __init__(self):
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._inserts = 0
+
+    def insert(self, job: Dict[str, Any]):
+        with self._lock:
+            self.jobs[job["job_id"]] = dict(job)
+            self._inserts += 1
+            if self._inserts % PRUNE_INTERVAL == 0:
+                self._prune()
+
+    def _prune(self):
+        """Drop finished jobs past retention, as the TTL index does in MongoDB"""
+        cutoff = datetime.utcnow() - timedelta(seconds=JOB_RETENTION_SECONDS)
+        for job_id in [job_id for job_id, job in self.jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        if job is None or (user_id is not None and job["user_id"] != user_id):
+            return None
+        return dict(job)
+
+    def claim(self, worker_id: str, visibility_seconds: float, per_user_limit: int) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        with self._lock:
+            running: Dict[str, int] = {}
+            for job in self.jobs.values():
+                if job["status"] == RUNNING and job["lease_expires_at"] > now:
+                    running[job["user_id"]] = running.get(job["user_id"], 0) + 1
+            candidates = [
+                job for job in self.jobs.values()
+                if (
+                    (job["status"] == QUEUED and job["available_at"] <= now)
+                    or (job["status"] == RUNNING and job["lease_expires_at"] <= now)
+                )
+                and (not per_user_limit or running.get(job["user_id"], 0) < per_user_limit)
+            ]
+            if not candidates:
+                return None
+            job = min(candidates, key=lambda job: (-job["priority"], job["available_at"]))
+            job.update({
+                "status": RUNNING,
+                "worker_id": worker_id,
+                "lease_expires_at": now + timedelta(seconds=visibility_seconds),
+                "started_at": now,
+                "attempts": job["attempts"] + 1
+            })
+            return dict(job)
+
+    def update(self, job_id: str, worker_id: str, changes: Dict[str, Any]) -> bool:
+        """Apply changes to a job this worker still holds"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] != RUNNING or job["worker_id"] != worker_id:
+                return False
+            job.update(changes)
+            return True
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in list(self.jobs.values()):
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+
+class MongoJobStore:
+    """Job store on a MongoDB collection, shared by every worker process
+
+    Claims are atomic per job. The per-user cap is checked just before the claim,
+    so workers racing for the same user may briefly exceed it by one.
+    """
+
+    blocking = True
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._indexed = False
+
+    def _ensure_indexes(self):
+        if not self._indexed:
+            self.collection.create_index("job_id", unique=True)
+            self.collection.create_index([("status", ASCENDING), ("priority", DESCENDING), ("available_at", ASCENDING)])
+            self.collection.create_index([("user_id", ASCENDING), ("status", ASCENDING)])
+            self.collection.create_index("finished_at", expireAfterSeconds=JOB_RETENTION_SECONDS)
+            self._indexed = True
+
+    def insert(self, job: Dict[str, Any]):
+        self._ensure_indexes()
+        self.collection.insert_one(dict(job))
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        query = {"job_id": job_id}
+        if user_id is not None:
+            query["user_id"] = user_id
+        return self.collection.find_one(query, {"_id": 0})
+
+    def claim(self, worker_id: str, visibility_seconds: float, per_user_limit: int) -> Optional[Dict[str, Any]]:
+        self._ensure_indexes()
+        now = datetime.utcnow()
+        saturated: List[str] = []
+        if per_user_limit:
+            saturated = [row["_id"] for row in self.collection.aggregate([
+                {"$match": {"status": RUNNING, "lease_expires_at": {"$gt": now}}},
+                {"$group": {"_id": "$user_id", "running": {"$sum": 1}}},
+                {"$match": {"running": {"$gte": per_user_limit}}}
+            ])]
+        return self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": QUEUED, "available_at": {"$lte": now}},
+                    {"status": RUNNING, "lease_expires_at": {"$lte": now}}
+                ],
+                "user_id": {"$nin": saturated}
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=visibility_seconds),
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("priority", DESCENDING), ("available_at", ASCENDING)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def update(self, job_id: str, worker_id: str, changes: Dict[str, Any]) -> bool:
+        """Apply changes to a job this worker still holds"""
+        result = self.collection.update_one(
+            {"job_id": job_id, "status": RUNNING, "worker_id": worker_id},
+            {"$set": changes}
+        )
+        return result.matched_count == 1
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            row["_id"]: row["count"]
+            for row in self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}])
+        }
+
+
+class JobQueue:
+    """Runs registered job handlers on a pool of background worker tasks
+
+    A claimed job is leased for the visibility timeout and the lease is renewed
+    while its handler runs. If a worker dies, the lease expires and another worker
+    picks the job up again. Failed jobs are retried with exponential backoff until
+    max_attempts is reached.
+    """
+
+    def __init__(self, store, workers: int = JOB_WORKERS, per_user_limit: int = JOB_MAX_PER_USER,
+                 visibility_seconds: float = JOB_VISIBILITY_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.store = store
+        self.workers = workers
+        self.per_user_limit = per_user_limit
+        self.visibility_seconds = visibility_seconds
+        self.max_attempts = max_attempts
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        # Waiters per job id; entries disappear once nobody is waiting
+        self._watchers: "weakref.WeakValueDictionary[str, asyncio.Event]" = weakref.WeakValueDictionary()
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+
+    def use_database(self, db):
+        """Keep MongoDB-backed jobs in the application's database; call before start()"""
+        self.store = build_job_store(db=db)
+
+    def register(self, job_type: str, handler: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        """Handle jobs of job_type; the handler receives the job and returns its JSON result"""
+        self.handlers[job_type] = handler
+
+    async def _run(self, method, *args):
+        if self.store.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def submit(self, job_type: str, user_id: str, payload: Dict[str, Any], priority: int = 0,
+                     max_attempts: Optional[int] = None) -> Dict[str, Any]:
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = datetime.utcnow()
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "type": job_type,
+            "user_id": user_id,
+            "payload": payload,
+            "priority": max(MIN_PRIORITY, min(MAX_PRIORITY, priority)),
+            "status": QUEUED,
+            "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts,
+            "available_at": now,
+            "lease_expires_at": None,
+            "worker_id": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+        await self._run(self.store.insert, job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return await self._run(self.store.get, job_id, user_id)
+
+    async def wait_for_update(self, job_id: str, timeout: float = JOB_POLL_SECONDS):
+        """Return when this process changes the job, or after timeout for changes made elsewhere"""
+        event = self._watchers.get(job_id)
+        if event is None:
+            event = asyncio.Event()
+            self._watchers[job_id] = event
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _notify(self, job_id: str):
+        event = self._watchers.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def start(self):
+        if self._worker_tasks or self.workers <= 0:
+            return
+        if not self.store.blocking and int(os.getenv("WEB_CONCURRENCY", 1)) > 1:
+            logger.warning("Jobs are kept in memory per process; set JOB_QUEUE=mongo when running several server processes")
+        self._wakeup = asyncio.Event()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(f"{os.getpid()}-{uuid.uuid4().hex[:8]}"))
+            for _ in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} job workers")
+
+    async def stop(self):
+        """Stop the workers; jobs they were running are picked up again when their leases expire"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def _worker(self, worker_id: str):
+        while True:
+            # Cleared before looking, so a submit made while claiming still wakes this worker
+            self._wakeup.clear()
+            try:
+                job = await self._run(self.store.claim, worker_id, self.visibility_seconds, self.per_user_limit)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job claim failed: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._notify(job["job_id"])
+            self.active += 1
+            try:
+                await self._execute(worker_id, job)
+            finally:
+                self.active -= 1
+                # A finished job may free a per-user slot for a waiting one
+                self._wakeup.set()
+
+    async def _execute(self, worker_id: str, job: Dict[str, Any]):
+        if job["attempts"] > job["max_attempts"]:
+            # Its lease expired on the final attempt, so that attempt never reported back
+            await self._finish(worker_id, job, {"status": FAILED, "error": "Job timed out"})
+            return
+        handler = self.handlers.get(job["type"])
+        if handler is None:
+            await self._finish(worker_id, job, {"status": FAILED, "error": f"No handler for job type {job['type']}"})
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(worker_id, job["job_id"]))
+        try:
+            result = await handler(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['job_id']} ({job['type']}) attempt {job['attempts']} failed: {e}")
+            if job["attempts"] < job["max_attempts"]:
+                delay = JOB_RETRY_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1)
+                self.retried += 1
+                await self._finish(worker_id, job, {
+                    "status": QUEUED,
+                    "error": str(e),
+                    "available_at": datetime.utcnow() + timedelta(seconds=delay),
+                    "lease_expires_at": None,
+                    "worker_id": None
+                })
+            else:
+                await self._finish(worker_id, job, {"status": FAILED, "error": str(e)})
+            return
+        finally:
+            heartbeat.cancel()
+        await self._finish(worker_id, job, {"status": SUCCEEDED, "result": result, "error": None})
+
+    async def _finish(self, worker_id: str, job: Dict[str, Any], changes: Dict[str, Any]):
+        if changes["status"] in TERMINAL_STATUSES:
+            changes = {**changes, "finished_at": datetime.utcnow(), "lease_expires_at": None}
+        try:
+            held = await self._run(self.store.update, job["job_id"], worker_id, changes)
+        except Exception as e:
+            logger.error(f"Failed to record job {job['job_id']} outcome: {e}")
+            return
+        if not held:
+            logger.warning(f"Job {job['job_id']} lease was lost before it finished; its outcome was discarded")
+            return
+        if changes["status"] == SUCCEEDED:
+            self.completed += 1
+        elif changes["status"] == FAILED:
+            self.failed += 1
+        self._notify(job["job_id"])
+
+    async def _heartbeat(self, worker_id: str, job_id: str):
+        """Renew the lease well before it expires while the handler runs"""
+        while True:
+            await asyncio.sleep(self.visibility_seconds / 3)
+            try:
+                held = await self._run(self.store.update, job_id, worker_id, {
+                    "lease_expires_at": datetime.utcnow() + timedelta(seconds=self.visibility_seconds)
+                })
+            except Exception as e:
+                logger.warning(f"Failed to renew lease on job {job_id}: {e}")
+                continue
+            if not held:
+                return
+
+    async def stats(self) -> Dict[str, Any]:
+        try:
+            counts = await self._run(self.store.counts)
+        except Exception as e:
+            logger.warning(f"Failed to count jobs: {e}")
+            counts = None
+        return {
+            "backend": "mongo" if self.store.blocking else "memory",
+            "workers": len(self._worker_tasks),
+            "active": self.active,
+            "per_user_limit": self.per_user_limit,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "jobs": counts
+        }
+
+
+def build_job_store(backend: Optional[str] = None, db=None):
+    """Build the job store selected by JOB_QUEUE (mongo or memory)
+
+    The mongo backend uses the application's database; until one is given, jobs
+    are kept in memory.
+    """
+    backend = (backend or os.getenv("JOB_QUEUE", "mongo")).lower()
+    if backend == "mongo" and db is not None:
+        return MongoJobStore(db.jobs)
+    if backend not in ("mongo", "memory"):
+        logger.warning(f"Unknown job queue backend: {backend}")
+    return MemoryJobStore()
+
+
+def build_job_queue(backend: Optional[str] = None, db=None) -> JobQueue:
+    return JobQueue(build_job_store(backend, db))
+
+
+# Global job queue instance
+job_queue = build_job_queue()
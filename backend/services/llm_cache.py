@@ -0,0 +1,250 @@
+"""
+LLM Response Cache for SynapseTrade AI™
+Content-addressed provider response cache keyed on quantized market state
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import pymongo
+from pymongo import ASCENDING
+
+from services.market_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Relative bucket width for price levels (current price, moving averages, bands, ...)
+PRICE_BUCKET = float(os.getenv("LLM_CACHE_PRICE_BUCKET", 0.005))
+# Relative bucket width for other market magnitudes (volume, market cap, ...)
+MAGNITUDE_BUCKET = 0.05
+
+# Field names as produced by the market data service and its indicator snapshots
+PRICE_FIELDS = {
+    "current_price", "sma_10", "sma_20", "ema_12", "ema_26",
+    "bollinger_upper", "bollinger_lower", "bollinger_middle", "support_level", "resistance_level"
+}
+# Signed or near-zero amounts in price units, bucketed on the price grid of the enclosing current_price
+PRICE_DELTA_FIELDS = {"price_change_24h", "macd", "signal_line", "macd_histogram", "atr", "volatility"}
+MAGNITUDE_FIELDS = {"volume_24h", "market_cap", "social_volume", "total_volume", "market_cap_total"}
+# Absolute bucket widths for bounded or percentage fields
+ABSOLUTE_BUCKETS = {
+    "price_change_percent_24h": 1.0,
+    "rsi": 5.0,
+    "fear_greed_index": 5.0,
+    "volatility_index": 5.0,
+    "sentiment_score": 1.0,
+    "bullish_percentage": 5.0,
+    "bearish_percentage": 5.0,
+    "neutral_percentage": 5.0
+}
+# Inputs that change every tick without changing the market picture
+VOLATILE_KEYS = {"timestamp", "ohlcv", "candles", "last_updated", "refreshed_at"}
+
+# Inserts between size checks on the MongoDB tier
+TRIM_INTERVAL = 100
+# Seconds to skip the MongoDB tier after it fails, so an outage does not slow every call
+STORE_RETRY_SECONDS = 60
+# Per-operation limit on the shared client, so an unreachable database degrades to provider calls quickly
+STORE_TIMEOUT_SECONDS = 2
+
+
+def _relative_bucket(value: float, width: float) -> Any:
+    if value == 0 or not math.isfinite(value):
+        return ["r", 0]
+    # Log-spaced buckets so the width is relative to the value's magnitude
+    return ["r", int(math.copysign(1, value)) * math.floor(math.log(abs(value)) / math.log1p(width))]
+
+
+def _bucket(key: str, value: float, price: Optional[float]) -> Any:
+    """Quantize a market field by its name, leaving non-market numbers exact"""
+    if key in ABSOLUTE_BUCKETS:
+        return ["a", math.floor(value / ABSOLUTE_BUCKETS[key])]
+    if key in PRICE_FIELDS:
+        return _relative_bucket(value, PRICE_BUCKET)
+    if key in PRICE_DELTA_FIELDS:
+        if price and math.isfinite(price) and math.isfinite(value):
+            # Same absolute width as the price level itself, so a move through zero stays stable
+            return ["p", math.floor(value / (abs(price) * PRICE_BUCKET))]
+        return _relative_bucket(value, MAGNITUDE_BUCKET)
+    if key in MAGNITUDE_FIELDS:
+        return _relative_bucket(value, MAGNITUDE_BUCKET)
+    return value
+
+
+def market_fingerprint(inputs: Any, key: str = "", price: Optional[float] = None) -> Any:
+    """Canonical form of prompt inputs with market numbers bucketed and volatile fields dropped"""
+    if isinstance(inputs, dict):
+        current_price = inputs.get("current_price")
+        if isinstance(current_price, (int, float)) and not isinstance(current_price, bool):
+            price = float(current_price)
+        return {
+            k: market_fingerprint(v, str(k).lower(), price)
+            for k, v in sorted(inputs.items(), key=lambda item: str(item[0]))
+            if str(k).lower() not in VOLATILE_KEYS
+        }
+    if isinstance(inputs, (list, tuple)):
+        return [market_fingerprint(v, key, price) for v in inputs]
+    if isinstance(inputs, bool) or not isinstance(inputs, (int, float)):
+        return inputs
+    return _bucket(key, float(inputs), price)
+
+
+def cache_key(provider: str, model: str, task: str, template_version: int, inputs: Any,
+              timeframe: Optional[str] = None) -> str:
+    """Content address of one provider request"""
+    canonical = json.dumps(
+        [provider, model, task, template_version, timeframe, market_fingerprint(inputs)],
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier cache of provider response text: in-process LRU in front of MongoDB
+
+    Concurrent identical requests share one provider call. Entries expire after the
+    TTL in both tiers; the memory tier is bounded by entry count and the MongoDB tier
+    by document count, oldest first.
+    """
+
+    def __init__(self, collection=None, ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None, max_documents: Optional[int] = None):
+        self.ttl = ttl_seconds if ttl_seconds is not None else float(os.getenv("LLM_CACHE_TTL_SECONDS", 900))
+        self.memory = TTLCache(max_entries=max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024)),
+                               default_ttl=self.ttl)
+        self.max_documents = max_documents or int(os.getenv("LLM_CACHE_MAX_DOCUMENTS", 100000))
+        self.collection = collection
+        self._indexed = False
+        self._inserts = 0
+        self._store_retry_at = 0.0
+        self.provider_calls = 0
+        self.store_hits = 0
+
+    async def get_or_generate(self, provider: str, model: str, task: str, template_version: int,
+                              inputs: Any, generate: Callable[[], Awaitable[str]],
+                              timeframe: Optional[str] = None,
+                              cache_if: Optional[Callable[[str], bool]] = None) -> Tuple[str, datetime, bool]:
+        """Return (response text, generated at, whether it came from cache)
+
+        Responses rejected by cache_if are returned to the callers sharing the call
+        but kept out of both tiers.
+        """
+        if self.ttl <= 0:
+            return await generate(), datetime.utcnow(), False
+        key = cache_key(provider, model, task, template_version, inputs, timeframe)
+        fresh = []
+        rejected = []
+
+        async def fetch() -> Dict[str, Any]:
+            entry = await self._load(key)
+            if entry is None:
+                fresh.append(True)
+                self.provider_calls += 1
+                text = await generate()
+                now = datetime.utcnow()
+                entry = {"response": text, "created_at": now, "expires_at": now + timedelta(seconds=self.ttl)}
+                if cache_if is not None and not cache_if(text):
+                    rejected.append(entry)
+                    return entry
+                await self._store(key, provider, model, task, entry)
+            return entry
+
+        def cacheable(entry: Dict[str, Any]) -> bool:
+            return not any(entry is other for other in rejected)
+
+        entry = await self.memory.get_or_fetch(key, fetch, cache_if=cacheable)
+        if entry["expires_at"] <= datetime.utcnow():
+            # Loaded from MongoDB near the end of its life and outlived it in memory
+            self.memory.invalidate(key)
+            entry = await self.memory.get_or_fetch(key, fetch, cache_if=cacheable)
+        return entry["response"], entry["created_at"], not fresh
+
+    def _ensure_indexes(self):
+        if not self._indexed:
+            self.collection.create_index("key", unique=True)
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+            self.collection.create_index([("created_at", ASCENDING)])
+            self._indexed = True
+
+    def _find(self, key: str) -> Optional[Dict[str, Any]]:
+        with pymongo.timeout(STORE_TIMEOUT_SECONDS):
+            self._ensure_indexes()
+            return self.collection.find_one(
+                {"key": key, "expires_at": {"$gt": datetime.utcnow()}},
+                {"_id": 0, "response": 1, "created_at": 1, "expires_at": 1}
+            )
+
+    def _insert(self, key: str, document: Dict[str, Any]):
+        with pymongo.timeout(STORE_TIMEOUT_SECONDS):
+            self._ensure_indexes()
+            self.collection.replace_one({"key": key}, {"key": key, **document}, upsert=True)
+            self._inserts += 1
+            if self._inserts % TRIM_INTERVAL == 0:
+                self._trim()
+
+    def _trim(self):
+        """Delete the oldest documents beyond max_documents"""
+        cutoff = list(self.collection.find({}, {"_id": 0, "created_at": 1})
+                      .sort("created_at", -1).skip(self.max_documents).limit(1))
+        if cutoff:
+            removed = self.collection.delete_many({"created_at": {"$lte": cutoff[0]["created_at"]}})
+            logger.info(f"Trimmed {removed.deleted_count} LLM cache documents")
+
+    def _store_available(self) -> bool:
+        return self.collection is not None and time.monotonic() >= self._store_retry_at
+
+    def _store_failed(self, action: str, error: Exception):
+        logger.warning(f"LLM cache {action} failed, skipping MongoDB for {STORE_RETRY_SECONDS}s: {error}")
+        self._store_retry_at = time.monotonic() + STORE_RETRY_SECONDS
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._store_available():
+            return None
+        try:
+            document = await asyncio.to_thread(self._find, key)
+        except Exception as e:
+            self._store_failed("lookup", e)
+            return None
+        if document is not None:
+            self.store_hits += 1
+        return document
+
+    async def _store(self, key: str, provider: str, model: str, task: str, entry: Dict[str, Any]):
+        if not self._store_available():
+            return
+        try:
+            await asyncio.to_thread(self._insert, key, {"provider": provider, "model": model, "task": task, **entry})
+        except Exception as e:
+            self._store_failed("write", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ttl_seconds": self.ttl,
+            "memory": self.memory.stats(),
+            "persistent": self.collection is not None,
+            "store_hits": self.store_hits,
+            "provider_calls": self.provider_calls
+        }
+
+
+def build_llm_cache(backend: Optional[str] = None, db=None) -> LLMResponseCache:
+    """Build the response cache selected by LLM_CACHE (mongo, memory or none)
+
+    The mongo backend uses the application's database; until one is given, only
+    the memory tier is used.
+    """
+    backend = (backend or os.getenv("LLM_CACHE", "mongo")).lower()
+    if backend == "none":
+        return LLMResponseCache(ttl_seconds=0)
+    if backend == "mongo" and db is not None:
+        return LLMResponseCache(db.llm_cache)
+    if backend not in ("mongo", "memory"):
+        logger.warning(f"Unknown LLM cache backend: {backend}")
+    return LLMResponseCache()
@@ -0,0 +1,197 @@
+"""
+Market Data Cache for SynapseTrade AI™
+Bounded TTL/LRU cache with single-flight coalescing of concurrent misses
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """In-process LRU cache with per-entry expiry and in-flight request sharing"""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Callers currently awaiting each in-flight fetch
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value, or default"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting least recently used entries beyond capacity"""
+        ttl = self.default_ttl if ttl is None else ttl
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                           ttl: Optional[float] = None,
+                           cache_if: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Return a cached value or run fetch once for all concurrent callers
+
+        The fetch is cancelled if every caller awaiting it is cancelled first.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await self._wait(inflight)
+
+        self.misses += 1
+        task = asyncio.ensure_future(fetch())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._complete(key, done, ttl, cache_if))
+        return await self._wait(task)
+
+    async def _wait(self, task: asyncio.Future) -> Any:
+        # The fetch runs as its own task so one caller's cancellation cannot fail the others,
+        # but once nobody is left waiting it is abandoned rather than left holding its resources
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+
+    async def get_or_fetch_many(self, keys: List[Hashable],
+                                fetch_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+                                ttl: Optional[float] = None,
+                                cache_if: Optional[Callable[[Any], bool]] = None) -> Dict[Hashable, Any]:
+        """Resolve many keys, fetching every uncached and not in-flight key in one batch call
+
+        fetch_many returns a mapping of key to value; a key may map to an Exception instance,
+        which is returned to callers but never cached. A key whose in-flight fetch is cancelled
+        by its other callers maps to a RuntimeError.
+        """
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        missing: List[Hashable] = []
+
+        for key in dict.fromkeys(keys):
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                results[key] = value
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.misses += 1
+                missing.append(key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            for key, future in futures.items():
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key: self._complete(key, done, ttl, cache_if))
+                waiting[key] = future
+            batch = asyncio.ensure_future(fetch_many(missing))
+            batch.add_done_callback(lambda done: self._resolve_batch(done, futures))
+
+        for key, future in waiting.items():
+            try:
+                results[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # A shared fetch abandoned by its own callers fails only that key, not this batch
+                if asyncio.current_task().cancelling():
+                    raise
+                results[key] = RuntimeError(f"Fetch for {key} was cancelled")
+            except Exception as e:
+                results[key] = e
+
+        return results
+
+    def _resolve_batch(self, batch: asyncio.Future, futures: Dict[Hashable, asyncio.Future]):
+        if batch.cancelled():
+            for future in futures.values():
+                future.cancel()
+            return
+        error = batch.exception()
+        values = {} if error else batch.result()
+        for key, future in futures.items():
+            if error:
+                future.set_exception(error)
+            elif isinstance(values.get(key), Exception):
+                future.set_exception(values[key])
+            elif key in values:
+                future.set_result(values[key])
+            else:
+                future.set_exception(KeyError(key))
+
+    def _complete(self, key: Hashable, done: asyncio.Future, ttl: Optional[float],
+                  cache_if: Optional[Callable[[Any], bool]]):
+        if self._inflight.get(key) is done:
+            del self._inflight[key]
+        if done.cancelled():
+            return
+        if done.exception() is not None:
+            logger.debug(f"Cache fetch for {key} failed: {done.exception()}")
+            return
+        value = done.result()
+        if cache_if is None or cache_if(value):
+            self.set(key, value, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+        }
+
+
+_MISSING = object()
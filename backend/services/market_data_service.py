@@ -4,164 +4,433 @@ Handles market data collection and processing
 """
 
 import asyncio
-import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import random
-import httpx
+import os
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Any, Tuple
+import numpy as np
+from services.candle_store import build_candle_store
+from services.candles import TIMEFRAME_SECONDS, CandleSeries, to_epoch_ms
+from services.market_cache import TTLCache
+from services.market_providers import MarketDataProvider, ProviderError, build_providers
+from services.resampler import IncrementalResampler, resample_ratio
+from services.streaming_indicators import IndicatorState
+from services.symbol_registry import SymbolRegistry, symbol_registry
+from services.synthetic_data import seeded_rng
 
 logger = logging.getLogger(__name__)
 
+# Seconds a market data payload stays fresh, per timeframe
+CACHE_TTL_SECONDS = {
+    "1m": 5,
+    "5m": 15,
+    "15m": 30,
+    "1h": 60,
+    "4h": 120,
+    "1d": 300
+}
+DEFAULT_CACHE_TTL_SECONDS = 30
+
+# Number of candles fetched per request
+CANDLE_LIMIT = 24
+
+# Symbols fetched concurrently by batch requests
+BATCH_CONCURRENCY = int(os.getenv("MARKET_BATCH_CONCURRENCY", 16))
+
+async def bounded_map(items: Iterable[Any], worker: Callable[[Any], Awaitable[Any]],
+                      concurrency: int) -> AsyncIterator[Tuple[Any, Any]]:
+    """Run worker over items with at most concurrency calls in flight
+
+    Yields (item, result) in completion order; a failed call yields its exception.
+    Closing the iterator early cancels the calls still running.
+    """
+    pending = iter(items)
+    running: Dict[asyncio.Future, Any] = {}
+    
+    def launch():
+        for item in islice(pending, max(concurrency - len(running), 0)):
+            running[asyncio.ensure_future(worker(item))] = item
+    
+    try:
+        launch()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = running.pop(task)
+                yield item, task.exception() or task.result()
+            launch()
+    finally:
+        for task in running:
+            task.cancel()
+
 class MarketDataService:
     """Service for fetching and processing market data"""
     
-    def __init__(self):
+    def __init__(self, registry: Optional[SymbolRegistry] = None):
+        self.registry = registry or symbol_registry
         self.data_sources = {
             "crypto": ["binance", "coinbase", "kraken"],
             "stocks": ["yahoo", "alpha_vantage", "polygon"],
             "forex": ["fxcm", "oanda", "mt5"]
         }
+        # Provider adapters routed by asset class (MARKET_DATA_PROVIDERS)
+        self.providers = build_providers()
+        # Incremental indicator state keyed by (symbol, timeframe)
+        self.indicator_states: Dict[Tuple[str, str], IndicatorState] = {}
+        self.last_prices: Dict[str, float] = {}
+        # One stored resolution per symbol; higher timeframes are resampled from it
+        self.base_timeframe = os.getenv("MARKET_BASE_TIMEFRAME", "1m")
+        self.resamplers: Dict[str, IncrementalResampler] = {}
+        self.synthetic_seed = int(os.getenv("SYNTHETIC_SEED", 0))
+        # Persistent closed-candle history (CANDLE_STORE=file|mongo|none)
+        self.candle_store = build_candle_store()
+        # Market data payloads keyed by (symbol, timeframe)
+        self.cache = TTLCache(max_entries=int(os.getenv("MARKET_CACHE_MAX_ENTRIES", 2048)))
+        # Precomputed market overview, refreshed in the background
+        self.overview_snapshot: Optional[Dict[str, Any]] = None
+        self.overview_version = 0
+        self.overview_refreshed_at: Optional[datetime] = None
+        self._overview_task: Optional[asyncio.Task] = None
+    
+    def _cache_ttl(self, timeframe: str) -> float:
+        """Cache lifetime for a timeframe, overridable via MARKET_CACHE_TTL_<TIMEFRAME>"""
+        override = os.getenv(f"MARKET_CACHE_TTL_{timeframe.upper()}")
+        if override:
+            return float(override)
+        return CACHE_TTL_SECONDS.get(timeframe, DEFAULT_CACHE_TTL_SECONDS)
+    
+    def use_database(self, db):
+        """Keep MongoDB-backed candle history in the application's database"""
+        self.candle_store = build_candle_store(db=db)
+    
+    async def close(self):
+        """Close pooled provider HTTP clients and the candle store"""
+        for provider in set(self.providers.values()):
+            await provider.close()
+        await self.candle_store.close()
+    
+    def get_provider_status(self) -> Dict[str, Any]:
+        """Get routing and connection status for each provider"""
+        return {asset_class: provider.status() for asset_class, provider in self.providers.items()}
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get market data cache counters"""
+        return self.cache.stats()
+    
+    def get_candle_store_stats(self) -> Dict[str, Any]:
+        """Get candle store backend and usage"""
+        return self.candle_store.stats()
     
     async def get_market_data(self, symbol: str, timeframe: str = "1h") -> Dict[str, Any]:
         """Get market data for a symbol"""
         try:
-            # For demo purposes, we'll generate realistic market data
-            # In production, this would fetch from real APIs
-            market_data = await self._generate_demo_market_data(symbol, timeframe)
+            market_data = await self.cache.get_or_fetch(
+                (symbol, timeframe),
+                lambda: self._fetch_market_data(symbol, timeframe),
+                ttl=self._cache_ttl(timeframe)
+            )
             
-            return {
-                "symbol": symbol,
-                "timeframe": timeframe,
-                "timestamp": datetime.utcnow().isoformat(),
-                "data": market_data,
-                "source": "demo_api",
-                "status": "success"
-            }
+            return self._build_response(symbol, timeframe, market_data)
             
         except Exception as e:
             logger.error(f"Failed to fetch market data for {symbol}: {e}")
-            return {
-                "symbol": symbol,
-                "timeframe": timeframe,
-                "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e),
-                "status": "error"
-            }
+            return self._build_error_response(symbol, timeframe, e)
+    
+    def _build_response(self, symbol: str, timeframe: str, market_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Wrap market data in the standard response envelope"""
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": market_data,
+            "source": self._provider_for(symbol).source,
+            "status": "success"
+        }
+    
+    def _build_error_response(self, symbol: str, timeframe: str, error: Exception) -> Dict[str, Any]:
+        """Wrap a market data failure in the standard response envelope"""
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "timestamp": datetime.utcnow().isoformat(),
+            "error": str(error),
+            "status": "error"
+        }
+    
+    def _asset_class(self, symbol: str) -> str:
+        """Classify a symbol as crypto, stocks or forex"""
+        info = self.registry.get(symbol)
+        if info is not None:
+            return info.asset_class
+        return "forex" if "/" in symbol else "stocks"
     
-    async def _generate_demo_market_data(self, symbol: str, timeframe: str) -> Dict[str, Any]:
-        """Generate demo market data for testing"""
-        base_price = self._get_base_price(symbol)
+    def _provider_for(self, symbol: str) -> MarketDataProvider:
+        """Get the provider adapter routed to a symbol's asset class"""
+        return self.providers.get(self._asset_class(symbol), self.providers["default"])
+    
+    async def _fetch_candles(self, symbol: str, timeframe: str) -> CandleSeries:
+        """Get candles for a timeframe, resampled from the base resolution where possible"""
+        source = self._candle_source(symbol, timeframe)
+        if source == timeframe:
+            return await self._load_candles(symbol, timeframe, CANDLE_LIMIT)
         
-        # Generate OHLCV data
-        ohlcv_data = []
-        current_price = base_price
+        ratio = resample_ratio(source, timeframe)
+        needed = (CANDLE_LIMIT + 1) * ratio
+        if source != self.base_timeframe:
+            # A timeframe the provider lacks, built from a coarser one it has
+            candles = self._resample(await self._load_candles(symbol, source, needed), source, timeframe, CANDLE_LIMIT)
+            if not len(candles):
+                raise ProviderError(f"Not enough {source} history to build {timeframe} candles for {symbol}")
+            return candles
         
-        for i in range(24):  # Last 24 periods
-            open_price = current_price
-            high_price = open_price * (1 + random.uniform(0, 0.03))
-            low_price = open_price * (1 - random.uniform(0, 0.03))
-            close_price = open_price * (1 + random.uniform(-0.02, 0.02))
-            volume = random.uniform(1000000, 5000000)
-            
-            ohlcv_data.append({
-                "timestamp": (datetime.utcnow() - timedelta(hours=24-i)).isoformat(),
-                "open": round(open_price, 2),
-                "high": round(high_price, 2),
-                "low": round(low_price, 2),
-                "close": round(close_price, 2),
-                "volume": round(volume, 2)
-            })
-            
-            current_price = close_price
+        resampler = self.resamplers.get(symbol)
         
-        # Calculate technical indicators
-        prices = [candle["close"] for candle in ohlcv_data]
-        technical_indicators = self._calculate_technical_indicators(prices)
+        if resampler is None or resampler.history_candles < needed:
+            # Cold symbol, or a longer timeframe than the history covers: load base history once
+            base = await self._load_candles(symbol, self.base_timeframe, needed)
+            resampler = IncrementalResampler(self.base_timeframe, max_candles=CANDLE_LIMIT)
+            resampler.bootstrap(base)
+            self.resamplers[symbol] = resampler
+        else:
+            # Only fetch base candles closed since the last update
+            base_ms = TIMEFRAME_SECONDS[self.base_timeframe] * 1000
+            missing = (to_epoch_ms(datetime.utcnow()) - resampler.last_timestamp) // base_ms
+            if missing > 1:
+                resampler.push(await self._load_candles(symbol, self.base_timeframe, min(missing, needed)))
         
-        return {
-            "current_price": round(current_price, 2),
-            "price_change_24h": round(current_price - base_price, 2),
-            "price_change_percent_24h": round(((current_price - base_price) / base_price) * 100, 2),
-            "volume_24h": sum(candle["volume"] for candle in ohlcv_data),
-            "market_cap": round(current_price * 1000000000, 2),  # Mock market cap
-            "ohlcv": ohlcv_data,
-            "technical_indicators": technical_indicators,
-            "market_sentiment": self._get_market_sentiment(symbol)
-        }
+        candles = resampler.series(timeframe)
+        if not len(candles):
+            raise ProviderError(f"Not enough {self.base_timeframe} history to build {timeframe} candles for {symbol}")
+        return candles
     
-    def _get_base_price(self, symbol: str) -> float:
-        """Get base price for different symbols"""
-        base_prices = {
-            "BTC": 45000,
-            "ETH": 2800,
-            "AAPL": 180,
-            "GOOGL": 140,
-            "TSLA": 250,
-            "MSFT": 400,
-            "EUR/USD": 1.08,
-            "GBP/USD": 1.25,
-            "USD/JPY": 145
-        }
-        return base_prices.get(symbol, 100)
+    def _candle_source(self, symbol: str, timeframe: str) -> str:
+        """Timeframe whose candles a timeframe is built from
+
+        The base resolution when the provider returns enough of it in one request,
+        otherwise the timeframe itself, otherwise the coarsest timeframe the
+        provider has that divides it.
+        """
+        provider = self._provider_for(symbol)
+        if timeframe != self.base_timeframe and self._can_resample(provider, self.base_timeframe, timeframe):
+            return self.base_timeframe
+        if provider.supports(timeframe):
+            return timeframe
+        for source in sorted(TIMEFRAME_SECONDS, key=TIMEFRAME_SECONDS.get, reverse=True):
+            if self._can_resample(provider, source, timeframe):
+                return source
+        raise ProviderError(f"{provider.name} does not support timeframe {timeframe}")
+    
+    @staticmethod
+    def _can_resample(provider: MarketDataProvider, source: str, timeframe: str) -> bool:
+        """Whether one request returns enough source candles to build CANDLE_LIMIT timeframe candles"""
+        try:
+            ratio = resample_ratio(source, timeframe)
+        except ValueError:
+            return False
+        return ratio > 1 and provider.supports(source) and (CANDLE_LIMIT + 1) * ratio <= provider.limit_for(source)
+    
+    @staticmethod
+    def _resample(candles: CandleSeries, source: str, timeframe: str, limit: int) -> CandleSeries:
+        """Closed timeframe candles built from source candles, dropping partial first and last buckets"""
+        resampler = IncrementalResampler(source, [timeframe], max_candles=limit)
+        resampler.bootstrap(candles)
+        return resampler.series(timeframe)
     
-    def _calculate_technical_indicators(self, prices: List[float]) -> Dict[str, Any]:
-        """Calculate basic technical indicators"""
-        if len(prices) < 14:
-            return {}
+    async def _load_candles(self, symbol: str, timeframe: str, limit: int) -> CandleSeries:
+        """Get the latest closed candles from the store, fetching only the missing tail"""
+        step_ms = TIMEFRAME_SECONDS[timeframe] * 1000
+        now_ms = to_epoch_ms(datetime.utcnow())
+        end_ms = now_ms - now_ms % step_ms
+        start_ms = end_ms - limit * step_ms
         
-        # Simple Moving Average (SMA)
-        sma_10 = sum(prices[-10:]) / 10
-        sma_20 = sum(prices[-20:]) / 20 if len(prices) >= 20 else sma_10
+        stored = await self.candle_store.read(symbol, timeframe, start_ms, end_ms, limit)
+        last = stored.last_timestamp
+        if last is not None and last + step_ms >= end_ms and len(stored) >= limit:
+            return stored
         
-        # Relative Strength Index (RSI) - simplified calculation
-        price_changes = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [change if change > 0 else 0 for change in price_changes]
-        losses = [-change if change < 0 else 0 for change in price_changes]
+        # One extra candle covers providers that also return the forming period
+        missing = limit if last is None else min(limit, (end_ms - last) // step_ms)
+        fetched = (await self._fetch_provider_candles(symbol, timeframe, missing + 1)).between(start_ms, end_ms)
+        candles = stored.append(fetched.since(last))
+        reachable = min(limit, self._provider_for(symbol).limit_for(timeframe))
+        if len(candles) < reachable and missing < reachable:
+            # Stored history has a hole or is too short for this window: use a full fetch
+            fetched = (await self._fetch_provider_candles(symbol, timeframe, limit + 1)).between(start_ms, end_ms)
+            candles = fetched
+        await self.candle_store.write(symbol, timeframe, fetched)
         
-        avg_gain = sum(gains[-14:]) / 14
-        avg_loss = sum(losses[-14:]) / 14
+        candles = candles[-limit:]
+        if not len(candles):
+            raise ProviderError(f"No closed {timeframe} candles available for {symbol}")
+        return candles
+    
+    async def get_candle_history(self, symbol: str, timeframe: str = "1h", start_ms: Optional[int] = None,
+                                 end_ms: Optional[int] = None, limit: int = 500) -> CandleSeries:
+        """Get stored candles for a time range, loading whatever the store is missing first
+
+        Timeframes are built from the same source candles as market data, so
+        history, backtests and live data share one series.
+        """
+        source = self._candle_source(symbol, timeframe)
+        ratio = resample_ratio(source, timeframe)
+        step_ms = TIMEFRAME_SECONDS[timeframe] * 1000
+        now_ms = to_epoch_ms(datetime.utcnow())
+        # Recent windows load limit candles; older ranges load back to their start
+        span = limit if start_ms is None else (now_ms - start_ms) // step_ms + 1
+        source_limit = limit
+        if ratio > 1:
+            # Base candles for every target candle, plus one target candle for history starting mid-bucket
+            span, source_limit = (span + 1) * ratio, (limit + 1) * ratio
+        span = max(1, min(span, self._provider_for(symbol).limit_for(source)))
+        recent = await self._load_candles(symbol, source, span)
+        history = await self.candle_store.read(symbol, source, start_ms, end_ms, source_limit)
+        # Without a persistent backend only the freshly loaded window is available
+        if not len(history):
+            history = recent.between(start_ms, end_ms)
+        if ratio > 1:
+            history = self._resample(history, source, timeframe, limit)
+        return history[-limit:]
+    
+    async def _fetch_provider_candles(self, symbol: str, timeframe: str, limit: int) -> CandleSeries:
+        """Fetch candles directly from the symbol's provider"""
+        provider = self._provider_for(symbol)
+        if not provider.supports(timeframe):
+            raise ProviderError(f"{provider.name} does not support timeframe {timeframe}")
+        candles = await provider.fetch_candles(symbol, timeframe, min(limit, provider.limit_for(timeframe)))
+        if not len(candles):
+            raise ProviderError(f"{provider.name} returned no candles for {symbol}")
+        return candles
+    
+    async def _fetch_market_data(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """Fetch candles and build the market data payload for one symbol"""
+        candles = await self._fetch_candles(symbol, timeframe)
+        technical_indicators = self._get_indicator_snapshots([(symbol, candles)], timeframe)[0]
+        return self._build_market_summary(symbol, candles, technical_indicators)
+    
+    async def _fetch_market_data_batch(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Any]:
+        """Fetch market data for many (symbol, timeframe) keys with one indicator pass per timeframe"""
+        results: Dict[Tuple[str, str], Any] = {}
+        by_timeframe: Dict[str, List[Tuple[str, CandleSeries]]] = {}
+        fetches = bounded_map(keys, lambda key: self._fetch_candles(*key), BATCH_CONCURRENCY)
+        async for (symbol, timeframe), candles in fetches:
+            if isinstance(candles, Exception):
+                results[(symbol, timeframe)] = candles
+            else:
+                by_timeframe.setdefault(timeframe, []).append((symbol, candles))
         
-        rs = avg_gain / avg_loss if avg_loss != 0 else 0
-        rsi = 100 - (100 / (1 + rs))
+        # Indicators for every fetched symbol are computed together
+        for timeframe, fetched in by_timeframe.items():
+            indicators = self._get_indicator_snapshots(fetched, timeframe)
+            for (symbol, candles), symbol_indicators in zip(fetched, indicators):
+                results[(symbol, timeframe)] = self._build_market_summary(symbol, candles, symbol_indicators)
         
-        # Bollinger Bands
-        sma_20_full = sum(prices[-20:]) / 20 if len(prices) >= 20 else sma_10
-        variance = sum((price - sma_20_full) ** 2 for price in prices[-20:]) / 20
-        std_dev = variance ** 0.5
+        return results
+    
+    def _build_market_summary(self, symbol: str, candles: CandleSeries,
+                              technical_indicators: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the market data payload from candles and indicators"""
+        base_price = float(candles.open[0])
+        current_price = float(candles.close[-1])
         
         return {
-            "sma_10": round(sma_10, 2),
-            "sma_20": round(sma_20, 2),
-            "rsi": round(rsi, 2),
-            "bollinger_upper": round(sma_20_full + (2 * std_dev), 2),
-            "bollinger_lower": round(sma_20_full - (2 * std_dev), 2),
-            "bollinger_middle": round(sma_20_full, 2),
-            "macd": round(random.uniform(-5, 5), 2),  # Mock MACD
-            "signal_line": round(random.uniform(-3, 3), 2),
-            "volatility": round(std_dev, 2)
+            "current_price": round(current_price, 2),
+            "price_change_24h": round(current_price - base_price, 2),
+            "price_change_percent_24h": round(((current_price - base_price) / base_price) * 100, 2),
+            "volume_24h": float(candles.volume.sum()),
+            "market_cap": round(current_price * 1000000000, 2),  # Mock market cap
+            "ohlcv": candles.to_rows(),
+            "technical_indicators": technical_indicators,
+            "market_sentiment": self._get_market_sentiment(symbol)
         }
     
+    def _get_indicator_snapshots(self, symbol_candles: List[Tuple[str, CandleSeries]],
+                                 timeframe: str) -> List[Dict[str, Any]]:
+        """Serve indicators from incremental state, bootstrapping cold symbols in one vectorized pass"""
+        cold = [
+            (symbol, candles) for symbol, candles in symbol_candles
+            if (symbol, timeframe) not in self.indicator_states
+        ]
+        if cold:
+            states = IndicatorState.bootstrap([candles for _, candles in cold])
+            for (symbol, _), state in zip(cold, states):
+                self.indicator_states[(symbol, timeframe)] = state
+        
+        snapshots = []
+        for symbol, candles in symbol_candles:
+            state = self.indicator_states[(symbol, timeframe)]
+            state.ingest(candles)
+            snapshots.append(state.snapshot())
+        return snapshots
+    
+    def update_tick(self, symbol: str, price: float):
+        """Apply a live trade price to every timeframe tracked for a symbol"""
+        self.last_prices[symbol] = price
+        for (state_symbol, _), state in self.indicator_states.items():
+            if state_symbol == symbol:
+                state.update_tick(price)
+    
+    def close_candle(self, symbol: str, timeframe: str, candle: Dict[str, Any], price: float):
+        """Commit a candle the live stream saw close, starting the next one at price"""
+        state = self.indicator_states.get((symbol, timeframe))
+        if state is None or (state.last_timestamp is not None and state.last_timestamp >= candle["timestamp"]):
+            # Unknown, or already committed from fetched history
+            return
+        # Ticks may miss the period's extremes, so the provider's candle replaces this one once fetched
+        state.push_provisional(candle["timestamp"], candle["high"], candle["low"], candle["close"])
+        state.update_tick(price)
+    
+    def get_indicator_snapshot(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """Read the current indicators for a symbol without fetching"""
+        state = self.indicator_states.get((symbol, timeframe))
+        return state.snapshot() if state else {}
+    
+    async def get_latest_price(self, symbol: str) -> float:
+        """Fetch the latest traded price for a symbol from its provider"""
+        last_price = self.last_prices.get(symbol)
+        if last_price is None:
+            market_data = await self.get_market_data(symbol)
+            if market_data["status"] == "success":
+                last_price = market_data["data"]["current_price"]
+        price = await self._provider_for(symbol).fetch_latest_price(symbol, last_price)
+        self.update_tick(symbol, price)
+        return price
+    
+    def _demo_rng(self, *parts: Any) -> np.random.Generator:
+        """Seeded generator for demo-only fields, stable within the current hour"""
+        hour = datetime.utcnow().strftime("%Y%m%d%H")
+        return seeded_rng(self.synthetic_seed, *parts, hour)
+    
     def _get_market_sentiment(self, symbol: str) -> Dict[str, Any]:
         """Get market sentiment data"""
+        # Demo sentiment is reproducible per symbol and hour
+        rng = self._demo_rng("sentiment", symbol)
         sentiments = ["bullish", "bearish", "neutral"]
-        sentiment = random.choice(sentiments)
+        sentiment = sentiments[int(rng.integers(len(sentiments)))]
         
         return {
             "overall_sentiment": sentiment,
-            "sentiment_score": round(random.uniform(0, 100), 1),
-            "bullish_percentage": round(random.uniform(30, 70), 1),
-            "bearish_percentage": round(random.uniform(20, 50), 1),
-            "neutral_percentage": round(random.uniform(10, 30), 1),
-            "fear_greed_index": round(random.uniform(0, 100), 1),
-            "social_volume": round(random.uniform(1000, 10000), 0)
+            "sentiment_score": round(rng.uniform(0, 100), 1),
+            "bullish_percentage": round(rng.uniform(30, 70), 1),
+            "bearish_percentage": round(rng.uniform(20, 50), 1),
+            "neutral_percentage": round(rng.uniform(10, 30), 1),
+            "fear_greed_index": round(rng.uniform(0, 100), 1),
+            "social_volume": round(rng.uniform(1000, 10000), 0)
         }
     
-    async def get_multiple_symbols(self, symbols: List[str]) -> Dict[str, Any]:
+    async def get_multiple_symbols(self, symbols: List[str], timeframe: str = "1h") -> Dict[str, Any]:
         """Get market data for multiple symbols"""
         try:
-            tasks = [self.get_market_data(symbol) for symbol in symbols]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            keys = [(symbol, timeframe) for symbol in symbols]
+            cached = await self.cache.get_or_fetch_many(
+                keys, self._fetch_market_data_batch, ttl=self._cache_ttl(timeframe)
+            )
+            
+            results = [
+                cached[key] if isinstance(cached[key], Exception)
+                else self._build_response(symbol, timeframe, cached[key])
+                for symbol, key in zip(symbols, keys)
+            ]
             
             successful_results = {}
             failed_results = {}
@@ -188,18 +457,83 @@ class MarketDataService:
                 "status": "error"
             }
     
+    async def stream_multiple_symbols(self, symbols: List[str], timeframe: str = "1h",
+                                      concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each symbol's market data response as soon as it is ready"""
+        fetches = bounded_map(
+            symbols, lambda symbol: self.get_market_data(symbol, timeframe), concurrency or BATCH_CONCURRENCY
+        )
+        async for symbol, result in fetches:
+            if isinstance(result, Exception):
+                result = self._build_error_response(symbol, timeframe, result)
+            yield result
+    
     async def get_trending_symbols(self, market_type: str = "crypto") -> List[str]:
         """Get trending symbols for a market type"""
-        trending_symbols = {
-            "crypto": ["BTC", "ETH", "BNB", "ADA", "SOL", "DOT", "AVAX", "MATIC"],
-            "stocks": ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "META", "NFLX", "NVDA"],
-            "forex": ["EUR/USD", "GBP/USD", "USD/JPY", "USD/CAD", "AUD/USD", "USD/CHF"]
-        }
-        
-        return trending_symbols.get(market_type, ["BTC", "ETH", "AAPL"])
+        return self.registry.trending(market_type) or ["BTC", "ETH", "AAPL"]
+    
+    def search_symbols(self, query: str, limit: int = 10, asset_class: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search instruments by symbol, alias or name prefix, tolerating typos"""
+        return self.registry.search(query, limit, asset_class)
     
     async def get_market_overview(self) -> Dict[str, Any]:
-        """Get overall market overview"""
+        """Get overall market overview from the precomputed snapshot"""
+        if self.overview_snapshot is None:
+            await self.refresh_market_overview()
+        
+        refreshed_at = self.overview_refreshed_at
+        return {
+            **self.overview_snapshot,
+            "snapshot_version": self.overview_version,
+            "refreshed_at": refreshed_at.isoformat() if refreshed_at else None
+        }
+    
+    def overview_age(self) -> Optional[float]:
+        """Seconds since the overview snapshot was refreshed"""
+        if self.overview_refreshed_at is None:
+            return None
+        return (datetime.utcnow() - self.overview_refreshed_at).total_seconds()
+    
+    async def refresh_market_overview(self) -> Dict[str, Any]:
+        """Recompute the market overview snapshot"""
+        overview = await self._compute_market_overview()
+        # Keep serving the last good snapshot if a refresh fails
+        if overview.get("status") != "error" or self.overview_snapshot is None:
+            self.overview_snapshot = overview
+            self.overview_version += 1
+            self.overview_refreshed_at = datetime.utcnow()
+        return self.overview_snapshot
+    
+    async def start_overview_refresher(self, interval: Optional[float] = None):
+        """Start the background task that keeps the overview snapshot fresh"""
+        if self._overview_task and not self._overview_task.done():
+            return
+        interval = interval or float(os.getenv("MARKET_OVERVIEW_REFRESH_SECONDS", 15))
+        await self.refresh_market_overview()
+        self._overview_task = asyncio.create_task(self._overview_refresh_loop(interval))
+        logger.info(f"Market overview refresher started ({interval}s interval)")
+    
+    async def stop_overview_refresher(self):
+        """Stop the background overview refresher"""
+        if self._overview_task:
+            self._overview_task.cancel()
+            try:
+                await self._overview_task
+            except asyncio.CancelledError:
+                pass
+            self._overview_task = None
+    
+    async def _overview_refresh_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_market_overview()
+            except Exception as e:
+                logger.error(f"Market overview refresh failed: {e}")
+    
+    async def _compute_market_overview(self) -> Dict[str, Any]:
+        """Compute overall market overview"""
+        rng = self._demo_rng("overview")
         try:
             # Get data for major symbols
             major_symbols = ["BTC", "ETH", "AAPL", "GOOGL", "EUR/USD"]
@@ -232,9 +566,9 @@ class MarketDataService:
                 "positive_symbols": positive_changes,
                 "negative_symbols": negative_changes,
                 "neutral_symbols": len(major_symbols) - positive_changes - negative_changes,
-                "market_cap_total": round(random.uniform(2000000000000, 3000000000000), 2),
-                "fear_greed_index": round(random.uniform(0, 100), 1),
-                "volatility_index": round(random.uniform(10, 40), 1),
+                "market_cap_total": round(rng.uniform(2000000000000, 3000000000000), 2),
+                "fear_greed_index": round(rng.uniform(0, 100), 1),
+                "volatility_index": round(rng.uniform(10, 40), 1),
                 "major_symbols": market_data["data"]
             }
             
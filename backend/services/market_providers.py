@@ -0,0 +1,298 @@
+"""
+Market Data Providers for SynapseTrade AI™
+Exchange and broker adapters returning columnar candles over pooled HTTP clients
+"""
+
+import importlib.util
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Optional, Any, Set
+
+import httpx
+import numpy as np
+
+from services.candles import TIMEFRAME_SECONDS, CandleSeries, to_epoch_ms
+from services.symbol_registry import symbol_registry
+from services.synthetic_data import SECONDS_PER_YEAR, SyntheticMarketGenerator
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ProviderError(Exception):
+    """Raised when a provider cannot return candles"""
+
+
+class MarketDataProvider:
+    """Base adapter holding one long-lived HTTP client per provider"""
+
+    name = "base"
+    source = "base"
+    base_url = ""
+    timeframes: Dict[str, Any] = {}
+    # Largest number of candles one request may return
+    max_limit = 1000
+    # Lower caps for timeframes whose requests are bounded by a lookback range instead
+    timeframe_limits: Dict[str, int] = {}
+
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None,
+                 max_connections: Optional[int] = None, api_key: Optional[str] = None):
+        prefix = self.name.upper()
+        self.base_url = base_url or os.getenv(f"{prefix}_BASE_URL", self.base_url)
+        self.timeout = timeout or float(os.getenv(f"{prefix}_TIMEOUT", 5.0))
+        self.max_connections = max_connections or int(os.getenv(f"{prefix}_MAX_CONNECTIONS", 20))
+        self.api_key = api_key or os.getenv(f"{prefix}_API_KEY")
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Lazily create the pooled keep-alive client"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE,
+                headers=self._headers(),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=30.0
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 3.0))
+            )
+        return self._client
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Accept": "application/json"}
+
+    def supports(self, timeframe: str) -> bool:
+        return timeframe in self.timeframes
+
+    def limit_for(self, timeframe: str) -> int:
+        """Largest number of timeframe candles one request can return"""
+        return self.timeframe_limits.get(timeframe, self.max_limit)
+
+    async def fetch_candles(self, symbol: str, timeframe: str = "1h", limit: int = 24) -> CandleSeries:
+        raise NotImplementedError
+
+    async def fetch_latest_price(self, symbol: str, last_price: Optional[float] = None) -> float:
+        """Latest traded price, taken from the most recent one-minute candle"""
+        candles = await self.fetch_candles(symbol, "1m", 1)
+        if not len(candles):
+            raise ProviderError(f"{self.name} returned no price for {symbol}")
+        return float(candles.close[-1])
+
+    async def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        try:
+            response = await self.client.get(path, params=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise ProviderError(f"{self.name} request failed: {e}") from e
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "base_url": self.base_url,
+            "http2": HTTP2_AVAILABLE,
+            "max_connections": self.max_connections,
+            "timeout": self.timeout,
+            "connected": self._client is not None and not self._client.is_closed
+        }
+
+
+class DemoProvider(MarketDataProvider):
+    """Offline provider generating realistic demo candles"""
+
+    name = "demo"
+    source = "demo_api"
+    timeframes = TIMEFRAME_SECONDS
+    max_limit = 100000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        seed = int(os.getenv("SYNTHETIC_SEED", 0))
+        self.generator = SyntheticMarketGenerator(seed=seed)
+        self._tick_rng = np.random.default_rng(seed)
+        self._unknown_symbols: Set[str] = set()
+
+    def get_base_price(self, symbol: str) -> float:
+        """Get the registry reference price a symbol's synthetic path is anchored to"""
+        info = symbol_registry.get(symbol)
+        if info is None or info.reference_price is None:
+            if symbol not in self._unknown_symbols:
+                self._unknown_symbols.add(symbol)
+                logger.warning(f"No reference price for {symbol}; demo data will use a base price of 100")
+            return 100
+        return info.reference_price
+
+    def get_volatility(self, symbol: str) -> float:
+        """Annualized volatility used for a symbol's synthetic path"""
+        info = symbol_registry.get(symbol)
+        if info is not None and info.volatility is not None:
+            return info.volatility
+        return 0.08 if "/" in symbol else 0.35
+
+    async def fetch_latest_price(self, symbol: str, last_price: Optional[float] = None) -> float:
+        """Move the last price by one second of the symbol's volatility to simulate a live tick"""
+        price = last_price if last_price is not None else self.get_base_price(symbol)
+        sigma = self.get_volatility(symbol) * (1 / SECONDS_PER_YEAR) ** 0.5
+        return round(price * float(np.exp(sigma * self._tick_rng.standard_normal())), 6)
+
+    async def fetch_candles(self, symbol: str, timeframe: str = "1h", limit: int = 24) -> CandleSeries:
+        """Generate deterministic demo OHLCV candles for a symbol"""
+        step_ms = TIMEFRAME_SECONDS.get(timeframe, 3600) * 1000
+        # Candles are aligned to period boundaries and depend only on their timestamps
+        now_ms = to_epoch_ms(datetime.utcnow())
+        end_ms = now_ms - now_ms % step_ms
+        candles = self.generator.window(
+            symbol, timeframe, limit, end_ms,
+            base_price=self.get_base_price(symbol),
+            volatility=self.get_volatility(symbol)
+        )
+        return CandleSeries(
+            candles.timestamp,
+            np.round(candles.open, 6),
+            np.round(candles.high, 6),
+            np.round(candles.low, 6),
+            np.round(candles.close, 6),
+            np.round(candles.volume, 2)
+        )
+
+
+class BinanceProvider(MarketDataProvider):
+    """Binance spot klines"""
+
+    name = "binance"
+    source = "binance"
+    base_url = "https://api.binance.com"
+    timeframes = {tf: tf for tf in TIMEFRAME_SECONDS}
+
+    async def fetch_candles(self, symbol: str, timeframe: str = "1h", limit: int = 24) -> CandleSeries:
+        pair = symbol.replace("/", "") if "/" in symbol or symbol.endswith("USDT") else f"{symbol}USDT"
+        rows = await self._get_json("/api/v3/klines", {
+            "symbol": pair,
+            "interval": self.timeframes[timeframe],
+            "limit": limit
+        })
+        if not rows:
+            return CandleSeries.empty()
+        # [open_time, open, high, low, close, volume, close_time, ...]
+        columns = np.array([row[:6] for row in rows], dtype=np.float64)
+        return CandleSeries(columns[:, 0].astype(np.int64), *columns[:, 1:6].T)
+
+
+class CoinbaseProvider(MarketDataProvider):
+    """Coinbase Exchange product candles"""
+
+    name = "coinbase"
+    source = "coinbase"
+    base_url = "https://api.exchange.coinbase.com"
+    max_limit = 300
+    timeframes = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "1d": 86400}
+
+    async def fetch_candles(self, symbol: str, timeframe: str = "1h", limit: int = 24) -> CandleSeries:
+        product = symbol.replace("/", "-") if "/" in symbol else f"{symbol}-USD"
+        rows = await self._get_json(f"/products/{product}/candles", {"granularity": self.timeframes[timeframe]})
+        if not rows:
+            return CandleSeries.empty()
+        # [time, low, high, open, close, volume], newest first
+        columns = np.array(rows[:limit], dtype=np.float64)[::-1]
+        return CandleSeries(
+            columns[:, 0].astype(np.int64) * 1000,
+            columns[:, 3], columns[:, 2], columns[:, 1], columns[:, 4], columns[:, 5]
+        )
+
+
+class YahooProvider(MarketDataProvider):
+    """Yahoo Finance chart API for equities"""
+
+    name = "yahoo"
+    source = "yahoo"
+    base_url = "https://query1.finance.yahoo.com"
+    timeframes = {"1m": ("1m", "1d"), "5m": ("5m", "5d"), "15m": ("15m", "5d"), "1h": ("60m", "1mo"), "1d": ("1d", "1y")}
+    # Regular-session candles in each lookback range: 390 minutes a day, about 22 sessions a month
+    timeframe_limits = {"1m": 390, "5m": 390, "15m": 130, "1h": 154, "1d": 252}
+
+    async def fetch_candles(self, symbol: str, timeframe: str = "1h", limit: int = 24) -> CandleSeries:
+        interval, lookback = self.timeframes[timeframe]
+        payload = await self._get_json(f"/v8/finance/chart/{symbol}", {"interval": interval, "range": lookback})
+        try:
+            result = payload["chart"]["result"][0]
+            quote = result["indicators"]["quote"][0]
+            timestamps = np.asarray(result["timestamp"], dtype=np.int64) * 1000
+        except (KeyError, IndexError, TypeError) as e:
+            raise ProviderError(f"yahoo returned an unexpected payload for {symbol}") from e
+
+        columns = [np.asarray(quote[field], dtype=np.float64) for field in ("open", "high", "low", "close", "volume")]
+        # Yahoo leaves nulls for halted periods
+        valid = ~np.isnan(columns[3])
+        return CandleSeries(timestamps[valid], *(column[valid] for column in columns))[-limit:]
+
+
+class OandaProvider(MarketDataProvider):
+    """OANDA v20 instrument candles for forex"""
+
+    name = "oanda"
+    source = "oanda"
+    base_url = "https://api-fxpractice.oanda.com"
+    max_limit = 5000
+    timeframes = {"1m": "M1", "5m": "M5", "15m": "M15", "1h": "H1", "4h": "H4", "1d": "D"}
+
+    def _headers(self) -> Dict[str, str]:
+        headers = super()._headers()
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    async def fetch_candles(self, symbol: str, timeframe: str = "1h", limit: int = 24) -> CandleSeries:
+        payload = await self._get_json(f"/v3/instruments/{symbol.replace('/', '_')}/candles", {
+            "granularity": self.timeframes[timeframe],
+            "count": limit,
+            "price": "M"
+        })
+        candles = [c for c in payload.get("candles", []) if c.get("complete", True)]
+        return CandleSeries(
+            [to_epoch_ms(c["time"][:26].rstrip("Z")) for c in candles],
+            [float(c["mid"]["o"]) for c in candles],
+            [float(c["mid"]["h"]) for c in candles],
+            [float(c["mid"]["l"]) for c in candles],
+            [float(c["mid"]["c"]) for c in candles],
+            [float(c.get("volume", 0)) for c in candles]
+        )
+
+
+PROVIDER_CLASSES = {
+    provider.name: provider
+    for provider in (DemoProvider, BinanceProvider, CoinbaseProvider, YahooProvider, OandaProvider)
+}
+
+
+def build_providers(config: Optional[str] = None) -> Dict[str, MarketDataProvider]:
+    """Build the asset-class to provider routing table
+
+    Configured with MARKET_DATA_PROVIDERS, e.g. "crypto=binance,stocks=yahoo,forex=oanda".
+    Asset classes that are not configured use the demo provider.
+    """
+    config = config if config is not None else os.getenv("MARKET_DATA_PROVIDERS", "")
+    instances: Dict[str, MarketDataProvider] = {"demo": DemoProvider()}
+    routes: Dict[str, MarketDataProvider] = {}
+
+    for entry in filter(None, (part.strip() for part in config.split(","))):
+        asset_class, _, provider_name = entry.partition("=")
+        provider_class = PROVIDER_CLASSES.get(provider_name.strip())
+        if provider_class is None:
+            logger.warning(f"Unknown market data provider '{provider_name}' for {asset_class} - using demo data")
+            continue
+        if provider_class.name not in instances:
+            instances[provider_class.name] = provider_class()
+        routes[asset_class.strip()] = instances[provider_class.name]
+
+    routes.setdefault("default", instances["demo"])
+    return routes
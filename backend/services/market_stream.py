@@ -0,0 +1,172 @@
+"""
+Market Stream Hub for SynapseTrade AI™
+Pub/sub fan-out of live ticks and forming candles to WebSocket subscribers
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, Any, Set, Tuple
+
+from services.candles import TIMEFRAME_SECONDS
+from services.market_data_service import MarketDataService, market_data_service
+
+logger = logging.getLogger(__name__)
+
+
+class StreamConnection:
+    """One subscriber connection with a bounded, drop-oldest outbound queue"""
+
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.subscriptions: Set[Tuple[str, str]] = set()
+        self.dropped = 0
+
+    def offer(self, message: str):
+        """Enqueue a message, discarding the oldest one if the client is falling behind"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(message)
+
+
+class MarketStreamHub:
+    """Runs one producer per symbol and fans its updates out to every subscriber"""
+
+    def __init__(self, service: MarketDataService, tick_interval: Optional[float] = None,
+                 queue_size: Optional[int] = None):
+        self.service = service
+        self.tick_interval = tick_interval or float(os.getenv("MARKET_STREAM_TICK_SECONDS", 1.0))
+        self.queue_size = queue_size or int(os.getenv("MARKET_STREAM_QUEUE_SIZE", 256))
+        self.subscribers: Dict[Tuple[str, str], Set[StreamConnection]] = {}
+        self.producers: Dict[str, asyncio.Task] = {}
+        self.forming: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.connections: Set[StreamConnection] = set()
+        self.messages_published = 0
+
+    def connect(self) -> StreamConnection:
+        connection = StreamConnection(self.queue_size)
+        self.connections.add(connection)
+        return connection
+
+    async def disconnect(self, connection: StreamConnection):
+        for symbol, timeframe in list(connection.subscriptions):
+            await self.unsubscribe(connection, symbol, timeframe)
+        self.connections.discard(connection)
+
+    async def subscribe(self, connection: StreamConnection, symbol: str, timeframe: str = "1h"):
+        """Subscribe a connection and send it the current snapshot
+
+        Raises ValueError, leaving the connection unsubscribed, if no snapshot is available.
+        """
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        key = (symbol, timeframe)
+        # Warm the candle history and indicator state before live updates start
+        market_data = await self.service.get_market_data(symbol, timeframe)
+        if market_data["status"] != "success":
+            # No producer for a symbol that cannot be priced; it would only log failures
+            raise ValueError(f"Cannot subscribe to {symbol}: {market_data.get('error')}")
+        connection.offer(json.dumps({"type": "snapshot", **market_data}))
+
+        self.subscribers.setdefault(key, set()).add(connection)
+        connection.subscriptions.add(key)
+        if symbol not in self.producers or self.producers[symbol].done():
+            self.producers[symbol] = asyncio.create_task(self._produce(symbol))
+
+    async def unsubscribe(self, connection: StreamConnection, symbol: str, timeframe: str = "1h"):
+        key = (symbol, timeframe)
+        connection.subscriptions.discard(key)
+        subscribers = self.subscribers.get(key)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self.subscribers[key]
+                self.forming.pop(key, None)
+
+        # Stop the symbol's producer once nobody listens to any of its timeframes
+        if not any(sym == symbol for sym, _ in self.subscribers):
+            producer = self.producers.pop(symbol, None)
+            if producer:
+                producer.cancel()
+
+    async def pump(self, connection: StreamConnection, send: Callable[[str], Awaitable[None]]):
+        """Deliver queued messages to the client until cancelled"""
+        while True:
+            message = await connection.queue.get()
+            await send(message)
+
+    def _publish(self, connections: Set[StreamConnection], message: Dict[str, Any]):
+        # Serialize once per update regardless of subscriber count
+        payload = json.dumps(message)
+        for connection in connections:
+            connection.offer(payload)
+        self.messages_published += 1
+
+    async def _produce(self, symbol: str):
+        while True:
+            try:
+                price = await self.service.get_latest_price(symbol)
+                now_ms = int(time.time() * 1000)
+                timeframes = [tf for sym, tf in self.subscribers if sym == symbol]
+
+                listeners: Set[StreamConnection] = set()
+                for timeframe in timeframes:
+                    listeners |= self.subscribers.get((symbol, timeframe), set())
+                self._publish(listeners, {"type": "tick", "symbol": symbol, "price": price, "timestamp": now_ms})
+
+                for timeframe in timeframes:
+                    candle = self._update_forming(symbol, timeframe, price, now_ms)
+                    self._publish(self.subscribers.get((symbol, timeframe), set()), {
+                        "type": "candle",
+                        "symbol": symbol,
+                        "timeframe": timeframe,
+                        "candle": candle,
+                        "technical_indicators": self.service.get_indicator_snapshot(symbol, timeframe)
+                    })
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Market stream producer for {symbol} failed: {e}")
+            await asyncio.sleep(self.tick_interval)
+
+    def _update_forming(self, symbol: str, timeframe: str, price: float, now_ms: int) -> Dict[str, Any]:
+        """Fold a tick into the forming candle for a timeframe, committing the previous one once its period ends"""
+        step_ms = TIMEFRAME_SECONDS[timeframe] * 1000
+        period_start = now_ms - now_ms % step_ms
+        candle = self.forming.get((symbol, timeframe))
+        if candle is not None and candle["timestamp"] != period_start:
+            # The indicator state only drops its forming candle when a closed one is pushed
+            self.service.close_candle(symbol, timeframe, candle, price)
+            candle = None
+        if candle is None:
+            candle = {"timestamp": period_start, "open": price, "high": price, "low": price, "close": price}
+            self.forming[(symbol, timeframe)] = candle
+        else:
+            candle["high"] = max(candle["high"], price)
+            candle["low"] = min(candle["low"], price)
+            candle["close"] = price
+        return dict(candle)
+
+    async def close(self):
+        for producer in self.producers.values():
+            producer.cancel()
+        self.producers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.connections),
+            "producers": len(self.producers),
+            "subscriptions": sum(len(conns) for conns in self.subscribers.values()),
+            "messages_published": self.messages_published,
+            "messages_dropped": sum(connection.dropped for connection in self.connections)
+        }
+
+
+# Global market stream hub instance
+market_stream_hub = MarketStreamHub(market_data_service)
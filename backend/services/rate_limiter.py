@@ -0,0 +1,317 @@
+"""
+Provider Rate Limiter for SynapseTrade AI™
+Per-provider concurrency caps and adaptive request/token buckets
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default quotas per provider: (requests/minute, tokens/minute, max in flight); 0 disables a bucket
+DEFAULT_PROVIDER_LIMITS = {
+    "openai": (500, 30000, 16),
+    "claude": (50, 40000, 8),
+    "gemini": (60, 0, 8)
+}
+
+# Backoff after a 429 that carries no Retry-After, doubled per consecutive 429
+RATE_LIMIT_BACKOFF_SECONDS = 2.0
+MAX_BACKOFF_SECONDS = 60.0
+
+# Rate limit headers as sent by OpenAI and Anthropic
+REMAINING_HEADERS = {
+    "requests": ("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining"),
+    "tokens": ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining")
+}
+LIMIT_HEADERS = {
+    "requests": ("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit"),
+    "tokens": ("x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit")
+}
+RESET_HEADERS = {
+    "requests": ("x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset"),
+    "tokens": ("x-ratelimit-reset-tokens", "anthropic-ratelimit-tokens-reset")
+}
+
+_DURATION_PART = re.compile(r"([\d.]+)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted within its maximum wait"""
+
+
+def parse_delay(value: Optional[str]) -> Optional[float]:
+    """Seconds until a reset given as seconds, a duration like "6m0s", or an HTTP/ISO date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            moment = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    if not headers:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return max(0.0, float(milliseconds) / 1000)
+        except ValueError:
+            pass
+    return parse_delay(headers.get("retry-after"))
+
+
+def rate_limit_error_headers(error: Exception) -> Optional[Mapping[str, str]]:
+    """Response headers of a provider 429, or None if error is not a rate limit"""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None) or getattr(error, "code", None)
+    if status != 429:
+        return None
+    return getattr(response, "headers", None) or {}
+
+
+class TokenBucket:
+    """Continuously refilling bucket that admits requests in arrival order
+
+    Reservations may overdraw the bucket; each caller then waits until its share
+    has refilled, so queued requests are spread at the configured rate.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.configured = per_minute
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until amount could be taken, without reserving it"""
+        self._refill()
+        shortfall = min(amount, self.capacity) - self.tokens
+        return max(0.0, shortfall * 60.0 / self.per_minute)
+
+    def reserve(self, amount: float) -> float:
+        """Take amount now, returning the seconds to wait before using it"""
+        wait = self.delay(amount)
+        self.tokens -= amount
+        return wait
+
+    def refund(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def limit_remaining(self, remaining: float):
+        """Never believe more is available than the provider reports"""
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+
+    def set_limit(self, per_minute: float):
+        """Follow the provider's reported quota when it is below the configured one"""
+        per_minute = min(per_minute, self.configured)
+        if per_minute > 0 and per_minute != self.per_minute:
+            self._refill()
+            self.per_minute = self.capacity = per_minute
+            self.tokens = min(self.tokens, self.capacity)
+
+
+class ProviderLimiter:
+    """Admission control for one LLM provider
+
+    A request waits for its request and token budget, for any Retry-After pause,
+    and for a free in-flight slot, up to max_wait seconds in total; past that it
+    fails fast with RateLimitExceeded instead of piling onto the provider.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 max_concurrency: int = 8, max_wait: float = 30.0, retries: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.requests = TokenBucket(requests_per_minute, clock) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, clock) if tokens_per_minute > 0 else None
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_wait = max_wait
+        self.retries = retries
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.consecutive_limits = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.rate_limited = 0
+        self.queued_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, name: str) -> "ProviderLimiter":
+        """Limits from AI_<NAME>_RPM, AI_<NAME>_TPM and AI_<NAME>_MAX_CONCURRENCY"""
+        rpm, tpm, concurrency = DEFAULT_PROVIDER_LIMITS.get(name, (0, 0, 8))
+        prefix = f"AI_{name.upper()}_"
+        return cls(
+            name,
+            requests_per_minute=float(os.getenv(prefix + "RPM", rpm)),
+            tokens_per_minute=float(os.getenv(prefix + "TPM", tpm)),
+            max_concurrency=int(os.getenv(prefix + "MAX_CONCURRENCY", concurrency)),
+            max_wait=float(os.getenv("AI_RATE_LIMIT_MAX_WAIT", 30)),
+            retries=int(os.getenv("AI_RATE_LIMIT_RETRIES", 1))
+        )
+
+    async def call(self, request: Callable[[], Awaitable[Any]], estimated_tokens: int = 0) -> Any:
+        """Run request once admitted, retrying provider 429s within the same wait budget
+
+        Responses exposing headers (SDK raw responses) feed the adaptive limits.
+        """
+        deadline = self.clock() + self.max_wait
+        attempt = 0
+        while True:
+            await self._admit(estimated_tokens, deadline)
+            self.in_flight += 1
+            try:
+                response = await request()
+            except Exception as e:
+                headers = rate_limit_error_headers(e)
+                if headers is None:
+                    raise
+                delay = self._rate_limited(headers)
+                if attempt >= self.retries or self.clock() + delay > deadline:
+                    raise
+                attempt += 1
+                logger.warning(f"{self.name} rate limited, retrying in {delay:.1f}s")
+                continue
+            finally:
+                self.in_flight -= 1
+                self.semaphore.release()
+            self.consecutive_limits = 0
+            self.observe(getattr(response, "headers", None))
+            return response
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once a response reports its real usage"""
+        if self.tokens is not None and actual_tokens is not None:
+            difference = estimated_tokens - actual_tokens
+            if difference > 0:
+                self.tokens.refund(difference)
+            else:
+                self.tokens.tokens += difference
+
+    async def _admit(self, estimated_tokens: int, deadline: float):
+        started = self.clock()
+        wait = max(
+            self.paused_until - started,
+            self.requests.delay(1) if self.requests else 0.0,
+            self.tokens.delay(estimated_tokens) if self.tokens and estimated_tokens else 0.0
+        )
+        if started + wait > deadline:
+            self.rejected += 1
+            raise RateLimitExceeded(f"{self.name} request would wait {wait:.1f}s for rate limits")
+
+        if self.requests:
+            self.requests.reserve(1)
+        if self.tokens and estimated_tokens:
+            self.tokens.reserve(estimated_tokens)
+        acquired = False
+        try:
+            # Re-check after each sleep: a 429 elsewhere may have extended the pause
+            while (delay := max(wait, self.paused_until - self.clock())) > 0:
+                if self.clock() + delay > deadline:
+                    raise RateLimitExceeded(f"{self.name} is paused by the provider beyond the wait budget")
+                await asyncio.sleep(delay)
+                wait = 0.0
+            async with asyncio.timeout(max(0.0, deadline - self.clock())):
+                await self.semaphore.acquire()
+                # A timeout or cancellation landing after this point must give the slot back
+                acquired = True
+        except (asyncio.TimeoutError, RateLimitExceeded, asyncio.CancelledError) as e:
+            if acquired:
+                self.semaphore.release()
+            if self.requests:
+                self.requests.refund(1)
+            if self.tokens and estimated_tokens:
+                self.tokens.refund(estimated_tokens)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            if isinstance(e, asyncio.TimeoutError):
+                raise RateLimitExceeded(f"No free {self.name} slot within the wait budget") from e
+            raise
+        self.admitted += 1
+        self.queued_seconds += self.clock() - started
+
+    def _rate_limited(self, headers: Mapping[str, str]) -> float:
+        """Pause every request to this provider after a 429"""
+        self.rate_limited += 1
+        self.consecutive_limits += 1
+        self.observe(headers)
+        delay = retry_after(headers)
+        if delay is None:
+            delay = min(MAX_BACKOFF_SECONDS, RATE_LIMIT_BACKOFF_SECONDS * 2 ** (self.consecutive_limits - 1))
+        self.paused_until = max(self.paused_until, self.clock() + delay)
+        return delay
+
+    def observe(self, headers: Optional[Mapping[str, str]]):
+        """Adapt the buckets to the provider's reported limits and remaining budget"""
+        if not headers:
+            return
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            limit = _first_number(headers, LIMIT_HEADERS[kind])
+            remaining = _first_number(headers, REMAINING_HEADERS[kind])
+            if bucket is not None and limit:
+                bucket.set_limit(limit)
+            if bucket is not None and remaining is not None:
+                bucket.limit_remaining(remaining)
+            if remaining == 0:
+                # Budget exhausted: hold everything until the provider's window resets
+                reset = next((parse_delay(headers.get(name)) for name in RESET_HEADERS[kind] if headers.get(name)), None)
+                if reset:
+                    self.paused_until = max(self.paused_until, self.clock() + reset)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.requests.per_minute if self.requests else None,
+            "tokens_per_minute": self.tokens.per_minute if self.tokens else None,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "paused_for_seconds": round(max(0.0, self.paused_until - self.clock()), 3),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "rate_limited": self.rate_limited,
+            "average_queue_seconds": round(self.queued_seconds / self.admitted, 4) if self.admitted else 0.0
+        }
+
+
+def _first_number(headers: Mapping[str, str], names) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    return None
@@ -0,0 +1,137 @@
+"""
+Timeframe Resampler for SynapseTrade AI™
+Aggregates base-resolution candles into higher timeframes
+"""
+
+import logging
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from services.candles import TIMEFRAME_SECONDS, CandleSeries
+
+logger = logging.getLogger(__name__)
+
+
+def timeframe_ms(timeframe: str) -> int:
+    if timeframe not in TIMEFRAME_SECONDS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return TIMEFRAME_SECONDS[timeframe] * 1000
+
+
+def resample_ratio(base_timeframe: str, timeframe: str) -> int:
+    """Number of base candles per target candle"""
+    base_ms, target_ms = timeframe_ms(base_timeframe), timeframe_ms(timeframe)
+    if target_ms < base_ms or target_ms % base_ms:
+        raise ValueError(f"Cannot resample {base_timeframe} candles into {timeframe}")
+    return target_ms // base_ms
+
+
+def resample(candles: CandleSeries, timeframe: str) -> CandleSeries:
+    """Aggregate candles into epoch-aligned buckets of a higher timeframe
+
+    open is the first open, high the max, low the min, close the last close and
+    volume the sum of each bucket. The last bucket may be incomplete.
+    """
+    if not len(candles):
+        return CandleSeries.empty()
+    step = timeframe_ms(timeframe)
+    buckets = candles.timestamp - candles.timestamp % step
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    ends = np.concatenate([starts[1:], [len(candles)]]) - 1
+    return CandleSeries(
+        buckets[starts],
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        np.add.reduceat(candles.volume, starts)
+    )
+
+
+class IncrementalResampler:
+    """Maintains every higher timeframe of one symbol as base candles close"""
+
+    def __init__(self, base_timeframe: str, timeframes: Optional[List[str]] = None, max_candles: int = 500):
+        self.base_timeframe = base_timeframe
+        self.base_ms = timeframe_ms(base_timeframe)
+        if timeframes is None:
+            timeframes = [
+                tf for tf in TIMEFRAME_SECONDS
+                if tf != base_timeframe and self._divides(tf)
+            ]
+        self.timeframes = timeframes
+        self.max_candles = max_candles
+        self.closed: Dict[str, CandleSeries] = {tf: CandleSeries.empty() for tf in timeframes}
+        self.pending: Dict[str, List[Dict[str, Any]]] = {tf: [] for tf in timeframes}
+        self.forming: Dict[str, Optional[Dict[str, Any]]] = {tf: None for tf in timeframes}
+        self.last_timestamp: Optional[int] = None
+        self.history_candles = 0
+
+    def _divides(self, timeframe: str) -> bool:
+        target = TIMEFRAME_SECONDS[timeframe] * 1000
+        return target > self.base_ms and target % self.base_ms == 0
+
+    def bootstrap(self, base: CandleSeries):
+        """Resample a base history in one vectorized pass per timeframe"""
+        self.history_candles = len(base)
+        self.last_timestamp = base.last_timestamp
+        for tf in self.timeframes:
+            self.pending[tf] = []
+            self.forming[tf] = None
+            series = resample(base, tf)
+            if len(series) and base.timestamp[0] % timeframe_ms(tf):
+                # History started mid-bucket, so the first candle is partial
+                series = series[1:]
+            if len(series) and not self._is_complete(tf, series.last_timestamp):
+                self.forming[tf] = series[len(series) - 1]
+                series = series[:len(series) - 1]
+            self.closed[tf] = series[-self.max_candles:]
+
+    def push(self, base: CandleSeries) -> Dict[str, List[Dict[str, Any]]]:
+        """Fold newly closed base candles in, returning higher-timeframe candles that closed"""
+        closed_now: Dict[str, List[Dict[str, Any]]] = {tf: [] for tf in self.timeframes}
+        new = base.since(self.last_timestamp)
+        for i in range(len(new)):
+            candle = new[i]
+            for tf in self.timeframes:
+                bucket = candle["timestamp"] - candle["timestamp"] % timeframe_ms(tf)
+                forming = self.forming[tf]
+                if forming is not None and forming["timestamp"] != bucket:
+                    # A gap skipped the end of the previous bucket
+                    self._close(tf, forming, closed_now)
+                    forming = None
+                if forming is None:
+                    forming = {**candle, "timestamp": bucket}
+                else:
+                    forming["high"] = max(forming["high"], candle["high"])
+                    forming["low"] = min(forming["low"], candle["low"])
+                    forming["close"] = candle["close"]
+                    forming["volume"] += candle["volume"]
+                self.forming[tf] = forming
+                if self._is_complete(tf, bucket, candle["timestamp"]):
+                    self._close(tf, forming, closed_now)
+            self.last_timestamp = candle["timestamp"]
+        return closed_now
+
+    def series(self, timeframe: str, include_forming: bool = False) -> CandleSeries:
+        """Closed candles for a timeframe, optionally with the forming one appended"""
+        pending = self.pending[timeframe]
+        if pending:
+            self.closed[timeframe] = self.closed[timeframe].append(CandleSeries.from_rows(pending))[-self.max_candles:]
+            self.pending[timeframe] = []
+        series = self.closed[timeframe]
+        if include_forming and self.forming[timeframe] is not None:
+            series = series.append(CandleSeries.from_rows([self.forming[timeframe]]))
+        return series
+
+    def _is_complete(self, timeframe: str, bucket: int, last_base: Optional[int] = None) -> bool:
+        last_base = self.last_timestamp if last_base is None else last_base
+        return last_base is not None and last_base + self.base_ms >= bucket + timeframe_ms(timeframe)
+
+    def _close(self, timeframe: str, candle: Dict[str, Any], closed_now: Dict[str, List[Dict[str, Any]]]):
+        self.pending[timeframe].append(candle)
+        closed_now[timeframe].append(candle)
+        self.forming[timeframe] = None
+        if len(self.pending[timeframe]) >= self.max_candles:
+            self.series(timeframe)
@@ -0,0 +1,68 @@
+"""
+Serialization for SynapseTrade AI™
+Fast JSON encoding of result types, datetimes and numeric arrays
+"""
+
+import dataclasses
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is the fallback
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+class ResultRecord:
+    """Base for slotted result dataclasses, giving them a shallow dict view"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Field values by name, without copying nested containers"""
+        return {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+
+
+def _default(obj: Any) -> Any:
+    """Encode the types neither encoder handles natively"""
+    if isinstance(obj, ResultRecord):
+        return obj.to_dict()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    # Anything else (ObjectId, pydantic models, enums, ...) takes FastAPI's generic path
+    return jsonable_encoder(obj)
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Serialize to compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by the fast encoder
+
+    Return it directly from a route so FastAPI does not also run jsonable_encoder
+    over the content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
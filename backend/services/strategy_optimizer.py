@@ -0,0 +1,240 @@
+"""
+Strategy Optimizer for SynapseTrade AI™
+Process-parallel parameter sweeps over the backtesting engine
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from services.backtest_engine import BACKTEST_DEFAULTS, run_backtest
+from services.candles import CandleSeries
+from services.market_data_service import bounded_map
+
+logger = logging.getLogger(__name__)
+
+OPTIMIZER_WORKERS = int(os.getenv("OPTIMIZER_WORKERS", 0)) or os.cpu_count() or 1
+OPTIMIZER_MAX_TRIALS = int(os.getenv("OPTIMIZER_MAX_TRIALS", 10000))
+
+# Trials per worker task: large enough to amortize IPC, small enough to stream steadily
+MAX_TRIALS_PER_TASK = 16
+TOP_TRIALS = 10
+
+# Shared candle blocks a worker keeps attached across tasks
+WORKER_ATTACHED_LIMIT = 4
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, CandleSeries]] = {}
+
+
+def _range_values(name: str, spec: Any) -> List[Any]:
+    """Grid values for one parameter: an explicit list, or a {min, max, step} range"""
+    if isinstance(spec, list):
+        values = spec
+    elif isinstance(spec, dict) and {"min", "max"} <= spec.keys():
+        step = spec.get("step")
+        if not step or step <= 0:
+            raise ValueError(f"Grid range for {name} needs a positive step")
+        count = int(math.floor((spec["max"] - spec["min"]) / step + 1e-9)) + 1
+        values = (spec["min"] + step * np.arange(max(count, 0))).tolist()
+    else:
+        raise ValueError(f"Range for {name} must be a list of values or a {{min, max, step}} object")
+    if not values:
+        raise ValueError(f"Range for {name} is empty")
+    return [_coerce(name, value) for value in values]
+
+
+def _coerce(name: str, value: Any) -> Any:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Value for {name} must be numeric")
+    if isinstance(BACKTEST_DEFAULTS[name], int):
+        return int(round(value))
+    return round(float(value), 10)
+
+
+def build_trials(ranges: Dict[str, Any], method: str = "grid", trials: Optional[int] = None,
+                 seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Expand parameter ranges into per-trial parameter overrides
+
+    Grid search takes the cartesian product of every range. Random search draws
+    trials samples, uniformly from {min, max} ranges (step optional) or from lists.
+    """
+    if not ranges:
+        raise ValueError("At least one parameter range is required")
+    unknown = sorted(set(ranges) - set(BACKTEST_DEFAULTS))
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}; valid parameters are {', '.join(BACKTEST_DEFAULTS)}")
+    names = list(ranges)
+
+    if method == "grid":
+        grids = [_range_values(name, ranges[name]) for name in names]
+        total = math.prod(len(values) for values in grids)
+        if total > OPTIMIZER_MAX_TRIALS:
+            raise ValueError(f"Grid has {total} trials; at most {OPTIMIZER_MAX_TRIALS} are allowed")
+        return [dict(zip(names, combo)) for combo in itertools.product(*grids)]
+
+    if method == "random":
+        trials = trials or 100
+        if trials < 1 or trials > OPTIMIZER_MAX_TRIALS:
+            raise ValueError(f"Random search takes between 1 and {OPTIMIZER_MAX_TRIALS} trials")
+        rng = np.random.default_rng(seed)
+        columns = []
+        for name in names:
+            spec = ranges[name]
+            if isinstance(spec, dict) and {"min", "max"} <= spec.keys() and not spec.get("step"):
+                if spec["min"] > spec["max"]:
+                    raise ValueError(f"Range for {name} has min above max")
+                if isinstance(BACKTEST_DEFAULTS[name], int):
+                    samples = rng.integers(int(spec["min"]), int(spec["max"]), endpoint=True, size=trials)
+                else:
+                    samples = rng.uniform(spec["min"], spec["max"], size=trials)
+                columns.append([_coerce(name, value) for value in samples.tolist()])
+            else:
+                values = _range_values(name, spec)
+                columns.append([values[i] for i in rng.integers(len(values), size=trials)])
+        return [dict(zip(names, combo)) for combo in zip(*columns)]
+
+    raise ValueError(f"Unsupported search method: {method}")
+
+
+def _share_candles(candles: CandleSeries) -> shared_memory.SharedMemory:
+    """Copy a series into one shared block laid out as consecutive 8-byte columns"""
+    length = len(candles)
+    block = shared_memory.SharedMemory(create=True, size=max(1, length * 8 * len(CandleSeries.__slots__)))
+    for i, column in enumerate(CandleSeries.__slots__):
+        values = getattr(candles, column)
+        view = np.ndarray((length,), dtype=values.dtype, buffer=block.buf, offset=i * length * 8)
+        view[:] = values
+    return block
+
+
+def _attach_candles(name: str, length: int) -> CandleSeries:
+    """Zero-copy series over a shared block, attached once per worker process"""
+    if name in _attached:
+        return _attached[name][1]
+    while len(_attached) >= WORKER_ATTACHED_LIMIT:
+        # Sweeps finish in order, so the oldest attachment is the one least likely to be reused
+        block, _ = _attached.pop(next(iter(_attached)))
+        block.close()
+    # Workers of this process's pool share its resource tracker; any other process would get its own
+    shared_tracker = resource_tracker._resource_tracker._fd is not None
+    block = shared_memory.SharedMemory(name=name)
+    if not shared_tracker:
+        # Attaching registers the block again (before Python 3.13), and a private tracker
+        # would unlink it when this process exits; the sweep that created it owns cleanup
+        resource_tracker.unregister(block._name, "shared_memory")
+    candles = CandleSeries(*(
+        np.ndarray((length,), dtype=np.int64 if column == "timestamp" else np.float64,
+                   buffer=block.buf, offset=i * length * 8)
+        for i, column in enumerate(CandleSeries.__slots__)
+    ))
+    _attached[name] = (block, candles)
+    return candles
+
+
+def _run_trials(block_name: str, length: int, spec: Dict[str, Any], timeframe: str,
+                initial_capital: float, trials: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Worker entry point: backtest a chunk of trials against shared candles"""
+    candles = _attach_candles(block_name, length)
+    results = []
+    for index, overrides in trials:
+        trial_spec = {**spec, "parameters": {**spec["parameters"], **overrides}}
+        try:
+            metrics = run_backtest(candles, trial_spec, timeframe, initial_capital, include_details=False)["metrics"]
+            results.append({"trial": index, "parameters": overrides, "metrics": metrics, "status": "success"})
+        except Exception as e:
+            results.append({"trial": index, "parameters": overrides, "error": str(e), "status": "error"})
+    return results
+
+
+def _score(result: Dict[str, Any], objective: str) -> float:
+    value = result.get("metrics", {}).get(objective)
+    return float(value) if value is not None else -math.inf
+
+
+class StrategyOptimizer:
+    """Runs parameter sweeps on a process pool sized to the host's cores"""
+
+    def __init__(self, workers: int = OPTIMIZER_WORKERS):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.trials_run = 0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Start worker processes on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def sweep(self, candles: CandleSeries, spec: Dict[str, Any], trials: List[Dict[str, Any]],
+                    timeframe: str = "1h", initial_capital: float = 10000.0,
+                    objective: str = "sharpe_ratio") -> AsyncIterator[Dict[str, Any]]:
+        """Yield each trial's metrics as it finishes, then a summary of the best trials
+
+        Candles are placed in shared memory once per sweep; workers map them rather
+        than receiving a pickled copy with every task.
+        """
+        started = datetime.utcnow()
+        loop = asyncio.get_running_loop()
+        block = _share_candles(candles)
+        chunk_size = max(1, min(MAX_TRIALS_PER_TASK, math.ceil(len(trials) / (self.workers * 4))))
+        indexed = list(enumerate(trials))
+        chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+        results: List[Dict[str, Any]] = []
+        failed = 0
+        try:
+            tasks = bounded_map(
+                chunks,
+                lambda chunk: loop.run_in_executor(
+                    self.pool, _run_trials, block.name, len(candles), spec, timeframe, initial_capital, chunk
+                ),
+                self.workers * 2
+            )
+            async for chunk, outcome in tasks:
+                if isinstance(outcome, Exception):
+                    outcome = [
+                        {"trial": index, "parameters": overrides, "error": str(outcome), "status": "error"}
+                        for index, overrides in chunk
+                    ]
+                for result in outcome:
+                    if result["status"] == "success":
+                        results.append(result)
+                    else:
+                        failed += 1
+                    yield {"type": "trial", **result}
+        finally:
+            block.close()
+            block.unlink()
+        self.trials_run += len(results) + failed
+
+        ranked = sorted(results, key=lambda result: _score(result, objective), reverse=True)
+        yield {
+            "type": "summary",
+            "timestamp": datetime.utcnow().isoformat(),
+            "objective": objective,
+            "total_trials": len(trials),
+            "successful_trials": len(results),
+            "failed_trials": failed,
+            "best_parameters": {**spec["parameters"], **ranked[0]["parameters"]} if ranked else None,
+            "top_trials": ranked[:TOP_TRIALS],
+            "elapsed_seconds": round((datetime.utcnow() - started).total_seconds(), 3)
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "pool_started": self._pool is not None, "trials_run": self.trials_run}
+
+
+# Global strategy optimizer instance
+strategy_optimizer = StrategyOptimizer()
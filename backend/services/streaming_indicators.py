@@ -0,0 +1,283 @@
+"""
+Streaming Indicators for SynapseTrade AI™
+Incremental per-symbol indicator state with constant-time candle and tick updates
+"""
+
+import copy
+import logging
+import math
+from collections import deque
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from services.candles import CandleSeries
+from services.technical_indicators import MIN_PERIODS, ema, true_range, wilder_smooth
+
+logger = logging.getLogger(__name__)
+
+
+class RollingWindow:
+    """Fixed-size window with a running sum and Welford mean/variance"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, value: float):
+        """Add a value, evicting the oldest one once the window is full"""
+        self.total, self.mean, self.m2 = self._apply(value)
+        if len(self.values) == self.size:
+            self.values.popleft()
+        self.values.append(value)
+
+    def preview(self, value: float) -> Dict[str, float]:
+        """Return mean and standard deviation as if value had been pushed"""
+        total, mean, m2 = self._apply(value)
+        count = min(len(self.values) + 1, self.size)
+        return {"sum": total, "mean": mean, "std": math.sqrt(max(m2 / count, 0.0))}
+
+    def stats(self) -> Dict[str, float]:
+        """Return mean and standard deviation of the current window"""
+        count = len(self.values)
+        if count == 0:
+            return {"sum": 0.0, "mean": math.nan, "std": math.nan}
+        return {"sum": self.total, "mean": self.mean, "std": math.sqrt(max(self.m2 / count, 0.0))}
+
+    def _apply(self, value: float):
+        count = len(self.values)
+        if count < self.size:
+            # Standard Welford step while the window is still filling
+            delta = value - self.mean
+            mean = self.mean + delta / (count + 1)
+            m2 = self.m2 + delta * (value - mean)
+            return self.total + value, mean, m2
+        # Sliding Welford step: replace the oldest value in a full window
+        oldest = self.values[0]
+        mean = self.mean + (value - oldest) / count
+        m2 = self.m2 + (value - oldest) * (value - mean + oldest - self.mean)
+        return self.total + value - oldest, mean, m2
+
+    @classmethod
+    def from_values(cls, size: int, values) -> "RollingWindow":
+        window = cls(size)
+        tail = [float(v) for v in values[-size:]]
+        window.values.extend(tail)
+        if tail:
+            window.total = float(sum(tail))
+            window.mean = window.total / len(tail)
+            window.m2 = float(sum((v - window.mean) ** 2 for v in tail))
+        return window
+
+
+class EMAAccumulator:
+    """Exponential moving average seeded with the first observation"""
+
+    def __init__(self, span: int, value: Optional[float] = None):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = value
+
+    def push(self, value: float):
+        self.value = self.preview(value)
+
+    def preview(self, value: float) -> float:
+        if self.value is None:
+            return value
+        return self.alpha * value + (1.0 - self.alpha) * self.value
+
+
+class WilderAccumulator:
+    """Wilder smoothing seeded with the simple mean of the first period"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = math.nan
+
+    def push(self, value: float):
+        self.value = self.preview(value)
+        if self.count < self.period:
+            self.seed_sum += value
+        self.count += 1
+
+    def preview(self, value: float) -> float:
+        if self.count + 1 < self.period:
+            return math.nan
+        if self.count + 1 == self.period:
+            return (self.seed_sum + value) / self.period
+        return (self.value * (self.period - 1) + value) / self.period
+
+
+class IndicatorState:
+    """Incremental indicator state for one symbol and timeframe"""
+
+    def __init__(self):
+        self.sma_10 = RollingWindow(10)
+        self.sma_20 = RollingWindow(20)
+        self.ema_12 = EMAAccumulator(12)
+        self.ema_26 = EMAAccumulator(26)
+        self.signal = EMAAccumulator(9)
+        self.avg_gain = WilderAccumulator(14)
+        self.avg_loss = WilderAccumulator(14)
+        self.atr = WilderAccumulator(14)
+        self.prev_close: Optional[float] = None
+        self.last_timestamp = None
+        self.candle_count = 0
+        self.forming: Optional[Dict[str, float]] = None
+        # State as of the last fetched candle while provisional candles sit on top of it
+        self._confirmed: Optional["IndicatorState"] = None
+
+    def push_candle(self, timestamp: int, high: float, low: float, close: float):
+        """Commit a closed candle in O(1)"""
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            self.avg_gain.push(max(change, 0.0))
+            self.avg_loss.push(max(-change, 0.0))
+        self.atr.push(self._true_range(high, low, close))
+        self.sma_10.push(close)
+        self.sma_20.push(close)
+        self.ema_12.push(close)
+        self.ema_26.push(close)
+        self.signal.push(self.ema_12.value - self.ema_26.value)
+        self.prev_close = close
+        self.last_timestamp = timestamp
+        self.candle_count += 1
+        self.forming = None
+
+    def update_tick(self, price: float):
+        """Fold a trade tick into the forming candle without committing it"""
+        if self.forming is None:
+            self.forming = {"high": price, "low": price, "close": price}
+        else:
+            self.forming["high"] = max(self.forming["high"], price)
+            self.forming["low"] = min(self.forming["low"], price)
+            self.forming["close"] = price
+
+    def push_provisional(self, timestamp: int, high: float, low: float, close: float):
+        """Commit a candle built from live ticks until fetched candles replace it"""
+        if self._confirmed is None:
+            self._confirmed = copy.deepcopy(self)
+        self.push_candle(timestamp, high, low, close)
+
+    def ingest(self, candles: CandleSeries) -> int:
+        """Push only candles newer than the last committed one
+
+        Provisional candles are rolled back once fetched candles reach past the
+        last confirmed one, so the provider's version of each period wins.
+        """
+        if self._confirmed is not None and len(candles.since(self._confirmed.last_timestamp)):
+            self.__dict__.update(self._confirmed.__dict__)
+        new = candles.since(self.last_timestamp)
+        for row in zip(new.timestamp.tolist(), new.high.tolist(), new.low.tolist(), new.close.tolist()):
+            self.push_candle(*row)
+        return len(new)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Read the latest indicator values, including any forming candle"""
+        count = self.candle_count + (1 if self.forming else 0)
+        if count < MIN_PERIODS:
+            return {}
+
+        if self.forming is None:
+            close = self.prev_close
+            sma_10 = self.sma_10.stats()
+            sma_20 = self.sma_20.stats()
+            ema_12, ema_26 = self.ema_12.value, self.ema_26.value
+            signal_line = self.signal.value
+            avg_gain, avg_loss, atr = self.avg_gain.value, self.avg_loss.value, self.atr.value
+        else:
+            close = self.forming["close"]
+            sma_10 = self.sma_10.preview(close)
+            sma_20 = self.sma_20.preview(close)
+            ema_12, ema_26 = self.ema_12.preview(close), self.ema_26.preview(close)
+            signal_line = self.signal.preview(ema_12 - ema_26)
+            change = close - self.prev_close if self.prev_close is not None else 0.0
+            avg_gain = self.avg_gain.preview(max(change, 0.0))
+            avg_loss = self.avg_loss.preview(max(-change, 0.0))
+            atr = self.atr.preview(self._true_range(self.forming["high"], self.forming["low"], close))
+
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            rsi = math.nan
+        elif avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        macd_line = ema_12 - ema_26
+        values = {
+            "sma_10": sma_10["mean"],
+            "sma_20": sma_20["mean"],
+            "ema_12": ema_12,
+            "ema_26": ema_26,
+            "rsi": rsi,
+            "bollinger_upper": sma_20["mean"] + 2 * sma_20["std"],
+            "bollinger_lower": sma_20["mean"] - 2 * sma_20["std"],
+            "bollinger_middle": sma_20["mean"],
+            "macd": macd_line,
+            "signal_line": signal_line,
+            "macd_histogram": macd_line - signal_line,
+            "atr": atr,
+            "volatility": sma_20["std"]
+        }
+        return {
+            name: (None if value is None or math.isnan(value) else round(value, 2))
+            for name, value in values.items()
+        }
+
+    def _true_range(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    @classmethod
+    def bootstrap(cls, candle_sets: List[CandleSeries]) -> List["IndicatorState"]:
+        """Build states for many symbols from history using vectorized array passes"""
+        states = [cls() for _ in candle_sets]
+        groups: Dict[int, List[int]] = {}
+        for index, candles in enumerate(candle_sets):
+            if len(candles):
+                groups.setdefault(len(candles), []).append(index)
+
+        for length, indexes in groups.items():
+            close = np.vstack([candle_sets[i].close for i in indexes])
+            high = np.vstack([candle_sets[i].high for i in indexes])
+            low = np.vstack([candle_sets[i].low for i in indexes])
+
+            ema_12 = ema(close, 12)
+            ema_26 = ema(close, 26)
+            signal = ema(ema_12 - ema_26, 9)[:, -1]
+            changes = np.diff(close, axis=1)
+            gains = np.clip(changes, 0.0, None)
+            losses = np.clip(-changes, 0.0, None)
+            ranges = true_range(high, low, close)
+            avg_gain = wilder_smooth(gains, 14)[:, -1] if gains.shape[1] else np.full(len(indexes), np.nan)
+            avg_loss = wilder_smooth(losses, 14)[:, -1] if losses.shape[1] else np.full(len(indexes), np.nan)
+            avg_range = wilder_smooth(ranges, 14)[:, -1]
+
+            for row, i in enumerate(indexes):
+                state = states[i]
+                state.sma_10 = RollingWindow.from_values(10, close[row])
+                state.sma_20 = RollingWindow.from_values(20, close[row])
+                state.ema_12.value = float(ema_12[row, -1])
+                state.ema_26.value = float(ema_26[row, -1])
+                state.signal.value = float(signal[row])
+                cls._seed_wilder(state.avg_gain, gains[row], avg_gain[row])
+                cls._seed_wilder(state.avg_loss, losses[row], avg_loss[row])
+                cls._seed_wilder(state.atr, ranges[row], avg_range[row])
+                state.prev_close = float(close[row, -1])
+                state.last_timestamp = candle_sets[i].last_timestamp
+                state.candle_count = length
+
+        return states
+
+    @staticmethod
+    def _seed_wilder(accumulator: WilderAccumulator, history: np.ndarray, smoothed: float):
+        accumulator.count = len(history)
+        if accumulator.count < accumulator.period:
+            accumulator.seed_sum = float(history.sum())
+        else:
+            accumulator.value = float(smoothed)
@@ -0,0 +1,273 @@
+"""
+Symbol Registry for SynapseTrade AI™
+Instrument metadata with indexed prefix and typo-tolerant search
+"""
+
+import csv
+import json
+import logging
+import os
+import re
+from bisect import bisect_left
+from itertools import islice
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Most index keys scanned per prefix, and symbols considered per key, before ranking
+PREFIX_SCAN_LIMIT = 256
+KEY_SYMBOL_LIMIT = 64
+
+# symbol, name, asset class, exchange, quote currency, tick size, reference price,
+# annualized volatility, trending rank, aliases
+DEFAULT_SYMBOLS = [
+    ("BTC", "Bitcoin", "crypto", "BINANCE", "USDT", 0.01, 45000, 0.65, 1, ["XBT", "BTCUSD", "BTCUSDT"]),
+    ("ETH", "Ethereum", "crypto", "BINANCE", "USDT", 0.01, 2800, 0.8, 2, ["ETHUSD", "ETHUSDT", "ETHER"]),
+    ("BNB", "BNB", "crypto", "BINANCE", "USDT", 0.01, 310, 0.7, 3, ["BNBUSDT", "BINANCE COIN"]),
+    ("ADA", "Cardano", "crypto", "BINANCE", "USDT", 0.0001, 0.55, 0.9, 4, ["ADAUSDT"]),
+    ("SOL", "Solana", "crypto", "BINANCE", "USDT", 0.01, 100, 1.0, 5, ["SOLUSDT"]),
+    ("DOT", "Polkadot", "crypto", "BINANCE", "USDT", 0.001, 7.5, 0.9, 6, ["DOTUSDT"]),
+    ("AVAX", "Avalanche", "crypto", "BINANCE", "USDT", 0.01, 35, 1.0, 7, ["AVAXUSDT"]),
+    ("MATIC", "Polygon", "crypto", "BINANCE", "USDT", 0.0001, 0.85, 1.0, 8, ["MATICUSDT", "POL"]),
+    ("XRP", "XRP", "crypto", "BINANCE", "USDT", 0.0001, 0.6, 0.85, None, ["XRPUSDT", "RIPPLE"]),
+    ("DOGE", "Dogecoin", "crypto", "BINANCE", "USDT", 0.00001, 0.09, 1.1, None, ["DOGEUSDT"]),
+    ("LTC", "Litecoin", "crypto", "BINANCE", "USDT", 0.01, 70, 0.8, None, ["LTCUSDT"]),
+    ("LINK", "Chainlink", "crypto", "BINANCE", "USDT", 0.001, 15, 0.95, None, ["LINKUSDT"]),
+    ("AAPL", "Apple Inc.", "stocks", "NASDAQ", "USD", 0.01, 180, 0.28, 1, []),
+    ("GOOGL", "Alphabet Inc. Class A", "stocks", "NASDAQ", "USD", 0.01, 140, 0.3, 2, ["GOOG", "GOOGLE"]),
+    ("MSFT", "Microsoft Corporation", "stocks", "NASDAQ", "USD", 0.01, 400, 0.25, 3, []),
+    ("TSLA", "Tesla Inc.", "stocks", "NASDAQ", "USD", 0.01, 250, 0.6, 4, []),
+    ("AMZN", "Amazon.com Inc.", "stocks", "NASDAQ", "USD", 0.01, 155, 0.32, 5, []),
+    ("META", "Meta Platforms Inc.", "stocks", "NASDAQ", "USD", 0.01, 350, 0.38, 6, ["FB", "FACEBOOK"]),
+    ("NFLX", "Netflix Inc.", "stocks", "NASDAQ", "USD", 0.01, 480, 0.4, 7, []),
+    ("NVDA", "NVIDIA Corporation", "stocks", "NASDAQ", "USD", 0.01, 480, 0.5, 8, []),
+    ("AMD", "Advanced Micro Devices Inc.", "stocks", "NASDAQ", "USD", 0.01, 140, 0.5, None, []),
+    ("INTC", "Intel Corporation", "stocks", "NASDAQ", "USD", 0.01, 45, 0.35, None, []),
+    ("JPM", "JPMorgan Chase & Co.", "stocks", "NYSE", "USD", 0.01, 170, 0.22, None, []),
+    ("V", "Visa Inc.", "stocks", "NYSE", "USD", 0.01, 260, 0.2, None, []),
+    ("WMT", "Walmart Inc.", "stocks", "NYSE", "USD", 0.01, 160, 0.18, None, []),
+    ("SPY", "SPDR S&P 500 ETF Trust", "stocks", "NYSEARCA", "USD", 0.01, 475, 0.15, None, ["SP500"]),
+    ("QQQ", "Invesco QQQ Trust", "stocks", "NASDAQ", "USD", 0.01, 400, 0.2, None, ["NASDAQ100"]),
+    ("EUR/USD", "Euro / US Dollar", "forex", "OANDA", "USD", 0.00001, 1.08, 0.08, 1, ["EURUSD", "EUR_USD"]),
+    ("GBP/USD", "British Pound / US Dollar", "forex", "OANDA", "USD", 0.00001, 1.25, 0.09, 2, ["GBPUSD", "CABLE"]),
+    ("USD/JPY", "US Dollar / Japanese Yen", "forex", "OANDA", "JPY", 0.001, 145, 0.09, 3, ["USDJPY"]),
+    ("USD/CAD", "US Dollar / Canadian Dollar", "forex", "OANDA", "CAD", 0.00001, 1.35, 0.07, 4, ["USDCAD", "LOONIE"]),
+    ("AUD/USD", "Australian Dollar / US Dollar", "forex", "OANDA", "USD", 0.00001, 0.66, 0.1, 5, ["AUDUSD", "AUSSIE"]),
+    ("USD/CHF", "US Dollar / Swiss Franc", "forex", "OANDA", "CHF", 0.00001, 0.88, 0.08, 6, ["USDCHF", "SWISSIE"]),
+    ("NZD/USD", "New Zealand Dollar / US Dollar", "forex", "OANDA", "USD", 0.00001, 0.61, 0.1, None, ["NZDUSD", "KIWI"]),
+    ("EUR/GBP", "Euro / British Pound", "forex", "OANDA", "GBP", 0.00001, 0.86, 0.06, None, ["EURGBP"]),
+    ("EUR/JPY", "Euro / Japanese Yen", "forex", "OANDA", "JPY", 0.001, 157, 0.09, None, ["EURJPY"])
+]
+
+
+def normalize(text: str) -> str:
+    """Uppercase and strip separators so "eur/usd", "EUR_USD" and "EURUSD" match"""
+    return re.sub(r"[^0-9A-Z]", "", text.upper())
+
+
+def deletions(key: str) -> Set[str]:
+    """Every string formed by deleting one character"""
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance: insertions, deletions, substitutions and adjacent swaps"""
+    before: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i]
+        for j in range(1, len(b) + 1):
+            cost = min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cost = min(cost, before[j - 2] + 1)
+            row.append(cost)
+        before, previous = previous, row
+    return previous[-1]
+
+
+@dataclass
+class SymbolInfo:
+    """Instrument metadata structure"""
+    symbol: str
+    name: str
+    asset_class: str
+    exchange: str
+    quote_currency: str
+    tick_size: float
+    reference_price: Optional[float] = None
+    volatility: Optional[float] = None
+    trending_rank: Optional[int] = None
+    aliases: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**vars(self), "aliases": list(self.aliases)}
+
+
+class SymbolRegistry:
+    """In-memory instrument registry with a sorted prefix index and a deletion index for fuzzy matching"""
+
+    def __init__(self, symbols: Optional[List[SymbolInfo]] = None):
+        self.symbols: Dict[str, SymbolInfo] = {}
+        self._aliases: Dict[str, str] = {}
+        self._keys: List[str] = []
+        self._key_symbols: Dict[str, Dict[str, int]] = {}
+        # Single-deletion variants of every searchable key, for typo-tolerant lookups.
+        # Most variants belong to one key, which is stored as a bare string to save memory.
+        self._deletes: Dict[str, Any] = {}
+        for info in symbols or []:
+            self.symbols[info.symbol] = info
+        self._build_index()
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SymbolRegistry":
+        """Load the built-in symbols plus any from SYMBOL_REGISTRY_PATH (JSON list or CSV)"""
+        symbols = {row[0]: SymbolInfo(*row) for row in DEFAULT_SYMBOLS}
+        path = path or os.getenv("SYMBOL_REGISTRY_PATH")
+        if path:
+            try:
+                for info in cls._read_file(path):
+                    symbols[info.symbol] = info
+            except Exception as e:
+                logger.error(f"Failed to load symbol registry from {path}: {e}")
+        registry = cls(list(symbols.values()))
+        logger.info(f"Symbol registry loaded with {len(registry.symbols)} instruments")
+        return registry
+
+    @staticmethod
+    def _read_file(path: str) -> List[SymbolInfo]:
+        with open(path, newline="") as handle:
+            if path.endswith(".csv"):
+                rows = list(csv.DictReader(handle))
+                for row in rows:
+                    row["aliases"] = [alias for alias in (row.get("aliases") or "").split("|") if alias]
+                    for key in ("tick_size", "reference_price", "volatility"):
+                        row[key] = float(row[key]) if row.get(key) else None
+                    row["trending_rank"] = int(row["trending_rank"]) if row.get("trending_rank") else None
+            else:
+                rows = json.load(handle)
+        return [SymbolInfo(**row) for row in rows]
+
+    def _build_index(self):
+        """Index symbols, aliases and name words; rank 0 is the strongest kind of match"""
+        self._aliases.clear()
+        self._key_symbols.clear()
+        self._deletes.clear()
+        for info in self.symbols.values():
+            keys = [(0, normalize(info.symbol))]
+            keys += [(1, normalize(alias)) for alias in info.aliases]
+            keys += [(2, normalize(word)) for word in info.name.split()]
+            # The whole name is only prefix-searchable, which keeps the deletion index small
+            keys.append((3, normalize(info.name)))
+            for rank, key in keys:
+                if not key:
+                    continue
+                if rank < 2:
+                    self._aliases.setdefault(key, info.symbol)
+                entries = self._key_symbols.get(key)
+                if entries is None:
+                    entries = self._key_symbols[key] = {}
+                if rank < 3:
+                    self._insert(key)
+                entries[info.symbol] = min(rank, entries.get(info.symbol, rank))
+        self._keys = sorted(self._key_symbols)
+
+    def _insert(self, key: str):
+        for variant in {key, *deletions(key)}:
+            existing = self._deletes.get(variant)
+            if existing is None:
+                self._deletes[variant] = key
+            elif isinstance(existing, str):
+                if existing != key:
+                    self._deletes[variant] = {existing, key}
+            else:
+                existing.add(key)
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        """Look up a symbol by its canonical name or an alias"""
+        info = self.symbols.get(symbol)
+        if info is None:
+            canonical = self._aliases.get(normalize(symbol))
+            info = self.symbols.get(canonical) if canonical else None
+        return info
+
+    def trending(self, asset_class: str) -> List[str]:
+        ranked = [info for info in self.symbols.values() if info.asset_class == asset_class and info.trending_rank]
+        return [info.symbol for info in sorted(ranked, key=lambda info: info.trending_rank)]
+
+    def search(self, query: str, limit: int = 10, asset_class: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Exact, then prefix, then typo-tolerant matches on symbols, aliases and names"""
+        q = normalize(query)
+        if not q:
+            return []
+
+        # (match kind, key rank, distance, key length, symbol) -> best entry per symbol
+        best: Dict[str, Tuple[int, int, int, int]] = {}
+
+        def consider(key: str, kind: int, distance: int = 0):
+            for symbol, rank in islice(self._key_symbols[key].items(), KEY_SYMBOL_LIMIT):
+                if asset_class and self.symbols[symbol].asset_class != asset_class:
+                    continue
+                score = (kind, rank, distance, len(key))
+                if symbol not in best or score < best[symbol]:
+                    best[symbol] = score
+
+        start = bisect_left(self._keys, q)
+        for key in self._keys[start:start + PREFIX_SCAN_LIMIT]:
+            if not key.startswith(q):
+                break
+            consider(key, 0 if key == q else 1)
+
+        # Widen the edit distance only while there are too few matches
+        for distance in range(1, self._max_distance(q) + 1):
+            if len(best) >= limit:
+                break
+            for key, edits in self._fuzzy(q, distance):
+                consider(key, 2, edits)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], item[0]))[:limit]
+        return [
+            {**self.symbols[symbol].to_dict(), "match": ("exact", "prefix", "fuzzy")[score[0]]}
+            for symbol, score in ranked
+        ]
+
+    @staticmethod
+    def _max_distance(query: str) -> int:
+        if len(query) <= 2:
+            return 0
+        return 1 if len(query) <= 7 else 2
+
+    def _fuzzy(self, query: str, max_distance: int) -> List[Tuple[str, int]]:
+        """Keys within max_distance edits of the query, counting adjacent swaps as one edit
+
+        Candidates are keys sharing a deletion variant with the query (symmetric delete),
+        so the cost depends on the query length rather than the registry size. Keys that
+        need two insertions to reach are not found at distance 2.
+        """
+        variants = {query, *deletions(query)}
+        if max_distance >= 2:
+            variants |= {variant for one in deletions(query) for variant in deletions(one)}
+        candidates: Set[str] = set()
+        for variant in variants:
+            keys = self._deletes.get(variant)
+            if isinstance(keys, str):
+                candidates.add(keys)
+            elif keys:
+                candidates |= keys
+
+        matches = []
+        for key in candidates:
+            distance = edit_distance(query, key)
+            if distance <= max_distance:
+                matches.append((key, distance))
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for info in self.symbols.values():
+            counts[info.asset_class] = counts.get(info.asset_class, 0) + 1
+        return {"instruments": len(self.symbols), "indexed_keys": len(self._keys), "by_asset_class": counts}
+
+
+# Global symbol registry instance
+symbol_registry = SymbolRegistry.load()
@@ -0,0 +1,212 @@
+"""
+Technical Indicators Engine for SynapseTrade AI™
+Vectorized indicator calculations over many symbols at once
+"""
+
+import logging
+from typing import Dict, List, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of closes required before indicators are reported
+MIN_PERIODS = 14
+
+# Time steps solved together per block by recursive filters
+RECURRENCE_BLOCK = 256
+
+
+def _as_2d(values) -> np.ndarray:
+    """Coerce input into a float64 (symbols x periods) array"""
+    return np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """Simple moving average along the time axis (NaN during warm-up)"""
+    x = _as_2d(values)
+    out = np.full_like(x, np.nan)
+    if window <= 0 or x.shape[1] < window:
+        return out
+    cumsum = np.cumsum(x, axis=1)
+    cumsum = np.concatenate([np.zeros((x.shape[0], 1)), cumsum], axis=1)
+    out[:, window - 1:] = (cumsum[:, window:] - cumsum[:, :-window]) / window
+    return out
+
+
+def rolling_std(values, window: int) -> np.ndarray:
+    """Population standard deviation over a rolling window"""
+    x = _as_2d(values)
+    out = np.full_like(x, np.nan)
+    if window <= 0 or x.shape[1] < window:
+        return out
+    # Centre each row first to keep the sum-of-squares numerically stable
+    centred = x - x.mean(axis=1, keepdims=True)
+    mean = rolling_mean(centred, window)
+    mean_sq = rolling_mean(centred ** 2, window)
+    out[:, window - 1:] = np.sqrt(np.maximum(mean_sq[:, window - 1:] - mean[:, window - 1:] ** 2, 0.0))
+    return out
+
+
+def _smooth(x: np.ndarray, decay: float, initial: np.ndarray) -> np.ndarray:
+    """Solve y[t] = decay * y[t - 1] + (1 - decay) * x[t] with y[-1] = initial
+
+    Each block of RECURRENCE_BLOCK steps is one matrix product with a lower-triangular
+    decay kernel, so only one Python iteration runs per block instead of per step.
+    """
+    periods = x.shape[1]
+    out = np.empty_like(x)
+    if periods == 0:
+        return out
+    size = min(RECURRENCE_BLOCK, periods)
+    lags = np.arange(size)[:, None] - np.arange(size)[None, :]
+    kernel = np.where(lags >= 0, decay ** np.maximum(lags, 0), 0.0) * (1.0 - decay)
+    carry = decay ** np.arange(1, size + 1)
+    previous = initial
+    for start in range(0, periods, size):
+        block = x[:, start:start + size]
+        width = block.shape[1]
+        out[:, start:start + width] = block @ kernel[:width, :width].T + previous[:, None] * carry[:width]
+        previous = out[:, start + width - 1]
+    return out
+
+
+def ema(values, span: int) -> np.ndarray:
+    """Exponential moving average seeded with the first observation"""
+    x = _as_2d(values)
+    out = np.empty_like(x)
+    if x.shape[1] == 0:
+        return out
+    alpha = 2.0 / (span + 1.0)
+    out[:, 0] = x[:, 0]
+    out[:, 1:] = _smooth(x[:, 1:], 1.0 - alpha, x[:, 0])
+    return out
+
+
+def wilder_smooth(values, period: int) -> np.ndarray:
+    """Wilder's smoothing seeded with the simple mean of the first period"""
+    x = _as_2d(values)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] < period:
+        return out
+    out[:, period - 1] = x[:, :period].mean(axis=1)
+    out[:, period:] = _smooth(x[:, period:], (period - 1) / period, out[:, period - 1])
+    return out
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """Wilder Relative Strength Index aligned with the close series"""
+    x = _as_2d(close)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] <= period:
+        return out
+    changes = np.diff(x, axis=1)
+    avg_gain = wilder_smooth(np.clip(changes, 0.0, None), period)
+    avg_loss = wilder_smooth(np.clip(-changes, 0.0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        values = 100.0 - 100.0 / (1.0 + rs)
+    # No losses over the window means maximum strength
+    values = np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, values)
+    out[:, 1:] = values
+    return out
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    """MACD line, signal line and histogram"""
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return {
+        "macd": macd_line,
+        "signal_line": signal_line,
+        "histogram": macd_line - signal_line
+    }
+
+
+def bollinger_bands(close, window: int = 20, num_std: float = 2.0) -> Dict[str, np.ndarray]:
+    """Bollinger bands around a simple moving average"""
+    middle = rolling_mean(close, window)
+    std_dev = rolling_std(close, window)
+    return {
+        "upper": middle + num_std * std_dev,
+        "middle": middle,
+        "lower": middle - num_std * std_dev,
+        "std_dev": std_dev
+    }
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range using the previous close"""
+    h, l, c = _as_2d(high), _as_2d(low), _as_2d(close)
+    prev_close = np.concatenate([c[:, :1], c[:, :-1]], axis=1)
+    return np.maximum(h - l, np.maximum(np.abs(h - prev_close), np.abs(l - prev_close)))
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average True Range with Wilder smoothing"""
+    return wilder_smooth(true_range(high, low, close), period)
+
+
+def compute_indicators(close, high=None, low=None) -> Dict[str, np.ndarray]:
+    """Compute the latest value of every indicator for each symbol row in one pass"""
+    c = _as_2d(close)
+    periods = c.shape[1]
+    h = _as_2d(high) if high is not None else c
+    l = _as_2d(low) if low is not None else c
+
+    long_window = min(20, periods)
+    sma_10 = rolling_mean(c, min(10, periods))[:, -1]
+    sma_20 = rolling_mean(c, long_window)[:, -1]
+    bands = bollinger_bands(c, long_window)
+    macd_values = macd(c)
+
+    return {
+        "sma_10": sma_10,
+        "sma_20": sma_20,
+        "ema_12": ema(c, 12)[:, -1],
+        "ema_26": ema(c, 26)[:, -1],
+        "rsi": rsi(c)[:, -1],
+        "bollinger_upper": bands["upper"][:, -1],
+        "bollinger_lower": bands["lower"][:, -1],
+        "bollinger_middle": bands["middle"][:, -1],
+        "macd": macd_values["macd"][:, -1],
+        "signal_line": macd_values["signal_line"][:, -1],
+        "macd_histogram": macd_values["histogram"][:, -1],
+        "atr": atr(h, l, c)[:, -1],
+        "volatility": bands["std_dev"][:, -1]
+    }
+
+
+def indicators_to_rows(indicators: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Split per-indicator arrays into one JSON-friendly dict per symbol"""
+    if not indicators:
+        return []
+    names = list(indicators.keys())
+    matrix = np.round(np.vstack([indicators[name] for name in names]), 2)
+    rows = []
+    for column in matrix.T:
+        rows.append({
+            name: (None if np.isnan(value) else float(value))
+            for name, value in zip(names, column)
+        })
+    return rows
+
+
+def calculate_indicator_batch(series: List[Dict[str, List[float]]]) -> List[Dict[str, Any]]:
+    """Calculate indicators for many symbols, grouping series of equal length into one array pass"""
+    results: List[Dict[str, Any]] = [{} for _ in series]
+    groups: Dict[int, List[int]] = {}
+    for index, item in enumerate(series):
+        length = len(item["close"])
+        if length >= MIN_PERIODS:
+            groups.setdefault(length, []).append(index)
+
+    for length, indexes in groups.items():
+        close = np.array([series[i]["close"] for i in indexes], dtype=np.float64)
+        high = np.array([series[i].get("high", series[i]["close"]) for i in indexes], dtype=np.float64)
+        low = np.array([series[i].get("low", series[i]["close"]) for i in indexes], dtype=np.float64)
+        rows = indicators_to_rows(compute_indicators(close, high, low))
+        for i, row in zip(indexes, rows):
+            results[i] = row
+
+    return results
@@ -0,0 +1,9 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep tests off MongoDB and the local disk
+os.environ.setdefault("CANDLE_STORE", "none")
+os.environ.setdefault("JOB_QUEUE", "memory")
+os.environ.setdefault("LLM_CACHE", "none")
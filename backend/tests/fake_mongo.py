@@ -0,0 +1,118 @@
+"""A thread-safe in-memory stand-in for the pymongo collection calls the stores make"""
+
+import threading
+from types import SimpleNamespace
+
+from pymongo import UpdateOne
+
+OPERATORS = {
+    "$gt": lambda value, bound: value is not None and value > bound,
+    "$gte": lambda value, bound: value is not None and value >= bound,
+    "$lt": lambda value, bound: value is not None and value < bound,
+    "$lte": lambda value, bound: value is not None and value <= bound,
+    "$in": lambda value, bound: value in bound
+}
+
+
+def matches(document, query):
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if not all(OPERATORS[op](value, bound) for op, bound in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def project(document, projection):
+    if not projection:
+        return dict(document)
+    return {field: document[field] for field, keep in projection.items() if keep and field in document}
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, field, direction=1):
+        self.documents.sort(key=lambda document: document.get(field), reverse=direction < 0)
+        return self
+
+    def skip(self, count):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count):
+        if count:
+            self.documents = self.documents[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self.documents)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+        self.indexes = []
+        self.lock = threading.Lock()
+
+    def create_index(self, keys, **options):
+        self.indexes.append((keys, options))
+
+    def find(self, query=None, projection=None):
+        with self.lock:
+            found = [project(document, projection) for document in self.documents if matches(document, query or {})]
+        return FakeCursor(found)
+
+    def find_one(self, query=None, projection=None, sort=None):
+        cursor = self.find(query, projection)
+        for field, direction in sort or []:
+            cursor.sort(field, direction)
+        return next(iter(cursor), None)
+
+    def count_documents(self, query):
+        return len(self.find(query).documents)
+
+    def replace_one(self, query, replacement, upsert=False):
+        with self.lock:
+            for i, document in enumerate(self.documents):
+                if matches(document, query):
+                    self.documents[i] = dict(replacement)
+                    return SimpleNamespace(matched_count=1)
+            if upsert:
+                self.documents.append(dict(replacement))
+            return SimpleNamespace(matched_count=0)
+
+    def bulk_write(self, requests, ordered=True):
+        upserted = 0
+        with self.lock:
+            for request in requests:
+                assert isinstance(request, UpdateOne)
+                document = request._doc
+                query = request._filter
+                if any(matches(existing, query) for existing in self.documents):
+                    continue
+                if request._upsert:
+                    self.documents.append({**query, **document.get("$setOnInsert", {}), **document.get("$set", {})})
+                    upserted += 1
+        return SimpleNamespace(upserted_count=upserted)
+
+    def delete_many(self, query):
+        with self.lock:
+            kept = [document for document in self.documents if not matches(document, query)]
+            removed = len(self.documents) - len(kept)
+            self.documents = kept
+        return SimpleNamespace(deleted_count=removed)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def __getattr__(self, name):
+        return self[name]
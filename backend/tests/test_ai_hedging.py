@@ -0,0 +1,48 @@
+"""Hedged provider requests beneath the response cache"""
+
+import asyncio
+from types import SimpleNamespace
+
+from services.ai_service import OPENAI_HEDGE_MODEL, OPENAI_MODEL, AIService
+from services.llm_cache import LLMResponseCache
+
+
+def openai_stub(calls, primary_seconds=5.0):
+    async def create(model, **request):
+        calls.append(model)
+        try:
+            await asyncio.sleep(primary_seconds if model == OPENAI_MODEL else 0.01)
+        except asyncio.CancelledError:
+            calls.append(f"{model} cancelled")
+            raise
+        message = SimpleNamespace(content='{"sentiment": "bullish", "confidence": 70}')
+        response = SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+        return SimpleNamespace(parse=lambda: response)
+
+    raw = SimpleNamespace(create=create)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw)))
+
+
+def test_hedge_loser_is_cancelled():
+    async def run():
+        service = AIService()
+        calls = []
+        service.openai_client = openai_stub(calls)
+        service.response_cache = LLMResponseCache()
+        breaker = service.circuit_breakers["openai"]
+        breaker.hedge_delay = lambda: 0.05
+
+        analysis = await asyncio.wait_for(
+            service.analyze_market_openai("BTC", {"price": 1.0}, hedge=True), timeout=2
+        )
+        await asyncio.sleep(0.05)
+
+        assert analysis.sentiment == "bullish"
+        assert service.hedges["openai"] == {"fired": 1, "won": 1}
+        assert calls == [OPENAI_MODEL, OPENAI_HEDGE_MODEL, f"{OPENAI_MODEL} cancelled"]
+        # The loser released its limiter slot and is counted as abandoned, not as a latency sample
+        assert service.rate_limiters["openai"].in_flight == 0
+        assert len(breaker.outcomes) == 1 and breaker.abandoned == 1
+        assert service.response_cache.memory.stats()["inflight"] == 0
+
+    asyncio.run(run())
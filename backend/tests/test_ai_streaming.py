@@ -0,0 +1,47 @@
+"""Streamed AI analyses"""
+
+import asyncio
+from types import SimpleNamespace
+
+from services.ai_service import AIService
+from services.llm_cache import LLMResponseCache
+
+
+def streaming_openai_stub(events):
+    async def stream():
+        try:
+            for text in ('{"sentiment": ', '"bullish"', "}"):
+                events.append(text)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+                await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    async def create(**request):
+        return stream()
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_disconnect_stops_provider_stream():
+    async def run():
+        service = AIService()
+        events = []
+        service.openai_client = streaming_openai_stub(events)
+        service.claude_client = service.gemini_client = None
+        service.response_cache = LLMResponseCache()
+
+        analysis = service.stream_analysis("BTC", {"price": 1.0})
+        async for event in analysis:
+            if event["event"] == "token":
+                break
+        # The client went away after its first token
+        await analysis.aclose()
+        await asyncio.sleep(0.05)
+
+        assert events == ['{"sentiment": ', "cancelled"]
+        assert service.rate_limiters["openai"].in_flight == 0
+        assert service.response_cache.memory.stats()["inflight"] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,103 @@
+"""Deterministic fills, exits and metrics in the backtest engine"""
+
+import numpy as np
+import pytest
+
+from services.backtest_engine import BACKTEST_DEFAULTS, SignalBuilder, _first_exit, performance_metrics, simulate
+from services.candles import CandleSeries
+
+HOUR_MS = 3600 * 1000
+PARAMS = dict(BACKTEST_DEFAULTS, stop_loss=0.1, take_profit=0.1, position_size=1.0, fee_rate=0.0, slippage=0.0)
+
+
+def series(bars):
+    """Hourly candles from (open, high, low, close) tuples"""
+    opens, highs, lows, closes = (list(column) for column in zip(*bars))
+    return CandleSeries(np.arange(len(bars)) * HOUR_MS, opens, highs, lows, closes, np.ones(len(bars)))
+
+
+def run(bars, entry_bars=(0,), exit_bars=()):
+    candles = series(bars)
+    entries = np.zeros(len(candles), dtype=bool)
+    entries[list(entry_bars)] = True
+    exits = np.zeros(len(candles), dtype=bool)
+    exits[list(exit_bars)] = True
+    return simulate(candles, entries, exits, PARAMS, initial_capital=1000.0)
+
+
+def test_stop_fills_first_when_a_bar_touches_both_levels():
+    result = run([(100, 100, 100, 100), (100, 115, 85, 110), (110, 110, 110, 110)])
+    trade, = result["trades"]
+    assert trade["exit_reason"] == "stop_loss" and trade["exit_price"] == 90
+    assert trade["pnl"] == pytest.approx(-100) and trade["bars_held"] == 1
+    assert result["equity"][-1] == pytest.approx(900)
+
+
+def test_gaps_through_a_level_fill_at_the_open():
+    flat = (100, 101, 99, 100)
+    stopped, = run([flat, flat, (80, 82, 78, 81), flat])["trades"]
+    assert stopped["exit_reason"] == "stop_loss" and stopped["exit_price"] == 80
+    targeted, = run([flat, flat, (120, 125, 119, 121), flat])["trades"]
+    assert targeted["exit_reason"] == "take_profit" and targeted["exit_price"] == 120
+    # Touching the level intraday fills at the level itself
+    touched, = run([flat, flat, (100, 112, 99, 105), flat])["trades"]
+    assert touched["exit_price"] == pytest.approx(110)
+
+
+def test_open_position_is_closed_at_the_last_close():
+    result = run([(100, 101, 99, 100), (100, 101, 99, 100), (100, 104, 99, 103)])
+    trade, = result["trades"]
+    assert trade["exit_reason"] == "end_of_data" and trade["exit_price"] == 103
+    assert trade["exit_time"] == 2 * HOUR_MS
+    assert result["equity"][-1] == pytest.approx(1030)
+
+
+def test_exit_signal_closes_at_that_bar_and_allows_reentry():
+    flat = (100, 101, 99, 100)
+    result = run([flat, flat, (100, 103, 99, 102), flat, flat], entry_bars=(0, 1, 3), exit_bars=(2,))
+    first, second = result["trades"]
+    # The signal on bar 1 falls inside the first trade; bar 3's signal re-enters on bar 4
+    assert first["exit_reason"] == "exit_signal" and first["exit_price"] == 102
+    assert second["entry_time"] == 4 * HOUR_MS and second["exit_reason"] == "end_of_data"
+
+
+def test_drawdown_duration_is_the_longest_underwater_stretch():
+    equity = np.array([100.0, 110.0, 100.0, 105.0, 108.0, 111.0, 90.0, 95.0])
+    metrics = performance_metrics(equity, [], "1h", 100.0)
+    assert metrics["max_drawdown_bars"] == 3
+    assert metrics["max_drawdown"] == pytest.approx(90 / 111 - 1, abs=1e-6)
+    assert performance_metrics(np.linspace(100, 120, 5), [], "1h", 100.0)["max_drawdown_bars"] == 0
+
+
+@pytest.mark.parametrize("start", [0, 1, 63, 64, 65, 500, 700])
+def test_first_exit_matches_a_full_scan_across_chunks(start):
+    rng = np.random.default_rng(7)
+    count = 1000
+    close = 100 + np.cumsum(rng.normal(0, 0.2, count))
+    candles = CandleSeries(np.arange(count) * HOUR_MS, close, close + 0.1, close - 0.1, close, np.ones(count))
+    exit_signal = np.zeros(count, dtype=bool)
+    for hit in (40, 130, 640, 999):
+        exit_signal[hit] = True
+    stop, target = close[start] * 0.9, close[start] * 1.1
+
+    hits = (candles.low <= stop) | (candles.high >= target) | exit_signal
+    expected = np.flatnonzero(hits[start:])
+    assert _first_exit(candles, start, stop, target, exit_signal) == start + int(expected[0])
+    assert _first_exit(candles, start, -np.inf, np.inf, np.zeros(count, dtype=bool)) is None
+
+
+def test_combine_counts_conditions_within_the_signal_window():
+    candles = series([(100, 100, 100, 100)] * 8)
+    builder = SignalBuilder(candles, dict(PARAMS, signal_window=3))
+    arrays = {name: np.zeros(8, dtype=bool) for name in ("a", "b", "c")}
+    arrays["a"][2] = True
+    arrays["b"][4] = True
+    arrays["c"][6] = True
+    builder.rule = arrays.__getitem__
+
+    assert np.flatnonzero(builder.combine(["a", "b"])).tolist() == [4]
+    # Four bars apart is outside a three-bar window
+    assert not builder.combine(["a", "c"]).any()
+    assert np.flatnonzero(builder.combine(["a", "b", "c"], "any")).tolist() == [2, 4, 6]
+    assert builder.combine(["a"]) is arrays["a"]
+    assert not builder.combine([]).any()
@@ -0,0 +1,71 @@
+"""Concurrency-limited mapping over market data requests"""
+
+import asyncio
+
+from services.market_data_service import bounded_map
+
+
+def test_yields_in_completion_order_within_the_limit():
+    async def run():
+        active, peak, started = 0, 0, []
+        delays = {0: 0.05, 1: 0.01, 2: 0.03, 3: 0.0, 4: 0.02, 5: 0.01}
+
+        async def worker(item):
+            nonlocal active, peak
+            started.append(item)
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(delays[item])
+            active -= 1
+            return item * 10
+
+        results = [pair async for pair in bounded_map(range(6), worker, 2)]
+        assert sorted(results) == [(item, item * 10) for item in range(6)]
+        # Items start in input order, with at most two in flight
+        assert started == list(range(6)) and peak == 2
+        # Item 1 finishes before item 0 even though it started later
+        assert [item for item, _ in results].index(1) < [item for item, _ in results].index(0)
+
+        # Every item runs at once when the limit exceeds the work
+        peak = 0
+        assert len([pair async for pair in bounded_map(range(6), worker, 10)]) == 6 and peak == 6
+
+    asyncio.run(run())
+
+
+def test_failures_are_yielded_as_results():
+    async def run():
+        async def worker(item):
+            if item == 1:
+                raise ValueError("bad symbol")
+            return item
+
+        results = dict([pair async for pair in bounded_map([0, 1, 2], worker, 2)])
+        assert results[0] == 0 and results[2] == 2
+        assert isinstance(results[1], ValueError)
+
+    asyncio.run(run())
+
+
+def test_closing_early_cancels_running_calls_and_stops_launching():
+    async def run():
+        started, cancelled = [], []
+
+        async def worker(item):
+            started.append(item)
+            try:
+                await asyncio.sleep(0 if item == 0 else 10)
+            except asyncio.CancelledError:
+                cancelled.append(item)
+                raise
+            return item
+
+        # A lazy source is only drawn from as slots free up
+        mapped = bounded_map((item for item in range(100)), worker, 3)
+        assert await mapped.__anext__() == (0, 0)
+        await mapped.aclose()
+        await asyncio.sleep(0)
+        assert started == [0, 1, 2] and sorted(cancelled) == [1, 2]
+
+    asyncio.run(run())
+
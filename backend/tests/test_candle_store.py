@@ -0,0 +1,36 @@
+"""Candle store appends"""
+
+import asyncio
+
+from services.candle_store import FileCandleStore, MongoCandleStore
+from services.market_providers import DemoProvider
+from tests.fake_mongo import FakeDatabase
+
+
+def test_concurrent_writers_append_once(tmp_path):
+    async def run():
+        candles = await DemoProvider().fetch_candles("DEMO", "1m", 50)
+        # Separate instances stand in for separate worker processes
+        stores = [FileCandleStore(str(tmp_path)) for _ in range(2)]
+        written = await asyncio.gather(*(store.write("DEMO", "1m", candles) for store in stores))
+        assert sorted(written) == [0, 50]
+        stored = await stores[0].read("DEMO", "1m")
+        assert stored.timestamp.tolist() == candles.timestamp.tolist()
+
+    asyncio.run(run())
+
+
+def test_concurrent_mongo_writers_store_each_candle_once():
+    async def run():
+        candles = await DemoProvider().fetch_candles("DEMO", "1m", 50)
+        db = FakeDatabase()
+        # Two stores share the collection like two worker processes; each also writes twice at once
+        stores = [MongoCandleStore(db) for _ in range(2)]
+        written = await asyncio.gather(*(store.write("DEMO", "1m", candles) for store in stores for _ in range(2)))
+        assert sum(written) == 50
+        stored = await stores[1].read("DEMO", "1m", limit=100)
+        assert stored.timestamp.tolist() == candles.timestamp.tolist()
+        assert (await stores[1].read("DEMO", "1m", start_ms=int(candles.timestamp[40]))).timestamp.tolist() == \
+            candles.timestamp[40:].tolist()
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+"""CandleSeries views and row conversion"""
+
+import numpy as np
+import pytest
+
+from services.candles import CandleSeries
+
+HOUR_MS = 3600 * 1000
+
+
+def hourly(count):
+    values = np.arange(count, dtype=np.float64)
+    return CandleSeries(np.arange(count) * HOUR_MS, values, values + 1, values - 1, values + 0.5, values * 10)
+
+
+@pytest.mark.parametrize("timestamp", [None, -1, 0, 1, 3 * HOUR_MS, 3 * HOUR_MS + 1, 9 * HOUR_MS, 20 * HOUR_MS])
+def test_since_matches_a_row_filter(timestamp):
+    candles = hourly(10)
+    expected = [row for row in candles.to_rows() if timestamp is None or row_ms(row) > timestamp]
+    view = candles.since(timestamp)
+    assert view.to_rows() == expected
+    # Views share the series' buffers rather than copying them
+    assert not len(view) or np.shares_memory(view.close, candles.close)
+
+
+@pytest.mark.parametrize("start, end", [
+    (None, None), (0, None), (None, 5 * HOUR_MS), (2 * HOUR_MS, 5 * HOUR_MS), (2 * HOUR_MS + 1, 5 * HOUR_MS + 1),
+    (5 * HOUR_MS, 5 * HOUR_MS), (7 * HOUR_MS, 2 * HOUR_MS), (-HOUR_MS, 30 * HOUR_MS)
+])
+def test_between_is_start_inclusive_and_end_exclusive(start, end):
+    candles = hourly(10)
+    expected = [
+        row for row in candles.to_rows()
+        if (start is None or row_ms(row) >= start) and (end is None or row_ms(row) < end)
+    ]
+    assert candles.between(start, end).to_rows() == expected
+
+
+def test_rows_round_trip():
+    candles = hourly(5)
+    rebuilt = CandleSeries.from_rows(candles.to_rows())
+    for name in CandleSeries.__slots__:
+        np.testing.assert_array_equal(getattr(rebuilt, name), getattr(candles, name))
+    assert candles.since(candles.last_timestamp).last_timestamp is None
+
+
+def row_ms(row):
+    return int(np.datetime64(row["timestamp"], "ms").astype(np.int64))
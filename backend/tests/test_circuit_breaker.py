@@ -0,0 +1,136 @@
+"""Provider circuit breaker states and hedged requests"""
+
+import asyncio
+
+import pytest
+
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, hedged
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+async def succeed():
+    return "ok"
+
+
+async def fail():
+    raise RuntimeError("provider error")
+
+
+def test_error_rate_opens_and_probe_closes():
+    async def run():
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", min_calls=4, error_rate=0.5, open_seconds=30, clock=clock)
+        await breaker.call(succeed)
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+        await breaker.call(succeed)
+        # Below min_calls the breaker stays closed whatever the error rate
+        assert breaker.state == CLOSED
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+        assert breaker.state == OPEN and breaker.times_opened == 1
+
+        with pytest.raises(CircuitOpen):
+            await breaker.call(succeed)
+        assert breaker.short_circuited == 1
+
+        clock.now += 30
+        assert breaker.available() and breaker.state == HALF_OPEN
+        # A failed probe reopens; a successful one closes with a fresh window
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+        assert breaker.state == OPEN and breaker.times_opened == 2
+        clock.now += 30
+        assert await breaker.call(succeed) == "ok"
+        assert breaker.state == CLOSED and len(breaker.outcomes) == 1
+
+    asyncio.run(run())
+
+
+def test_half_open_admits_one_probe_and_frees_it_when_cancelled():
+    async def run():
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", min_calls=1, open_seconds=30, clock=clock)
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+        clock.now += 30
+
+        probe = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpen):
+            await breaker.call(succeed)
+
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        # The abandoned probe is not an outcome, and another call may probe
+        assert breaker.state == HALF_OPEN and breaker.abandoned == 1
+        assert await breaker.call(succeed) == "ok"
+        assert breaker.state == CLOSED
+
+    asyncio.run(run())
+
+
+def test_hedged_primary_wins_before_delay():
+    async def run():
+        started = []
+
+        async def alternate():
+            started.append("alternate")
+            return "fast"
+
+        assert await hedged(succeed, alternate, delay=1) == ("ok", False)
+        assert started == []
+
+    asyncio.run(run())
+
+
+def test_hedged_alternate_wins_and_primary_is_abandoned():
+    async def run():
+        breaker = CircuitBreaker("test")
+
+        async def slow():
+            await asyncio.sleep(10)
+            return "slow"
+
+        async def alternate():
+            await asyncio.sleep(0.01)
+            return "fast"
+
+        result = await hedged(lambda: breaker.call(slow), alternate, delay=0.02)
+        await asyncio.sleep(0)
+        assert result == ("fast", True)
+        # The cancelled primary is not a latency sample
+        assert len(breaker.outcomes) == 0 and breaker.abandoned == 1
+
+    asyncio.run(run())
+
+
+def test_hedged_raises_only_when_both_fail():
+    async def run():
+        async def slow_failure():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("primary error")
+
+        async def alternate_failure():
+            raise ValueError("alternate error")
+
+        with pytest.raises(ValueError):
+            await hedged(slow_failure, alternate_failure, delay=0.01)
+
+        async def slow_success():
+            await asyncio.sleep(0.02)
+            return "late"
+
+        # The alternate failing first still leaves the primary to win
+        assert await hedged(slow_success, alternate_failure, delay=0.01) == ("late", False)
+
+    asyncio.run(run())
+
@@ -0,0 +1,126 @@
+"""Background job leases, retries and per-user caps"""
+
+import asyncio
+import time
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from services import job_queue as job_queue_module
+from services.job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, MemoryJobStore
+
+
+def queued_job(job_id, user_id, priority=0):
+    return {
+        "job_id": job_id, "type": "analysis", "user_id": user_id, "payload": {}, "priority": priority,
+        "status": QUEUED, "attempts": 0, "max_attempts": 3, "available_at": datetime.utcnow(),
+        "lease_expires_at": None, "worker_id": None, "created_at": None, "started_at": None,
+        "finished_at": None, "result": None, "error": None
+    }
+
+
+def test_expired_lease_is_delivered_again():
+    store = MemoryJobStore()
+    store.insert(queued_job("job", "alice"))
+    first = store.claim("worker-1", 0.05, per_user_limit=0)
+    assert first["status"] == RUNNING and first["attempts"] == 1
+    assert store.claim("worker-2", 0.05, per_user_limit=0) is None
+
+    time.sleep(0.06)
+    second = store.claim("worker-2", 60, per_user_limit=0)
+    assert second["job_id"] == "job" and second["attempts"] == 2
+    # The worker that lost its lease can no longer record an outcome
+    assert not store.update("job", "worker-1", {"status": SUCCEEDED})
+    assert store.update("job", "worker-2", {"status": SUCCEEDED})
+
+
+def test_per_user_cap_lets_other_users_through():
+    store = MemoryJobStore()
+    store.insert(queued_job("alice-1", "alice", priority=5))
+    store.insert(queued_job("alice-2", "alice", priority=5))
+    store.insert(queued_job("bob-1", "bob"))
+    assert store.claim("worker", 60, per_user_limit=1)["job_id"] == "alice-1"
+    # Alice is at her cap, so Bob's lower priority job runs before her second one
+    assert store.claim("worker", 60, per_user_limit=1)["job_id"] == "bob-1"
+    assert store.claim("worker", 60, per_user_limit=1) is None
+    store.update("alice-1", "worker", {"status": SUCCEEDED})
+    assert store.claim("worker", 60, per_user_limit=1)["job_id"] == "alice-2"
+
+
+def test_failed_jobs_retry_with_backoff_until_max_attempts(monkeypatch):
+    monkeypatch.setattr(job_queue_module, "JOB_RETRY_BACKOFF_SECONDS", 0.02)
+    monkeypatch.setattr(job_queue_module, "JOB_POLL_SECONDS", 0.01)
+
+    async def run():
+        queue = JobQueue(MemoryJobStore(), workers=1, max_attempts=3)
+        attempted = []
+
+        async def flaky(job):
+            attempted.append(time.monotonic())
+            if job["payload"]["failures"] >= len(attempted):
+                raise RuntimeError("provider unavailable")
+            return {"ok": True}
+
+        queue.register("analysis", flaky)
+        queue.start()
+        try:
+            recovered = await queue.submit("analysis", "alice", {"failures": 1})
+            while (job := await queue.get(recovered["job_id"]))["status"] != SUCCEEDED:
+                await queue.wait_for_update(recovered["job_id"], 1)
+            assert job["attempts"] == 2 and job["result"] == {"ok": True}
+            assert attempted[1] - attempted[0] >= 0.02
+
+            attempted.clear()
+            doomed = await queue.submit("analysis", "alice", {"failures": 5})
+            while (job := await queue.get(doomed["job_id"]))["status"] != FAILED:
+                await queue.wait_for_update(doomed["job_id"], 1)
+            assert job["attempts"] == 3 and job["error"] == "provider unavailable"
+            # Backoff doubles per attempt
+            assert attempted[2] - attempted[1] >= 0.04
+            assert queue.retried == 3 and queue.completed == 1 and queue.failed == 1
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_wait_for_update_returns_when_the_job_changes():
+    async def run():
+        queue = JobQueue(MemoryJobStore(), workers=1)
+        release = asyncio.Event()
+
+        async def handler(job):
+            await release.wait()
+            return "done"
+
+        queue.register("analysis", handler)
+        job = await queue.submit("analysis", "alice", {})
+        queue.start()
+        try:
+            # Woken by the claim, not by the timeout
+            started = time.monotonic()
+            await queue.wait_for_update(job["job_id"], 5)
+            assert time.monotonic() - started < 1
+            assert (await queue.get(job["job_id"]))["status"] == RUNNING
+
+            asyncio.get_running_loop().call_later(0.05, release.set)
+            started = time.monotonic()
+            await queue.wait_for_update(job["job_id"], 5)
+            assert time.monotonic() - started < 1
+            assert (await queue.get(job["job_id"]))["status"] == SUCCEEDED
+
+            # Nothing left to change: only the timeout ends the wait
+            started = time.monotonic()
+            await queue.wait_for_update(job["job_id"], 0.05)
+            assert time.monotonic() - started >= 0.05
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_job_stats_require_authentication():
+    from server import app
+
+    with TestClient(app) as client:
+        assert client.get("/api/jobs/stats").status_code == 403
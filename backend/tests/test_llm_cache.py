@@ -0,0 +1,105 @@
+"""LLM response cache fingerprinting and MongoDB tier"""
+
+import asyncio
+
+from services.llm_cache import LLMResponseCache, cache_key, market_fingerprint
+from tests.fake_mongo import FakeCollection
+
+
+def market_data(price=100.0, change=0.4, rsi=55.0, volume=1.0e6):
+    return {
+        "symbol": "BTC",
+        "market_data": {
+            "current_price": price,
+            "price_change_24h": change,
+            "price_change_percent_24h": round(change / price * 100, 2),
+            "volume_24h": volume,
+            "ohlcv": [[1, 2, 3, 4, 5]],
+            "technical_indicators": {"rsi": rsi, "sma_20": price * 0.99, "macd": change / 4, "atr": 1.3},
+            "market_sentiment": {"overall_sentiment": "bullish", "fear_greed_index": 61.0}
+        }
+    }
+
+
+def key(inputs):
+    return cache_key("openai", "gpt-4", "market_analysis", 1, inputs, "1h")
+
+
+def test_fingerprint_is_stable_within_buckets():
+    base = key(market_data())
+    # Tick-level noise and volatile candles do not change the key
+    assert key(market_data(price=100.05, rsi=56.0, volume=1.01e6)) == base
+    noisy = market_data()
+    noisy["market_data"]["ohlcv"] = [[9, 9, 9, 9, 9]]
+    assert key(noisy) == base
+    # A crossing from a small gain to a small loss lands in neighbouring price buckets, not far apart ones
+    assert market_fingerprint(market_data(change=0.1))["market_data"]["price_change_24h"] == ["p", 0]
+    assert market_fingerprint(market_data(change=-0.1))["market_data"]["price_change_24h"] == ["p", -1]
+    # A different market picture does
+    assert key(market_data(price=103.0)) != base
+    assert key(market_data(rsi=75.0)) != base
+
+
+def test_fingerprint_matches_exact_field_names():
+    fingerprint = market_fingerprint({
+        "versions": 3,
+        "risk_level": 2,
+        "position_size": 0.1,
+        "rsi": 42.0,
+        "support_level": 100.0
+    })
+    # Only schema fields are bucketed; lookalike names keep their exact values
+    assert fingerprint["versions"] == 3
+    assert fingerprint["risk_level"] == 2
+    assert fingerprint["position_size"] == 0.1
+    assert fingerprint["rsi"] == ["a", 8]
+    assert fingerprint["support_level"][0] == "r"
+
+
+def test_mongo_tier_serves_other_processes():
+    async def run():
+        collection = FakeCollection()
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            return '{"sentiment": "bullish"}'
+
+        first = LLMResponseCache(collection, ttl_seconds=60)
+        text, created_at, cached = await first.get_or_generate("openai", "gpt-4", "market_analysis", 1,
+                                                               market_data(), generate, "1h")
+        assert (text, cached) == ('{"sentiment": "bullish"}', False)
+        assert len(collection.documents) == 1
+
+        # A fresh process with an empty memory tier reads the stored response
+        second = LLMResponseCache(collection, ttl_seconds=60)
+        text, stored_at, cached = await second.get_or_generate("openai", "gpt-4", "market_analysis", 1,
+                                                               market_data(price=100.05), generate, "1h")
+        assert cached and stored_at == created_at and len(calls) == 1
+        assert second.store_hits == 1 and second.provider_calls == 0
+
+    asyncio.run(run())
+
+
+def test_rejected_responses_are_not_cached():
+    async def run():
+        collection = FakeCollection()
+        cache = LLMResponseCache(collection, ttl_seconds=60)
+        replies = ["not json", '{"sentiment": "neutral"}']
+
+        async def generate():
+            return replies.pop(0)
+
+        def parses(text):
+            return text.startswith("{")
+
+        for expected in ("not json", '{"sentiment": "neutral"}'):
+            text, _, cached = await cache.get_or_generate("openai", "gpt-4", "market_analysis", 1,
+                                                          market_data(), generate, "1h", cache_if=parses)
+            assert text == expected and not cached
+        assert len(collection.documents) == 1
+        _, _, cached = await cache.get_or_generate("openai", "gpt-4", "market_analysis", 1,
+                                                   market_data(), generate, "1h", cache_if=parses)
+        assert cached
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+"""Single-flight fetches in TTLCache"""
+
+import asyncio
+
+from services.market_cache import TTLCache
+
+
+def test_fetch_outlives_one_cancelled_caller_but_not_all():
+    async def run():
+        cache = TTLCache()
+        started = []
+
+        async def fetch():
+            started.append(True)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        first = asyncio.ensure_future(cache.get_or_fetch("key", fetch))
+        second = asyncio.ensure_future(cache.get_or_fetch("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "value"
+        assert cache.get("key") == "value" and len(started) == 1
+
+        cache.invalidate("key")
+        only = asyncio.ensure_future(cache.get_or_fetch("key", fetch))
+        await asyncio.sleep(0)
+        inflight = cache._inflight["key"]
+        only.cancel()
+        await asyncio.gather(only, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert inflight.cancelled()
+        assert "key" not in cache and cache.stats()["inflight"] == 0
+
+    asyncio.run(run())
+
+
+def test_batch_survives_a_shared_fetch_cancelled_by_its_callers():
+    async def run():
+        cache = TTLCache()
+
+        async def fetch():
+            await asyncio.sleep(1)
+            return "slow"
+
+        async def fetch_many(keys):
+            await asyncio.sleep(0.01)
+            return {key: f"value {key}" for key in keys}
+
+        single = asyncio.ensure_future(cache.get_or_fetch("shared", fetch))
+        await asyncio.sleep(0)
+        batch = asyncio.ensure_future(cache.get_or_fetch_many(["shared", "other"], fetch_many))
+        await asyncio.sleep(0)
+        # The only get_or_fetch caller leaves, cancelling the fetch the batch joined
+        single.cancel()
+        results = await batch
+        assert isinstance(results["shared"], RuntimeError)
+        assert results["other"] == "value other"
+
+        # Cancelling the batch caller itself still propagates
+        blocked = asyncio.ensure_future(cache.get_or_fetch("blocked", fetch))
+        await asyncio.sleep(0)
+        batch = asyncio.ensure_future(cache.get_or_fetch_many(["blocked"], fetch_many))
+        await asyncio.sleep(0)
+        batch.cancel()
+        await asyncio.gather(batch, return_exceptions=True)
+        assert batch.cancelled()
+        blocked.cancel()
+        await asyncio.gather(blocked, return_exceptions=True)
+
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+"""Candle loading and resampling in MarketDataService"""
+
+import asyncio
+
+from services.market_data_service import MarketDataService
+from services.market_providers import DemoProvider
+
+
+class LimitedProvider(DemoProvider):
+    max_limit = 1000
+
+
+def test_resamples_only_within_provider_limit():
+    async def run():
+        service = MarketDataService()
+        service.providers = {"default": LimitedProvider()}
+        loads = []
+        load_candles = service._load_candles
+
+        async def record(symbol, timeframe, limit):
+            loads.append((timeframe, limit))
+            return await load_candles(symbol, timeframe, limit)
+
+        service._load_candles = record
+        # 25 x 15 one-minute candles fit in one request; 25 x 60 do not
+        assert len(await service._fetch_candles("DEMO", "15m")) == 24
+        assert len(await service._fetch_candles("DEMO", "1h")) == 24
+        assert loads == [("1m", 375), ("1h", 24)]
+
+    asyncio.run(run())
+
+
+def test_history_matches_market_data_series():
+    async def run():
+        service = MarketDataService()
+        service.providers = {"default": LimitedProvider()}
+        for timeframe in ("15m", "1h"):
+            candles = await service._fetch_candles("DEMO", timeframe)
+            history = await service.get_candle_history("DEMO", timeframe, limit=len(candles))
+            assert history.timestamp.tolist() == candles.timestamp.tolist()
+            assert history.close.tolist() == candles.close.tolist()
+
+    asyncio.run(run())
@@ -0,0 +1,22 @@
+"""Market overview snapshot responses"""
+
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+
+from server import app, market_data_service
+
+
+def test_overview_age_is_sent_per_request():
+    with TestClient(app) as client:
+        first = client.get("/api/market/overview")
+        market_data_service.overview_refreshed_at -= timedelta(seconds=30)
+        second = client.get("/api/market/overview")
+        revalidated = client.get("/api/market/overview", headers={"If-None-Match": second.headers["etag"]})
+
+    assert first.status_code == second.status_code == 200
+    assert "staleness_seconds" not in first.json()["data"]
+    # The cached body is unchanged while the snapshot ages
+    assert first.content == second.content and first.headers["etag"] == second.headers["etag"]
+    assert int(second.headers["age"]) >= 30 > int(first.headers["age"])
+    assert revalidated.status_code == 304 and int(revalidated.headers["age"]) >= 30
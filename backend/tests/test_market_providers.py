@@ -0,0 +1,73 @@
+"""Provider adapters against the mock exchange"""
+
+import asyncio
+
+import httpx
+import pytest
+
+import mock_exchange
+from services.market_data_service import CANDLE_LIMIT, MarketDataService
+from services.market_providers import (
+    BinanceProvider, CoinbaseProvider, DemoProvider, OandaProvider, ProviderError, YahooProvider
+)
+from services.resampler import resample
+
+SYMBOLS = {"binance": "BTC", "coinbase": "BTC", "yahoo": "AAPL", "oanda": "EUR/USD"}
+
+
+def mocked(provider_class):
+    provider = provider_class()
+    provider._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_exchange.app), base_url="http://mock")
+    return provider
+
+
+@pytest.mark.parametrize("provider_class", [BinanceProvider, CoinbaseProvider, YahooProvider, OandaProvider])
+def test_adapter_parses_candles_oldest_first(provider_class):
+    async def run():
+        provider = mocked(provider_class)
+        symbol = SYMBOLS[provider.name]
+        candles = await provider.fetch_candles(symbol, "1h", 24)
+        expected = await DemoProvider().fetch_candles(symbol, "1h", 24)
+        await provider.close()
+
+        assert candles.timestamp.tolist() == expected.timestamp.tolist()
+        assert candles.close.tolist() == pytest.approx(expected.close.tolist())
+        assert candles.high.tolist() == pytest.approx(expected.high.tolist())
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("provider_class", [CoinbaseProvider, YahooProvider])
+def test_missing_timeframe_is_resampled_from_a_coarser_one(provider_class):
+    async def run():
+        provider = mocked(provider_class)
+        assert not provider.supports("4h")
+        service = MarketDataService()
+        service.providers = {"default": provider}
+        symbol = SYMBOLS[provider.name]
+
+        assert service._candle_source(symbol, "4h") == "1h"
+        candles = await service._fetch_candles(symbol, "4h")
+        hourly = await DemoProvider().fetch_candles(symbol, "1h", provider.limit_for("1h"))
+        await provider.close()
+
+        expected = resample(hourly, "4h")
+        hour_ms, bucket_ms = 3600 * 1000, 4 * 3600 * 1000
+        # Only buckets with all four hours present are closed candles
+        complete = [
+            i for i, start in enumerate(expected.timestamp.tolist())
+            if start >= hourly.timestamp[0] and start + bucket_ms <= hourly.timestamp[-1] + hour_ms
+        ]
+        expected = expected[complete[0]:complete[-1] + 1]
+        assert len(candles) == CANDLE_LIMIT
+        assert candles.timestamp.tolist() == expected.timestamp[-CANDLE_LIMIT:].tolist()
+        assert candles.close.tolist() == pytest.approx(expected.close[-CANDLE_LIMIT:].tolist())
+
+    asyncio.run(run())
+
+
+def test_unbuildable_timeframe_is_a_provider_error():
+    service = MarketDataService()
+    service.providers = {"default": CoinbaseProvider()}
+    with pytest.raises(ProviderError):
+        service._candle_source("BTC", "1w")
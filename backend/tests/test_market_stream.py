@@ -0,0 +1,81 @@
+"""Subscriptions and forming candles in the market stream hub"""
+
+import asyncio
+
+import pytest
+
+from services.candles import TIMEFRAME_SECONDS, CandleSeries
+from services.market_data_service import MarketDataService
+from services.market_providers import ProviderError
+from services.market_stream import MarketStreamHub
+from services.streaming_indicators import IndicatorState
+
+
+def test_period_rollover_commits_the_closed_candle():
+    service = MarketDataService()
+    hub = MarketStreamHub(service)
+    step_ms = TIMEFRAME_SECONDS["1m"] * 1000
+    state = IndicatorState()
+    for i in range(30):
+        state.push_candle(i * step_ms, 101.0, 99.0, 100.0)
+    service.indicator_states[("DEMO", "1m")] = state
+
+    def tick(now_ms, price):
+        # The producer applies each price to the indicator state before folding it into the hub's candle
+        service.update_tick("DEMO", price)
+        return hub._update_forming("DEMO", "1m", price, now_ms)
+
+    first = 30 * step_ms
+    tick(first + 1000, 104.0)
+    tick(first + 2000, 96.0)
+    tick(first + 3000, 102.0)
+    candle = tick(first + step_ms + 1000, 110.0)
+
+    assert candle == {"timestamp": first + step_ms, "open": 110.0, "high": 110.0, "low": 110.0, "close": 110.0}
+    assert state.candle_count == 31 and state.last_timestamp == first
+    assert state.prev_close == 102.0
+    # Only the new period's tick is left forming
+    assert state.forming == {"high": 110.0, "low": 110.0, "close": 110.0}
+
+
+def test_fetched_candle_replaces_tick_built_candle():
+    service = MarketDataService()
+    hub = MarketStreamHub(service)
+    step_ms = TIMEFRAME_SECONDS["1m"] * 1000
+    history = CandleSeries.from_rows([
+        {"timestamp": i * step_ms, "open": 100.0 + i % 3, "high": 102.0 + i % 5, "low": 98.0 - i % 4,
+         "close": 100.0 + i % 7, "volume": 1.0}
+        for i in range(32)
+    ])
+    state = IndicatorState.bootstrap([history[:30]])[0]
+    service.indicator_states[("DEMO", "1m")] = state
+
+    # Ticks miss most of period 30's range before period 31 opens
+    for now_ms, price in ((30 * step_ms + 1000, 101.0), (31 * step_ms + 1000, 103.0)):
+        service.update_tick("DEMO", price)
+        hub._update_forming("DEMO", "1m", price, now_ms)
+    assert state.last_timestamp == 30 * step_ms
+
+    # The provider's candles for periods 30 and 31 arrive with the next fetch
+    state.ingest(history)
+    expected = IndicatorState.bootstrap([history])[0]
+    assert state.candle_count == 32 and state.last_timestamp == 31 * step_ms
+    assert state.snapshot() == expected.snapshot()
+
+
+def test_subscription_is_rejected_without_a_snapshot():
+    async def run():
+        service = MarketDataService()
+
+        async def failing_market_data(symbol, timeframe="1h"):
+            return service._build_error_response(symbol, timeframe, ProviderError("unknown symbol"))
+
+        service.get_market_data = failing_market_data
+        hub = MarketStreamHub(service)
+        connection = hub.connect()
+        with pytest.raises(ValueError, match="unknown symbol"):
+            await hub.subscribe(connection, "NOPE", "1m")
+        assert not hub.producers and not hub.subscribers and not connection.subscriptions
+        assert connection.queue.empty()
+
+    asyncio.run(run())
@@ -0,0 +1,132 @@
+"""Provider admission control"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.rate_limiter import ProviderLimiter, RateLimitExceeded, TokenBucket, parse_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimitError(Exception):
+    def __init__(self, headers):
+        super().__init__("429")
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers=headers)
+
+
+def test_token_bucket_reserve_and_refund():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)
+    assert bucket.reserve(50) == 0.0
+    # Overdrawing makes the caller wait for its share to refill at one token per second
+    assert bucket.reserve(20) == pytest.approx(10.0)
+    bucket.refund(20)
+    assert bucket.tokens == pytest.approx(10.0)
+    clock.now += 30
+    assert bucket.delay(40) == 0.0
+    bucket.refund(1000)
+    assert bucket.tokens == bucket.capacity
+
+
+def test_parse_delay_formats():
+    assert parse_delay("1.5") == 1.5
+    assert parse_delay("6m0s") == 360.0
+    assert parse_delay("20ms") == pytest.approx(0.02)
+    assert parse_delay("not a delay") is None
+
+
+def test_settle_corrects_the_token_estimate():
+    async def run():
+        limiter = ProviderLimiter("test", tokens_per_minute=10000, clock=FakeClock())
+
+        async def request():
+            return "ok"
+
+        assert await limiter.call(request, estimated_tokens=3000) == "ok"
+        assert limiter.tokens.tokens == 7000
+        limiter.settle(3000, 1200)
+        assert limiter.tokens.tokens == 8800
+        limiter.settle(1000, 1500)
+        assert limiter.tokens.tokens == 8300
+
+    asyncio.run(run())
+
+
+def test_429_pauses_the_provider_and_retries():
+    async def run():
+        limiter = ProviderLimiter("test", requests_per_minute=600, max_wait=5, retries=1)
+        attempts = []
+
+        async def request():
+            attempts.append(asyncio.get_running_loop().time())
+            if len(attempts) == 1:
+                raise RateLimitError({"retry-after-ms": "50"})
+            return "ok"
+
+        assert await limiter.call(request) == "ok"
+        assert len(attempts) == 2 and attempts[1] - attempts[0] >= 0.045
+        assert limiter.rate_limited == 1 and limiter.in_flight == 0
+        assert not limiter.semaphore.locked()
+
+        async def always_limited():
+            raise RateLimitError({"retry-after": "60"})
+
+        # A pause beyond the wait budget fails instead of retrying
+        with pytest.raises(RateLimitError):
+            await limiter.call(always_limited)
+        with pytest.raises(RateLimitExceeded):
+            await limiter.call(request)
+
+    asyncio.run(run())
+
+
+def test_slot_is_released_on_timeout_cancellation_and_errors():
+    async def run():
+        # A frozen clock keeps the buckets from refilling while the slot wait times out
+        limiter = ProviderLimiter("test", requests_per_minute=600, max_concurrency=1, max_wait=0.05,
+                                  clock=FakeClock())
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        holder = asyncio.ensure_future(limiter.call(slow))
+        await asyncio.sleep(0)
+        assert limiter.semaphore.locked()
+
+        # Waiting past the budget for the only slot is rejected and refunds the request token
+        tokens = limiter.requests.tokens
+        with pytest.raises(RateLimitExceeded):
+            await limiter.call(slow)
+        assert limiter.requests.tokens == tokens
+
+        limiter.max_wait = 5
+        waiter = asyncio.ensure_future(limiter.call(slow))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        release.set()
+        assert await holder == "done"
+        assert not limiter.semaphore.locked() and limiter.in_flight == 0
+
+        async def failing():
+            raise ValueError("provider error")
+
+        with pytest.raises(ValueError):
+            await limiter.call(failing)
+        assert not limiter.semaphore.locked() and limiter.in_flight == 0
+        assert limiter.stats()["rejected"] == 1
+
+    asyncio.run(run())
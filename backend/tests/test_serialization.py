@@ -0,0 +1,62 @@
+"""Result record dicts and the fast JSON encoder"""
+
+import dataclasses
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from services import serialization
+from services.ai_service import MarketAnalysis, RiskAssessment, TradingStrategy
+from services.serialization import dumps
+
+TIMESTAMP = datetime(2024, 5, 1, 12, 30, 15, 250000)
+
+RECORDS = [
+    MarketAnalysis(
+        symbol="BTC", analysis_type="comprehensive", sentiment="bullish", confidence=0.7,
+        key_insights=["Higher lows"], recommendations=["Scale in"], timestamp=TIMESTAMP,
+        ai_provider="openai", raw_data={"sentiment": "bullish", "levels": {"support": 61000.5}}
+    ),
+    RiskAssessment(
+        risk_level="medium", risk_score=50.0, risk_factors=["Volatility"],
+        mitigation_strategies=["Position sizing"], timestamp=TIMESTAMP, ai_provider="claude"
+    ),
+    TradingStrategy(
+        strategy_name="Breakout", strategy_type="breakout", entry_signals=["Breakout"],
+        exit_signals=["Stop loss"], risk_management={"stop_loss": 0.02, "take_profit": 0.05},
+        expected_return=0.12, risk_level="medium", timestamp=TIMESTAMP, ai_provider="gemini"
+    )
+]
+
+
+@pytest.mark.parametrize("record", RECORDS, ids=lambda record: type(record).__name__)
+def test_to_dict_round_trips(record):
+    values = record.to_dict()
+    assert values == dataclasses.asdict(record)
+    assert type(record)(**values) == record
+    # Shallow: nested containers are the record's own objects
+    nested = next(name for name, value in values.items() if isinstance(value, (list, dict)))
+    assert values[nested] is getattr(record, nested)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("record", RECORDS, ids=lambda record: type(record).__name__)
+def test_dumps_matches_the_generic_encoder(record, use_orjson, monkeypatch):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    # Records encode like their field dicts through FastAPI's encoder, nested or not
+    expected = jsonable_encoder(dataclasses.asdict(record))
+    assert json.loads(dumps(record)) == expected
+    assert json.loads(dumps({"result": record, "items": [record]})) == {"result": expected, "items": [expected]}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_encodes_numpy_values(use_orjson, monkeypatch):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    payload = {"close": np.array([1.5, 2.25]), "count": np.int64(3), "ratio": np.float64(0.5), "tags": ("a", "b")}
+    assert json.loads(dumps(payload)) == {"close": [1.5, 2.25], "count": 3, "ratio": 0.5, "tags": ["a", "b"]}
+    assert dumps({"b": 1, "a": 2}, sort_keys=True) == b'{"a":2,"b":1}'
@@ -0,0 +1,48 @@
+"""Parameter sweeps over shared-memory candles"""
+
+import asyncio
+
+import numpy as np
+
+from services.backtest_engine import run_backtest, strategy_spec
+from services.candles import CandleSeries
+from services.strategy_optimizer import StrategyOptimizer, build_trials
+
+
+def random_walk(count=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.004, count)) * close
+    return CandleSeries(np.arange(count) * 3600 * 1000, open_, np.maximum(open_, close) + spread,
+                        np.minimum(open_, close) - spread, close, rng.uniform(100, 200, count))
+
+
+def test_sweep_runs_grid_and_random_trials_in_workers():
+    candles = random_walk()
+    spec = strategy_spec({"strategy_type": "momentum"})
+    grid = build_trials({"fast_period": [5, 8], "slow_period": [20, 30]})
+    sampled = build_trials({"stop_loss": {"min": 0.01, "max": 0.05}}, "random", trials=5, seed=1)
+    assert len(grid) == 4 and sampled == build_trials({"stop_loss": {"min": 0.01, "max": 0.05}}, "random", trials=5, seed=1)
+
+    async def run(optimizer, trials):
+        return [event async for event in optimizer.sweep(candles, spec, trials, objective="total_return")]
+
+    optimizer = StrategyOptimizer(workers=2)
+    try:
+        for trials in (grid, sampled):
+            events = asyncio.run(run(optimizer, trials))
+            *results, summary = events
+            assert sorted(result["trial"] for result in results) == list(range(len(trials)))
+            assert summary["type"] == "summary" and summary["successful_trials"] == len(trials)
+            for result in results:
+                # Workers reading shared memory match a backtest on the original series
+                overrides = trials[result["trial"]]
+                expected = run_backtest(candles, {**spec, "parameters": {**spec["parameters"], **overrides}},
+                                        include_details=False)["metrics"]
+                assert result["parameters"] == overrides and result["metrics"] == expected
+            best = max(results, key=lambda result: result["metrics"]["total_return"])
+            assert summary["top_trials"][0]["metrics"]["total_return"] == best["metrics"]["total_return"]
+        assert optimizer.trials_run == len(grid) + len(sampled)
+    finally:
+        optimizer.close()
@@ -0,0 +1,60 @@
+"""Incremental indicator state against the batch indicator engine"""
+
+import numpy as np
+import pytest
+
+from services.candles import CandleSeries
+from services.streaming_indicators import IndicatorState
+from services.technical_indicators import compute_indicators, indicators_to_rows
+
+HOUR_MS = 3600 * 1000
+
+
+def random_candles(count, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    spread = np.abs(rng.normal(0, 0.005, count)) * close
+    return CandleSeries(np.arange(count) * HOUR_MS, close, close + spread, close - spread, close, np.ones(count))
+
+
+def batch_snapshot(candles):
+    return indicators_to_rows(compute_indicators(candles.close, candles.high, candles.low))[0]
+
+
+def assert_matches(snapshot, expected):
+    assert snapshot.keys() == expected.keys()
+    for name, value in expected.items():
+        # Both sides round to cents, so a value on a rounding boundary may differ by one
+        assert snapshot[name] == pytest.approx(value, abs=0.011), name
+
+
+def test_pushed_candles_match_batch_indicators():
+    candles = random_candles(120)
+    state = IndicatorState()
+    for i in range(len(candles)):
+        state.push_candle(int(candles.timestamp[i]), candles.high[i], candles.low[i], candles.close[i])
+        if i + 1 >= 26:
+            assert_matches(state.snapshot(), batch_snapshot(candles[:i + 1]))
+
+
+def test_bootstrapped_state_continues_like_a_streamed_one():
+    candles = random_candles(150)
+    # Different lengths bootstrap in separate groups
+    short, long = IndicatorState.bootstrap([candles[:40], candles[:90]])
+    assert_matches(short.snapshot(), batch_snapshot(candles[:40]))
+    assert short.ingest(candles) == 110 and long.ingest(candles) == 60
+    assert_matches(short.snapshot(), batch_snapshot(candles))
+    assert_matches(long.snapshot(), batch_snapshot(candles))
+
+
+def test_forming_candle_previews_without_committing():
+    candles = random_candles(60)
+    state, = IndicatorState.bootstrap([candles[:59]])
+    last = candles[59]
+    for price in (last["close"], last["high"], last["low"], last["close"]):
+        state.update_tick(price)
+    assert_matches(state.snapshot(), batch_snapshot(candles))
+    assert state.candle_count == 59
+    # The forming candle is discarded when the closed one arrives
+    assert state.ingest(candles) == 1
+    assert_matches(state.snapshot(), batch_snapshot(candles))
@@ -0,0 +1,53 @@
+"""Reproducibility of seeded synthetic candles"""
+
+import numpy as np
+
+from services import synthetic_data
+from services.synthetic_data import CHUNK_CANDLES, SyntheticMarketGenerator
+
+MINUTE_MS = 60 * 1000
+# Ends inside a chunk, so windows below straddle chunk boundaries
+END_MS = (5 * CHUNK_CANDLES + 300) * MINUTE_MS
+
+
+def assert_same(a, b):
+    for name in a.__slots__:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+
+
+def test_window_is_a_function_of_time_alone():
+    first = SyntheticMarketGenerator(seed=3).window("BTC", "1m", 2000, END_MS)
+    again = SyntheticMarketGenerator(seed=3).window("BTC", "1m", 2000, END_MS)
+    assert_same(first, again)
+    assert len(first) == 2000 and first.last_timestamp == END_MS - MINUTE_MS
+    assert (np.diff(first.timestamp) == MINUTE_MS).all()
+
+    # Overlapping windows, requested in any order, agree on every shared candle
+    earlier = SyntheticMarketGenerator(seed=3).window("BTC", "1m", 700, END_MS - 900 * MINUTE_MS)
+    assert_same(earlier, first.between(earlier.timestamp[0], earlier.last_timestamp + 1))
+
+
+def test_window_path_is_continuous_across_chunks():
+    candles = SyntheticMarketGenerator(seed=3).window("ETH", "1m", 3 * CHUNK_CANDLES, END_MS)
+    np.testing.assert_allclose(candles.open[1:], candles.close[:-1], rtol=1e-12)
+    assert (candles.high >= np.maximum(candles.open, candles.close)).all()
+    assert (candles.low <= np.minimum(candles.open, candles.close)).all()
+    assert (candles.volume > 0).all()
+
+
+def test_seed_and_symbol_change_the_path():
+    base = SyntheticMarketGenerator(seed=3).window("BTC", "1h", 100, END_MS)
+    assert not np.array_equal(base.close, SyntheticMarketGenerator(seed=4).window("BTC", "1h", 100, END_MS).close)
+    assert not np.array_equal(base.close, SyntheticMarketGenerator(seed=3).window("ETH", "1h", 100, END_MS).close)
+
+
+def test_generate_does_not_depend_on_batching(monkeypatch):
+    symbols = ["AAA", "BBB", "CCC"]
+    whole = SyntheticMarketGenerator(seed=1).generate(symbols, 500, "5m", end_ms=END_MS)
+    monkeypatch.setattr(synthetic_data, "MAX_BATCH_CELLS", 500)
+    batched = SyntheticMarketGenerator(seed=1).generate(symbols, 500, "5m", end_ms=END_MS)
+    for symbol in symbols:
+        assert_same(whole[symbol], batched[symbol])
+    # Each symbol's path is independent of which other symbols are generated with it
+    alone = SyntheticMarketGenerator(seed=1).generate(["BBB"], 500, "5m", end_ms=END_MS)
+    assert_same(whole["BBB"], alone["BBB"])
@@ -0,0 +1,78 @@
+"""Vectorized indicators against straightforward per-step loops"""
+
+import math
+
+import numpy as np
+import pytest
+
+from services import technical_indicators as ti
+
+
+def reference_ema(values, span):
+    alpha = 2.0 / (span + 1.0)
+    out = [values[0]]
+    for value in values[1:]:
+        out.append(alpha * value + (1 - alpha) * out[-1])
+    return out
+
+
+def reference_rsi(close, period):
+    out = [math.nan] * len(close)
+    changes = [b - a for a, b in zip(close, close[1:])]
+    if len(changes) < period:
+        return out
+    avg_gain = sum(max(c, 0.0) for c in changes[:period]) / period
+    avg_loss = sum(max(-c, 0.0) for c in changes[:period]) / period
+    for i in range(period, len(changes) + 1):
+        if i > period:
+            change = changes[i - 1]
+            avg_gain = (avg_gain * (period - 1) + max(change, 0.0)) / period
+            avg_loss = (avg_loss * (period - 1) + max(-change, 0.0)) / period
+        out[i] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+def reference_bollinger(close, window, num_std):
+    upper, lower = [math.nan] * len(close), [math.nan] * len(close)
+    for i in range(window - 1, len(close)):
+        chunk = close[i - window + 1:i + 1]
+        mean = sum(chunk) / window
+        std = math.sqrt(sum((value - mean) ** 2 for value in chunk) / window)
+        upper[i], lower[i] = mean + num_std * std, mean - num_std * std
+    return upper, lower
+
+
+def price_paths(count, length, seed=11):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (count, length)), axis=1))
+
+
+# Longer than one recurrence block, so block carries are exercised
+@pytest.mark.parametrize("length", [1, 15, ti.RECURRENCE_BLOCK * 2 + 37])
+def test_ema_matches_reference_loop(length):
+    closes = price_paths(3, length)
+    for span in (5, 12, 26):
+        result = ti.ema(closes, span)
+        for row, close in zip(result, closes):
+            np.testing.assert_allclose(row, reference_ema(close.tolist(), span), rtol=1e-9)
+
+
+@pytest.mark.parametrize("length", [10, 15, 40, ti.RECURRENCE_BLOCK * 2 + 37])
+def test_rsi_matches_reference_loop(length):
+    closes = price_paths(3, length)
+    # A rising path has no losses and reports maximum strength
+    closes[0] = np.linspace(100, 200, length)
+    result = ti.rsi(closes, 14)
+    for row, close in zip(result, closes):
+        np.testing.assert_allclose(row, reference_rsi(close.tolist(), 14), rtol=1e-9)
+
+
+@pytest.mark.parametrize("length", [5, 20, 300])
+def test_bollinger_matches_reference_loop(length):
+    # A large price level checks the centred sum of squares stays accurate
+    closes = price_paths(2, length) * 1000
+    bands = ti.bollinger_bands(closes, 20, 2.0)
+    for i, close in enumerate(closes):
+        upper, lower = reference_bollinger(close.tolist(), 20, 2.0)
+        np.testing.assert_allclose(bands["upper"][i], upper, rtol=1e-9)
+        np.testing.assert_allclose(bands["lower"][i], lower, rtol=1e-9)
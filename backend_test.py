@@ -7,6 +7,7 @@ Tests all backend endpoints for functionality and error handling
 import requests
 import json
 import sys
+import time
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -24,6 +25,8 @@ class BackendTester:
         self.session = requests.Session()
         self.test_results = []
         self.auth_token = None
+        self.strategy_id = None
+        self.analysis_id = None
         self.test_user_email = "sarah.johnson@synapsetrade.ai"
         self.test_user_password = "SecureTrading2025!"
         self.test_user_name = "Sarah Johnson"
@@ -403,6 +406,31 @@ class BackendTester:
             self.log_result("Market Overview", False, f"Market overview endpoint failed with exception: {str(e)}")
             return False
     
+    def test_market_overview_conditional(self):
+        """Test compression and ETag revalidation on /api/market/overview"""
+        try:
+            response = self.session.get(f"{self.base_url}/market/overview", headers={"Accept-Encoding": "gzip"})
+            etag = response.headers.get('ETag')
+            if response.status_code != 200 or not etag:
+                self.log_result("Market Overview Conditional", False, f"Market overview returned status {response.status_code} without an ETag", response.text)
+                return False
+            
+            revalidated = self.session.get(f"{self.base_url}/market/overview", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+            # The snapshot may refresh between requests, in which case a new body is expected
+            if revalidated.status_code == 304 or (revalidated.status_code == 200 and revalidated.headers.get('ETag') != etag):
+                self.log_result("Market Overview Conditional", True, "Market overview compression and revalidation working correctly", {
+                    'content_encoding': response.headers.get('Content-Encoding'),
+                    'etag': etag,
+                    'revalidation_status': revalidated.status_code
+                })
+                return True
+            else:
+                self.log_result("Market Overview Conditional", False, f"Unchanged market overview returned status {revalidated.status_code}")
+                return False
+        except Exception as e:
+            self.log_result("Market Overview Conditional", False, f"Market overview revalidation failed with exception: {str(e)}")
+            return False
+    
     def test_trending_symbols(self):
         """Test /api/market/trending/{market_type} endpoint"""
         try:
@@ -436,6 +464,133 @@ class BackendTester:
             self.log_result("Trending Symbols", False, f"Trending symbols endpoint failed with exception: {str(e)}")
             return False
     
+    def test_market_cache_stats(self):
+        """Test /api/market/cache/stats endpoint"""
+        try:
+            response = self.session.get(f"{self.base_url}/market/cache/stats")
+            if response.status_code == 200:
+                data = response.json()
+                if 'status' in data and data['status'] == 'success' and 'cache' in data:
+                    cache_stats = data['cache']
+                    required_fields = ['hits', 'misses', 'evictions', 'entries']
+                    
+                    if all(field in cache_stats for field in required_fields):
+                        self.log_result("Market Cache Stats", True, "Market cache stats endpoint working correctly", cache_stats)
+                        return True
+                    else:
+                        self.log_result("Market Cache Stats", False, "Market cache stats response incomplete", data)
+                        return False
+                else:
+                    self.log_result("Market Cache Stats", False, "Market cache stats response format invalid", data)
+                    return False
+            else:
+                self.log_result("Market Cache Stats", False, f"Market cache stats endpoint failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("Market Cache Stats", False, f"Market cache stats endpoint failed with exception: {str(e)}")
+            return False
+    
+    def test_market_history(self):
+        """Test /api/market/history endpoint"""
+        try:
+            response = self.session.get(f"{self.base_url}/market/history", params={"symbol": "BTC", "timeframe": "1h", "limit": 48})
+            if response.status_code == 200:
+                data = response.json()
+                if 'status' in data and data['status'] == 'success' and 'candles' in data:
+                    candles = data['candles']
+                    timestamps = [candle['timestamp'] for candle in candles]
+                    
+                    if candles and timestamps == sorted(timestamps) and len(candles) <= 48:
+                        self.log_result("Market History", True, f"Market history endpoint returned {len(candles)} candles")
+                        return True
+                    else:
+                        self.log_result("Market History", False, "Market history candles empty or out of order", data)
+                        return False
+                else:
+                    self.log_result("Market History", False, "Market history response format invalid", data)
+                    return False
+            else:
+                self.log_result("Market History", False, f"Market history endpoint failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("Market History", False, f"Market history endpoint failed with exception: {str(e)}")
+            return False
+    
+    def test_market_batch(self):
+        """Test /api/market/batch NDJSON endpoint"""
+        try:
+            symbols = ["BTC", "ETH", "AAPL", "EUR/USD"]
+            response = self.session.post(f"{self.base_url}/market/batch", json={"symbols": symbols, "timeframe": "1h"}, stream=True)
+            if response.status_code == 200:
+                lines = [json.loads(line) for line in response.iter_lines() if line]
+                results = [line for line in lines if line.get('type') != 'summary']
+                summary = lines[-1] if lines else {}
+                
+                if summary.get('type') == 'summary' and sorted(r['symbol'] for r in results) == sorted(symbols):
+                    self.log_result("Market Batch", True, f"Market batch streamed {len(results)} symbols", summary)
+                    return True
+                else:
+                    self.log_result("Market Batch", False, "Market batch stream incomplete", lines)
+                    return False
+            else:
+                self.log_result("Market Batch", False, f"Market batch endpoint failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("Market Batch", False, f"Market batch endpoint failed with exception: {str(e)}")
+            return False
+    
+    def test_symbol_search(self):
+        """Test /api/market/symbols search endpoint"""
+        try:
+            response = self.session.get(f"{self.base_url}/market/symbols", params={"q": "bitcoim", "limit": 5})
+            if response.status_code == 200:
+                data = response.json()
+                if 'status' in data and data['status'] == 'success' and 'results' in data:
+                    symbols = [result['symbol'] for result in data['results']]
+                    
+                    if 'BTC' in symbols:
+                        self.log_result("Symbol Search", True, f"Symbol search matched {symbols}")
+                        return True
+                    else:
+                        self.log_result("Symbol Search", False, "Symbol search did not tolerate a typo", data)
+                        return False
+                else:
+                    self.log_result("Symbol Search", False, "Symbol search response format invalid", data)
+                    return False
+            else:
+                self.log_result("Symbol Search", False, f"Symbol search endpoint failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("Symbol Search", False, f"Symbol search endpoint failed with exception: {str(e)}")
+            return False
+    
+    def test_correlation_matrix(self):
+        """Test /api/market/correlation endpoint"""
+        try:
+            symbols = ["BTC", "ETH", "AAPL", "EUR/USD"]
+            response = self.session.post(f"{self.base_url}/market/correlation", json={"symbols": symbols, "timeframe": "1h", "window": 50})
+            if response.status_code == 200:
+                data = response.json()
+                if 'status' in data and data['status'] == 'success' and 'data' in data:
+                    matrix = data['data']['correlation']
+                    size = len(data['data']['symbols'])
+                    
+                    if size == len(symbols) and len(matrix) == size and all(abs(matrix[i][i] - 1) < 1e-9 for i in range(size)):
+                        self.log_result("Correlation Matrix", True, f"Correlation matrix computed for {size} symbols")
+                        return True
+                    else:
+                        self.log_result("Correlation Matrix", False, "Correlation matrix shape or diagonal invalid", data)
+                        return False
+                else:
+                    self.log_result("Correlation Matrix", False, "Correlation matrix response format invalid", data)
+                    return False
+            else:
+                self.log_result("Correlation Matrix", False, f"Correlation matrix endpoint failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("Correlation Matrix", False, f"Correlation matrix endpoint failed with exception: {str(e)}")
+            return False
+    
     def test_ai_analyze(self):
         """Test /api/ai/analyze endpoint (requires auth)"""
         if not self.auth_token:
@@ -459,9 +614,11 @@ class BackendTester:
                     required_fields = ['symbol', 'timestamp', 'orchestration_status']
                     
                     if all(field in analysis for field in required_fields):
+                        self.analysis_id = data.get('analysis_id')
                         self.log_result("AI Analysis", True, "AI analysis endpoint working correctly", {
                             'symbol': analysis['symbol'],
                             'orchestration_status': analysis['orchestration_status'],
+                            'pending_sections': analysis.get('pending_sections', []),
                             'has_market_analysis': analysis.get('market_analysis') is not None,
                             'has_risk_assessment': analysis.get('risk_assessment') is not None
                         })
@@ -479,6 +636,79 @@ class BackendTester:
             self.log_result("AI Analysis", False, f"AI analysis endpoint failed with exception: {str(e)}")
             return False
     
+    def test_ai_analyze_stream(self):
+        """Test /api/ai/analyze/stream Server-Sent Events endpoint (requires auth)"""
+        if not self.auth_token:
+            self.log_result("AI Analysis Stream", False, "No auth token available for testing")
+            return False
+        
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token}", "Accept": "text/event-stream"}
+            analysis_request = {"symbol": "BTC", "analysis_type": "comprehensive"}
+            
+            response = self.session.post(f"{self.base_url}/ai/analyze/stream", json=analysis_request, headers=headers, stream=True)
+            if response.status_code == 200:
+                events = []
+                event_name = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("event: "):
+                        event_name = line[len("event: "):]
+                    elif line.startswith("data: "):
+                        events.append((event_name, json.loads(line[len("data: "):])))
+                
+                sections = [data['section'] for name, data in events if name == 'section']
+                if events and events[-1][0] == 'complete' and 'analysis_id' in events[-1][1] and len(sections) == 3:
+                    analysis = events[-1][1]['analysis']
+                    self.log_result("AI Analysis Stream", True, "AI analysis stream working correctly", {
+                        'token_events': sum(1 for name, _ in events if name == 'token'),
+                        'sections': sections,
+                        'orchestration_status': analysis['orchestration_status']
+                    })
+                    return True
+                else:
+                    self.log_result("AI Analysis Stream", False, "AI analysis stream ended without a complete event", events[-3:])
+                    return False
+            else:
+                self.log_result("AI Analysis Stream", False, f"AI analysis stream failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("AI Analysis Stream", False, f"AI analysis stream failed with exception: {str(e)}")
+            return False
+    
+    def test_analysis_lookup(self):
+        """Test /api/ai/analysis/{analysis_id} endpoint (requires auth)"""
+        if not self.auth_token or not self.analysis_id:
+            self.log_result("Analysis Lookup", False, "No auth token or analysis available for testing")
+            return False
+        
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token}"}
+            response = self.session.get(f"{self.base_url}/ai/analysis/{self.analysis_id}", headers=headers)
+            if response.status_code == 200:
+                data = response.json()
+                if 'status' in data and data['status'] == 'success' and 'analysis' in data:
+                    analysis = data['analysis']
+                    required_fields = ['analysis_id', 'symbol', 'analysis_data', 'status']
+                    
+                    if all(field in analysis for field in required_fields) and analysis['analysis_id'] == self.analysis_id:
+                        self.log_result("Analysis Lookup", True, "Analysis lookup working correctly", {
+                            'status': analysis['status'],
+                            'pending_sections': analysis['analysis_data'].get('pending_sections', [])
+                        })
+                        return True
+                    else:
+                        self.log_result("Analysis Lookup", False, "Analysis lookup response incomplete", data)
+                        return False
+                else:
+                    self.log_result("Analysis Lookup", False, "Analysis lookup response format invalid", data)
+                    return False
+            else:
+                self.log_result("Analysis Lookup", False, f"Analysis lookup endpoint failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("Analysis Lookup", False, f"Analysis lookup endpoint failed with exception: {str(e)}")
+            return False
+    
     def test_trading_strategy_creation(self):
         """Test /api/trading/strategy endpoint (requires auth)"""
         if not self.auth_token:
@@ -507,6 +737,7 @@ class BackendTester:
                     required_fields = ['strategy_name', 'strategy_type', 'timestamp']
                     
                     if all(field in strategy for field in required_fields):
+                        self.strategy_id = data.get('strategy_id')
                         self.log_result("Trading Strategy Creation", True, "Trading strategy creation working correctly", {
                             'strategy_name': strategy['strategy_name'],
                             'strategy_type': strategy['strategy_type'],
@@ -526,6 +757,79 @@ class BackendTester:
             self.log_result("Trading Strategy Creation", False, f"Trading strategy endpoint failed with exception: {str(e)}")
             return False
     
+    def test_strategy_backtest(self):
+        """Test /api/trading/strategy/{strategy_id}/backtest endpoint (requires auth)"""
+        if not self.auth_token or not self.strategy_id:
+            self.log_result("Strategy Backtest", False, "No auth token or strategy available for testing")
+            return False
+        
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token}"}
+            backtest_request = {"symbol": "BTC", "timeframe": "1h", "limit": 2000}
+            response = self.session.post(f"{self.base_url}/trading/strategy/{self.strategy_id}/backtest", json=backtest_request, headers=headers)
+            if response.status_code == 200:
+                data = response.json()
+                if 'status' in data and data['status'] == 'success' and 'backtest' in data:
+                    backtest = data['backtest']
+                    required_fields = ['metrics', 'equity_curve', 'trades']
+                    
+                    if all(field in backtest for field in required_fields):
+                        self.log_result("Strategy Backtest", True, "Strategy backtest working correctly", {
+                            'total_trades': backtest['metrics']['total_trades'],
+                            'total_return': backtest['metrics']['total_return'],
+                            'sharpe_ratio': backtest['metrics']['sharpe_ratio']
+                        })
+                        return True
+                    else:
+                        self.log_result("Strategy Backtest", False, "Strategy backtest response incomplete", data)
+                        return False
+                else:
+                    self.log_result("Strategy Backtest", False, "Strategy backtest response format invalid", data)
+                    return False
+            else:
+                self.log_result("Strategy Backtest", False, f"Strategy backtest endpoint failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("Strategy Backtest", False, f"Strategy backtest endpoint failed with exception: {str(e)}")
+            return False
+    
+    def test_strategy_optimization(self):
+        """Test /api/trading/strategy/{strategy_id}/optimize NDJSON endpoint (requires auth)"""
+        if not self.auth_token or not self.strategy_id:
+            self.log_result("Strategy Optimization", False, "No auth token or strategy available for testing")
+            return False
+        
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token}"}
+            optimization_request = {
+                "symbol": "BTC",
+                "timeframe": "1h",
+                "limit": 1000,
+                "ranges": {"rsi_period": [10, 14], "stop_loss": {"min": 0.01, "max": 0.03, "step": 0.01}}
+            }
+            response = self.session.post(f"{self.base_url}/trading/strategy/{self.strategy_id}/optimize", json=optimization_request, headers=headers)
+            if response.status_code == 200:
+                lines = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+                trials = [line for line in lines if line.get('type') == 'trial']
+                summary = lines[-1] if lines else {}
+                
+                if len(trials) == 6 and summary.get('type') == 'summary' and summary.get('best_parameters'):
+                    self.log_result("Strategy Optimization", True, "Strategy optimization streaming working correctly", {
+                        'trials': len(trials),
+                        'successful_trials': summary['successful_trials'],
+                        'best_rsi_period': summary['best_parameters']['rsi_period']
+                    })
+                    return True
+                else:
+                    self.log_result("Strategy Optimization", False, "Strategy optimization stream incomplete", lines[-3:])
+                    return False
+            else:
+                self.log_result("Strategy Optimization", False, f"Strategy optimization endpoint failed with status {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_result("Strategy Optimization", False, f"Strategy optimization endpoint failed with exception: {str(e)}")
+            return False
+    
     def test_user_strategies(self):
         """Test /api/trading/strategies endpoint (requires auth)"""
         if not self.auth_token:
@@ -557,6 +861,49 @@ class BackendTester:
             self.log_result("User Strategies", False, f"User strategies endpoint failed with exception: {str(e)}")
             return False
     
+    def test_analysis_job(self):
+        """Test /api/jobs submission and /api/jobs/{job_id} polling (requires auth)"""
+        if not self.auth_token:
+            self.log_result("Analysis Job", False, "No auth token available for testing")
+            return False
+        
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token}"}
+            job_request = {"type": "analysis", "payload": {"symbol": "ETH"}, "priority": 5}
+            
+            response = self.session.post(f"{self.base_url}/jobs", json=job_request, headers=headers)
+            if response.status_code != 202:
+                self.log_result("Analysis Job", False, f"Job submission failed with status {response.status_code}", response.text)
+                return False
+            job = response.json().get('job', {})
+            if job.get('status') != 'queued' or 'job_id' not in job:
+                self.log_result("Analysis Job", False, "Job submission response invalid", response.json())
+                return False
+            
+            # Poll until the job finishes
+            deadline = time.time() + 120
+            while job['status'] not in ('succeeded', 'failed') and time.time() < deadline:
+                time.sleep(1)
+                response = self.session.get(f"{self.base_url}/jobs/{job['job_id']}", headers=headers)
+                if response.status_code != 200:
+                    self.log_result("Analysis Job", False, f"Job status failed with status {response.status_code}", response.text)
+                    return False
+                job = response.json()['job']
+            
+            if job['status'] == 'succeeded' and 'analysis_id' in (job.get('result') or {}):
+                self.log_result("Analysis Job", True, "Analysis job completed in the background", {
+                    'job_id': job['job_id'],
+                    'attempts': job['attempts'],
+                    'analysis_id': job['result']['analysis_id']
+                })
+                return True
+            else:
+                self.log_result("Analysis Job", False, f"Analysis job ended as {job['status']}", job)
+                return False
+        except Exception as e:
+            self.log_result("Analysis Job", False, f"Analysis job failed with exception: {str(e)}")
+            return False
+    
     def test_risk_assessment(self):
         """Test /api/ai/risk-assessment endpoint (requires auth)"""
         if not self.auth_token:
@@ -658,9 +1005,20 @@ class BackendTester:
             ("AI Status", self.test_ai_status),
             ("Market Data", self.test_market_data),
             ("Market Overview", self.test_market_overview),
+            ("Market Overview Conditional", self.test_market_overview_conditional),
             ("Trending Symbols", self.test_trending_symbols),
+            ("Market Cache Stats", self.test_market_cache_stats),
+            ("Market History", self.test_market_history),
+            ("Market Batch", self.test_market_batch),
+            ("Symbol Search", self.test_symbol_search),
+            ("Correlation Matrix", self.test_correlation_matrix),
             ("AI Analysis", self.test_ai_analyze),
+            ("Analysis Lookup", self.test_analysis_lookup),
+            ("AI Analysis Stream", self.test_ai_analyze_stream),
+            ("Analysis Job", self.test_analysis_job),
             ("Trading Strategy Creation", self.test_trading_strategy_creation),
+            ("Strategy Backtest", self.test_strategy_backtest),
+            ("Strategy Optimization", self.test_strategy_optimization),
             ("User Strategies", self.test_user_strategies),
             ("Risk Assessment", self.test_risk_assessment),
             ("Dashboard Data", self.test_dashboard_data)